@@ -0,0 +1,128 @@
+import math
+import commands2
+from wpilib import Timer
+from wpimath.controller import ProfiledPIDController
+from wpimath.trajectory import TrapezoidProfile
+from constants import PickupConstants
+from subsystems.drivesubsystem import DriveSubsystem
+from subsystems.limelight_camera import LimelightCamera, TargetFrame
+from helpers.target_tracker import TargetTracker
+
+
+class PickupAlign(commands2.Command):
+    """Drives the robot onto a game piece seen by the pickup camera.
+
+    Every new detection is projected from the camera's tx and ty onto the floor, then into the field frame using the
+    robot pose at the frame's capture time, so the robot moving while the frame was processed doesn't throw it off.
+    A TargetTracker holds the target between frames. Each loop a profiled heading controller turns the robot toward
+    the target and, once it's roughly facing it, a profiled translation controller drives it in to
+    PickupConstants.stop_distance. Ends when it's there, or when the target has been lost for lost_timeout. The
+    tracker starts from the camera's latest detection, and the command doesn't give up on a target it hasn't seen yet
+    until lost_timeout after it starts, since the camera runs slower than the loop.
+
+    Works in the pose estimator's frame, with rotation commands in drive_2ok's sign (positive lowers the heading).
+    """
+
+    def __init__(self, drive: DriveSubsystem, camera: LimelightCamera) -> None:
+        super().__init__()
+        self.drive = drive
+        self.camera = camera
+        self.tracker = TargetTracker()
+        self.heading_controller = ProfiledPIDController(
+            PickupConstants.heading_pid[0], PickupConstants.heading_pid[1], PickupConstants.heading_pid[2],
+            TrapezoidProfile.Constraints(PickupConstants.max_angular_velocity,
+                                         PickupConstants.max_angular_acceleration))
+        self.heading_controller.enableContinuousInput(-math.pi, math.pi)
+        self.translation_controller = ProfiledPIDController(
+            PickupConstants.translation_pid[0], PickupConstants.translation_pid[1], PickupConstants.translation_pid[2],
+            TrapezoidProfile.Constraints(PickupConstants.max_speed, PickupConstants.max_acceleration))
+        self.approaching = False
+        self.distance = math.inf
+        self.heading_error = math.inf
+        self.start_time = 0.0
+        self.addRequirements(drive)
+        self.setName("Pickup Align")
+
+    @staticmethod
+    def robot_relative_target(frame: TargetFrame) -> tuple[float, float] | None:
+        """Project a detection onto the floor. Returns the target's (forward, right) position from the robot's center in
+        meters, or None if the ray doesn't hit the floor within PickupConstants.max_range. Right is +y in the
+        drivetrain's frame, the same as the module locations and the pose estimator."""
+        pitch = math.radians(PickupConstants.camera_pitch + frame.ty)
+        if pitch >= 0:
+            return None
+        distance = (PickupConstants.target_height - PickupConstants.camera_height) / math.tan(pitch)
+        if distance > PickupConstants.max_range:
+            return None
+        bearing = math.radians(PickupConstants.camera_yaw + frame.tx)  # tx is positive to the right.
+        return (PickupConstants.camera_x + distance * math.cos(bearing),
+                PickupConstants.camera_y + distance * math.sin(bearing))
+
+    def add_detection(self, frame: TargetFrame) -> None:
+        """Project a detection into the field frame at its capture time and give it to the tracker."""
+        target = self.robot_relative_target(frame)
+        if target is None:
+            return
+        pose = self.drive.pose_estimator.sample_at(frame.timestamp)
+        if pose is None:
+            pose = self.drive.get_pose()
+        cos = pose.rotation().cos()
+        sin = pose.rotation().sin()
+        forward, right = target
+        self.tracker.update(frame.timestamp, pose.X() + forward * cos - right * sin,
+                            pose.Y() + forward * sin + right * cos)
+
+    def initialize(self) -> None:
+        self.tracker.reset()
+        self.approaching = False
+        self.distance = math.inf
+        self.heading_error = math.inf
+        self.heading_controller.reset(self.drive.get_pose().rotation().radians())
+        self.start_time = Timer.getFPGATimestamp()
+        # Whatever the camera saw last, so the first loop doesn't have to wait for a new frame.
+        if self.camera.latestTarget.valid:
+            self.add_detection(self.camera.latestTarget)
+
+    def execute(self) -> None:
+        for frame in self.camera.targetFrames:
+            if frame.valid:
+                self.add_detection(frame)
+
+        now = Timer.getFPGATimestamp()
+        if self.tracker.lost(now):
+            self.drive.drive_field_speeds(0, 0, 0)
+            return
+
+        pose = self.drive.get_pose()
+        target_x, target_y = self.tracker.predict(now)
+        dx = target_x - pose.X()
+        dy = target_y - pose.Y()
+        self.distance = math.hypot(dx, dy)
+        heading = pose.rotation().radians()
+        bearing = math.atan2(dy, dx)
+        self.heading_error = math.remainder(bearing - heading, math.tau)
+
+        turn = self.heading_controller.calculate(heading, bearing) + self.heading_controller.getSetpoint().velocity
+
+        # Start the translation profile from wherever the robot is when it first lines up.
+        if not self.approaching and abs(self.heading_error) < PickupConstants.approach_heading:
+            self.approaching = True
+            self.translation_controller.reset(self.distance)
+        speed = 0.0
+        if self.approaching:
+            speed = -(self.translation_controller.calculate(self.distance, PickupConstants.stop_distance) +
+                      self.translation_controller.getSetpoint().velocity)
+        if self.distance > 0:
+            self.drive.drive_field_speeds(speed * dx / self.distance, speed * dy / self.distance, -turn)
+        else:
+            self.drive.drive_field_speeds(0, 0, -turn)
+
+    def isFinished(self) -> bool:
+        now = Timer.getFPGATimestamp()
+        if self.tracker.lost(now) and now - self.start_time > PickupConstants.lost_timeout:
+            return True
+        return abs(self.distance - PickupConstants.stop_distance) < PickupConstants.distance_tolerance and \
+            abs(self.heading_error) < PickupConstants.heading_tolerance
+
+    def end(self, interrupted: bool) -> None:
+        self.drive.drive_field_speeds(0, 0, 0)
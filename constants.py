@@ -72,7 +72,145 @@ class AutoConstants:
     module_distance = 0.52705  # in m
     # module_radius_from_center = math.sqrt(pow((module_distance / 2), 2) + pow((module_distance / 2), 2))
     module_radius_from_center = 0.372681
+    # Max velocity, max acceleration, max angular velocity, max angular acceleration for on-the-fly paths.
+    path_constraints = (2, 2, 2 * math.pi, 4 * math.pi)
 
+class HeadingHoldConstants:
+    max_velocity = math.degrees(DriveConstants.kMaxAngularSpeed)  # degrees per second.
+    max_acceleration = 1440  # degrees per second squared the hold decelerates the robot at.
+    # seconds from a rotation command to the robot actually turning at that rate: one loop plus the drivetrain's response
+    # time.
+    actuation_latency = 0.1
+    sensor_latency = 0.01  # seconds from the navX measuring the yaw to the roboRIO reading it.
+
+class SimConstants:
+    robot_mass = 55  # kg, with bumpers and battery.
+    drive_response_time = 0.05  # seconds, time constant of the drive velocity loop when not torque limited.
+    steer_response_time = 0.03  # seconds, time constant of the steer position loop when not speed limited.
+
+    # Simulated Limelight, see LimelightSim.
+    camera_fps = 30
+    camera_pipeline_latency = 0.02  # seconds.
+    camera_capture_latency = 0.011  # seconds.
+    camera_xy_noise = 0.01  # meters of pose noise per meter squared of tag distance.
+    camera_heading_noise = 1.0  # degrees.
+    camera_dropout = 0.0  # Chance a frame is lost.
+    camera_height = 0.5  # meters, lens height. The camera sits at the robot's center facing forward.
+    camera_fov = (62.5, 48.9)  # degrees, horizontal and vertical field of view.
+    camera_max_distance = 6.0  # meters, tags further than this aren't detected.
+    tag_size = 0.1651  # meters.
+    # Field tags as (id, x m, y m, z m, facing degrees). The 2025 reef tags are close enough to exercise vision.
+    tags = [
+        (6, 13.474, 3.306, 0.308, 300), (7, 13.890, 4.026, 0.308, 0), (8, 13.474, 4.745, 0.308, 60),
+        (9, 12.643, 4.745, 0.308, 120), (10, 12.227, 4.026, 0.308, 180), (11, 12.643, 3.306, 0.308, 240),
+        (17, 4.074, 3.306, 0.308, 240), (18, 3.658, 4.026, 0.308, 180), (19, 4.074, 4.745, 0.308, 120),
+        (20, 4.905, 4.745, 0.308, 60), (21, 5.321, 4.026, 0.308, 0), (22, 4.905, 3.306, 0.308, 300),
+    ]
+
+class OdometryConstants:
+    rate = 250  # Hz, module position and yaw sample rate of the odometry thread.
+    buffer_size = 32  # Samples held between main loop drains, over 100 ms at 250 Hz.
+
+class PoseHistoryConstants:
+    retention = 1.5  # seconds of poses kept, the same window the pose estimator fuses vision over.
+    capacity = math.ceil(retention * OdometryConstants.rate) + 16  # One pose per odometry sample, with some slack.
+
+class VisionConstants:
+    max_age = 1.5  # seconds, the pose estimator only keeps this much odometry history to fuse vision against.
+    cameras = ["limelight-pickup"]  # Limelight NetworkTables names, see VisionManager.
+    frame_queue_size = 20  # Camera frames NetworkTables holds between reads, a few loops' worth.
+    stats_period = 1.0  # seconds each camera's frame rate and latency are averaged over.
+    # Measurement weighting, see VisionWeighting. Standard deviations are for one tag at 1 m with the robot still.
+    xy_std = 0.05  # meters.
+    heading_std = 0.1  # radians, multi-tag solves only.
+    min_xy_std = 0.02  # meters, vision is never trusted more than this.
+    min_heading_std = 0.03  # radians.
+    single_tag_heading_std = 999999999  # One tag can't give a reliable heading.
+    spin_scale = 180  # degrees per second of angular velocity that doubles the standard deviations.
+    max_angular_velocity = 720  # degrees per second, spinning faster than this rejects the measurement.
+    max_distance = 6  # meters, average tag distance beyond which the measurement is rejected.
+    min_area = 0.05  # percent of the image, average tag area below which the measurement is rejected.
+    # Outlier gating, see VisionGate.
+    odometry_std = 0.1  # meters, odometry's own uncertainty, matches the pose estimator's default state std devs.
+    odometry_heading_std = 0.1  # radians.
+    chi_square_downweight = {2: 5.991, 3: 7.815}  # 95% gate by degrees of freedom, past this std devs are scaled up.
+    chi_square_reject = {2: 13.816, 3: 16.266}  # 99.9% gate by degrees of freedom, past this it's dropped.
+    max_jump = 1.0  # meters from odometry, further than this is dropped.
+    field_margin = 0.5  # meters outside the field a pose can be before it's dropped.
+    max_consecutive_rejects = 25  # After this many rejections in a row, trust vision over odometry again.
+
+class PickupConstants:
+    # Pickup camera mount, relative to the robot's center, in the drivetrain's frame (the module locations put +y on
+    # the robot's right). Pitch is negative looking down.
+    camera_x = 0.3  # meters forward.
+    camera_y = 0.0  # meters right.
+    camera_height = 0.45  # meters.
+    camera_pitch = -20  # degrees.
+    camera_yaw = 0  # degrees, clockwise (toward the right) from forward.
+    target_height = 0.05  # meters, height of the game piece's center.
+    max_range = 5.0  # meters, detections projected further than this are ignored.
+
+    # Target tracker, an alpha-beta filter on the target's field position.
+    tracker_alpha = 0.5  # How far each detection pulls the position.
+    tracker_beta = 0.1  # How far each detection pulls the velocity.
+    tracker_gate = 1.0  # meters, a detection this far from the track starts a new one.
+    lost_timeout = 0.5  # seconds without a detection before the target counts as lost.
+
+    # Approach. Heading is in radians, translation in meters.
+    heading_pid = [4, 0, 0]
+    max_angular_velocity = 2 * math.pi
+    max_angular_acceleration = 4 * math.pi
+    translation_pid = [2, 0, 0]
+    max_speed = 2.5
+    max_acceleration = 3.0
+    approach_heading = math.radians(20)  # Only drive at the target once pointing within this of it.
+    stop_distance = 0.4  # meters from the robot's center to the target where the intake has it.
+    distance_tolerance = 0.05
+    heading_tolerance = math.radians(3)
+
+class MotionEstimatorConstants:
+    history_size = 50  # Velocity samples kept, one per drive loop.
+    filter_window = 5  # Newest samples the derivative filter fits over. Acceleration lags by about half of this.
+
+class PathfindingConstants:
+    # Max velocity, max acceleration, max angular velocity, max angular acceleration for pathfinding.
+    constraints = (3, 4, 9.424, 12.567)
+    plan_timeout = 1.0  # seconds to wait for the planner before giving up on a request.
+    poll_period = 0.005  # seconds between checks for a finished path on the worker thread.
+
+class PathCacheConstants:
+    max_size = 32  # Number of start/target pairs kept.
+    translation_step = 0.05  # meters, start poses closer than this share a cached path.
+    rotation_step = 5  # degrees, start headings closer than this share a cached path.
+
+
+class CANConstants:
+    bus_bitrate = 1000000  # bits per second.
+    frame_bits = 130  # Rough size of one 8 byte extended CAN frame, including overhead and bit stuffing.
+    # Highest estimated status frame load allowed. Leaves room for setpoints, the PDH and anything non-REV.
+    max_bus_load = 0.6
+    unused_period = 500  # ms, period for SPARK signals nothing reads.
+    fault_period = 250  # ms, faults and warnings never go slower than this.
+
+class MotorConfigConstants:
+    # Hashes of the last SPARK configs persisted to flash, kept in the operating directory on the robot.
+    hash_file = "motor_config_hashes.json"
+
+class TelemetryConstants:
+    slow_rate = 10  # Hz, rate for signals in the SLOW telemetry tier.
+
+class FieldDisplayConstants:
+    publish_rate = 10  # Hz, fastest rate the dashboard field is updated at.
+    translation_tolerance = 0.02  # meters the robot has to move before the field is updated.
+    rotation_tolerance = 1  # degrees the robot has to turn before the field is updated.
+    max_path_poses = 50  # Paths longer than this are thinned out before being shown.
+
+class ProfilerConstants:
+    enabled = False  # Times every periodic, command and trigger when on. Turn on when profiling, it costs loop time.
+    publish_rate = 1  # Hz, rate the histogram summaries are sent out at.
+    bucket_min = 0.00005  # Seconds, upper edge of the smallest histogram bucket.
+    bucket_max = 0.05  # Seconds, upper edge of the largest histogram bucket. Anything slower only shows as the max.
+    bucket_count = 48
 
 class OIConstants:
     kDriverControllerPort = 0
@@ -141,6 +279,20 @@ class ModuleConstants:
         Translation2d(-half_length, -half_width),  # Back Right
     ]
 
+    # Setpoint coalescing. A module setpoint that moved less than the epsilon since the last one sent isn't written
+    # to the SPARK, unless keep_alive seconds have passed.
+    drive_setpoint_epsilon = 0.005  # m/s
+    steer_setpoint_epsilon = 0.0005  # module rotations, about 0.2 degrees.
+    setpoint_keep_alive = 0.1  # seconds
+
+    # SPARK signals the module code reads, and the period in ms each is needed at. Everything else is slowed down.
+    # Positions go at the odometry thread's period (4 ms), or it would record the same position several times under
+    # new timestamps. Velocity only needs 20 ms, but it travels in the same status frame as position, so the position
+    # period sets that frame's rate and velocity comes along at 4 ms. About 28% estimated bus load for all 8.
+    drive_signals = {"primaryEncoderVelocity": 20, "primaryEncoderPosition": 1000 // OdometryConstants.rate,
+                     "outputCurrent": 100}
+    steer_signals = {"primaryEncoderPosition": 1000 // OdometryConstants.rate, "outputCurrent": 100}
+
 class WoodConstants:
     wood_intake_id = 14
     wood_intake_encoder_id = 14
@@ -148,6 +300,24 @@ class WoodConstants:
 class LovelyLauncherConstants:
     launcher_id = 10
     launcher_encoder_id = 10
+
+    # Shot table for the shoot-while-moving solver: (distance m, flywheel RPM, time of flight s). Needs re-tuning
+    # whenever the launcher changes.
+    shot_table = [
+        (1.0, 2400, 0.55),
+        (2.0, 2750, 0.70),
+        (3.0, 3100, 0.86),
+        (4.0, 3500, 1.01),
+        (5.0, 3950, 1.16),
+        (6.0, 4400, 1.32),
+    ]
+    solver_iterations = 5  # Time of flight iterations per solve.
+    release_latency = 0.06  # seconds from the solve until the game piece leaves the launcher.
+    # The measured acceleration is about 40 ms old (half the motion estimator's window), so only part of it is
+    # trusted when extrapolating to the release. 1 would trust all of it, 0 would ignore it.
+    acceleration_scale = 0.5
+    target_location = [4.63, 4.03]  # Blue alliance target, meters. Flipped for red.
+    heading_offset = 0  # degrees between the robot's front and the direction the launcher fires.
 class LovelyIntakeConstants:
     feeding_id = 11
     feeding_encoder_id = 11
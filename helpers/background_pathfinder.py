@@ -0,0 +1,99 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Union
+import commands2
+from wpimath.geometry import Pose2d
+from pathplannerlib.auto import AutoBuilder
+from pathplannerlib.path import PathPlannerPath, PathConstraints, GoalEndState
+from pathplannerlib.pathfinders import LocalADStar, Pathfinder
+from pathplannerlib.pathfinding import Pathfinding
+from constants import PathfindingConstants
+from helpers.telemetry import Telemetry
+
+
+class BackgroundPathfinder:
+    """Runs pathfinding on a worker thread so the drivetrain never waits on the planner.
+
+    The pathfinder (and its navgrid) is started on the worker as soon as this is created, so the first request doesn't
+    pay for it. The request is made when the command is scheduled, from the pose at that moment. The command requires
+    nothing while the path is being planned, so the drive's default command keeps running, then schedules the path
+    following command the moment the path is ready. The path follower interrupts the default command in that same loop,
+    so there is no gap in drive output.
+    """
+
+    def __init__(self, pathfinder_factory: Callable[[], Pathfinder] = LocalADStar,
+                 follow: Callable[[PathPlannerPath], commands2.Command] = AutoBuilder.followPath) -> None:
+        """
+        pathfinder_factory: Builds the pathfinder. LocalADStar loads the navgrid from the deploy directory.
+        follow: Turns a finished path into a path following command.
+        """
+        self.follow = follow
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pathfinder")
+        self.pathfinder: Union[Pathfinder, None] = None
+        self.timeouts = 0
+        self.telemetry = Telemetry("Pathfinding")
+        self.timeouts_publisher = self.telemetry.double("Timeouts")
+        self.plan_time_publisher = self.telemetry.double("Last Plan Time")
+        self.ready = self.executor.submit(self._start, pathfinder_factory)
+
+    def _start(self, pathfinder_factory: Callable[[], Pathfinder]) -> None:
+        """Worker thread. Build the pathfinder and share it with PathPlanner's own pathfinding commands."""
+        self.pathfinder = pathfinder_factory()
+        Pathfinding.setPathfinder(self.pathfinder)
+
+    def _plan(self, start: Pose2d, target: Pose2d, constraints: PathConstraints) -> Union[PathPlannerPath, None]:
+        """Worker thread. Ask the pathfinder for a path and wait for it, up to the plan timeout."""
+        start_time = time.monotonic()
+        self.pathfinder.setStartPosition(start.translation())
+        self.pathfinder.setGoalPosition(target.translation())
+
+        deadline = start_time + PathfindingConstants.plan_timeout
+        while True:
+            if self.pathfinder.isNewPathAvailable():
+                path = self.pathfinder.getCurrentPath(constraints, GoalEndState(0, target.rotation()))
+                # The planner can still finish the previous goal after this one was set. Only a path that ends at our
+                # own target is ours.
+                if path is not None and path.getWaypoints()[-1].anchor.distance(target.translation()) < 1e-6:
+                    break
+            if time.monotonic() > deadline:
+                # Throw away a path that finished right at the deadline so it isn't handed to the next request. One that
+                # finishes later still ends at this target, which the next request's check above rejects.
+                if self.pathfinder.isNewPathAvailable():
+                    self.pathfinder.getCurrentPath(constraints, GoalEndState(0, target.rotation()))
+                self.timeouts += 1
+                self.timeouts_publisher.set(self.timeouts)
+                return None
+            time.sleep(PathfindingConstants.poll_period)
+
+        self.plan_time_publisher.set(time.monotonic() - start_time)
+        # Targets are already in field coordinates, like AutoBuilder.pathfindToPose.
+        path.preventFlipping = True
+        return path
+
+    def request(self, start: Pose2d, target: Pose2d, constraints: PathConstraints) -> Future:
+        """Queue a planning request. The future's result is the path, or None if the planner timed out."""
+        return self.executor.submit(self._plan, start, target, constraints)
+
+    def pathfind_command(self, start: Callable[[], Pose2d], target: Pose2d,
+                         constraints: PathConstraints) -> commands2.Command:
+        """Returns a command that plans from the robot's pose at the time it is scheduled to target in the background,
+        then follows the path.
+        start: Supplies the current robot pose. It's only read when the command initializes.
+        """
+        def plan_and_follow() -> commands2.Command:
+            future = self.request(start(), target, constraints)
+
+            def handoff() -> commands2.Command:
+                path = future.result()
+                if path is None:
+                    return commands2.cmd.none()
+                return self.follow(path)
+
+            # Neither the wait nor the proxy has requirements, which is what leaves the default command running until
+            # the path following command takes over.
+            return commands2.cmd.sequence(
+                commands2.cmd.waitUntil(future.done),
+                commands2.DeferredCommand(lambda: handoff().asProxy())
+            )
+
+        return commands2.DeferredCommand(plan_and_follow).withName("Background Pathfind")
@@ -0,0 +1,102 @@
+import rev
+from constants import CANConstants
+from helpers.telemetry import Telemetry
+
+# Which periodic status frame each SPARK signal travels in. A frame goes out at the fastest period of any of its
+# signals, so slowing a frame down means slowing down every signal in it.
+SIGNAL_FRAMES = {
+    "appliedOutput": 0,
+    "busVoltage": 0,
+    "outputCurrent": 0,
+    "motorTemperature": 0,
+    "limits": 0,
+    "faults": 1,
+    "warnings": 1,
+    "primaryEncoderVelocity": 2,
+    "primaryEncoderPosition": 2,
+    "analogVoltage": 3,
+    "analogVelocity": 3,
+    "analogPosition": 3,
+    "externalOrAltEncoderVelocity": 4,
+    "externalOrAltEncoderPosition": 4,
+    "absoluteEncoderPosition": 5,
+    "absoluteEncoderVelocity": 5,
+    "IAccumulation": 7,
+}
+
+
+class CANBudget:
+    """Plans the SPARK status frame periods for the whole robot and keeps the CAN bus under a load limit.
+
+    Each device declares the signals its code actually reads and how often it needs them. Those signals get the
+    requested period, every other signal is slowed to CANConstants.unused_period (faults and warnings never go slower
+    than CANConstants.fault_period, so problems still show up). The plan's bus load is estimated from the resulting
+    frame rates, and a device that would push the bus past CANConstants.max_bus_load is refused with a ValueError
+    before its config is touched.
+    """
+
+    def __init__(self) -> None:
+        self.devices: dict[str, dict[int, int]] = {}  # Device name -> frame -> period in ms.
+        self.telemetry = Telemetry("CANBudget")
+        self.load_publisher = self.telemetry.double("Estimated Bus Load")
+
+    def frame_periods(self, signals: dict[str, int]) -> dict[str, int]:
+        """Work out the period of every signal for a device that reads the given signals."""
+        for signal in signals:
+            if signal not in SIGNAL_FRAMES:
+                raise ValueError(f"Unknown SPARK signal {signal}")
+
+        periods = {}
+        for signal in SIGNAL_FRAMES:
+            if signal in signals:
+                periods[signal] = signals[signal]
+            elif signal in ("faults", "warnings"):
+                periods[signal] = CANConstants.fault_period
+            else:
+                periods[signal] = CANConstants.unused_period
+        return periods
+
+    @staticmethod
+    def frames(periods: dict[str, int]) -> dict[int, int]:
+        """Turn signal periods into frame periods, each frame going at its fastest signal's period."""
+        frames = {}
+        for signal, period in periods.items():
+            frame = SIGNAL_FRAMES[signal]
+            frames[frame] = min(period, frames.get(frame, period))
+        return frames
+
+    @staticmethod
+    def load(devices: dict[str, dict[int, int]]) -> float:
+        """Estimated fraction of the bus used by the status frames of the given devices."""
+        frames_per_second = sum(1000 / period for frames in devices.values() for period in frames.values())
+        return frames_per_second * CANConstants.frame_bits / CANConstants.bus_bitrate
+
+    def bus_load(self) -> float:
+        """Estimated fraction of the bus used by everything planned so far."""
+        return self.load(self.devices)
+
+    def plan(self, name: str, config: rev.SparkBaseConfig, signals: dict[str, int]) -> None:
+        """
+        Set a SPARK config's signal periods for what the device actually reads, and add it to the bus plan.
+        name: String, unique name of the device, e.g. "FL Drive".
+        config: The SparkFlexConfig or SparkMaxConfig that is about to be applied.
+        signals: Dictionary of signal name (see SIGNAL_FRAMES) to the period it's needed at, in ms.
+        """
+        periods = self.frame_periods(signals)
+        devices = dict(self.devices)
+        devices[name] = self.frames(periods)
+        load = self.load(devices)
+        if load > CANConstants.max_bus_load:
+            raise ValueError(f"Adding {name} puts the estimated CAN bus load at {load:.0%}, over the "
+                             f"{CANConstants.max_bus_load:.0%} limit")
+
+        # Set each frame once, through the first of its signals. REVLib uses the fastest period in a frame anyway, and
+        # setting a second signal in an already set frame fails with a variant error in this REVLib version.
+        frames = dict(devices[name])
+        for signal, frame in SIGNAL_FRAMES.items():
+            if frame in frames:
+                # The external encoder setters are the only ones without the PeriodMs suffix.
+                setter = getattr(config.signals, signal + "PeriodMs", None) or getattr(config.signals, signal)
+                setter(frames.pop(frame))
+        self.devices = devices
+        self.load_publisher.set(load)
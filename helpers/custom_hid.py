@@ -1,24 +1,55 @@
 import wpilib
 import math
+from wpilib import DriverStation, PS4Controller, XboxController
 from wpimath.filter import SlewRateLimiter
 
+# Name -> channel tables for each controller type, resolved once when the controller is set up.
+# Buttons are WPILib button numbers (1 based).
+BUTTONS = {
+    "xbox": {
+        "A": XboxController.Button.kA, "B": XboxController.Button.kB, "X": XboxController.Button.kX,
+        "Y": XboxController.Button.kY, "LB": XboxController.Button.kLeftBumper,
+        "RB": XboxController.Button.kRightBumper, "VIEW": XboxController.Button.kBack,
+        "MENU": XboxController.Button.kStart, "LTHUMB": XboxController.Button.kLeftStick,
+        "RTHUMB": XboxController.Button.kRightStick,
+    },
+    "ps4": {
+        "A": PS4Controller.Button.kCross, "B": PS4Controller.Button.kCircle, "X": PS4Controller.Button.kSquare,
+        "Y": PS4Controller.Button.kTriangle, "LB": PS4Controller.Button.kL1, "RB": PS4Controller.Button.kR1,
+        "VIEW": PS4Controller.Button.kShare, "MENU": PS4Controller.Button.kOptions, "LTHUMB": PS4Controller.Button.kL3,
+        "RTHUMB": PS4Controller.Button.kR3, "TOUCHPAD": PS4Controller.Button.kTouchpad,
+        "PS": PS4Controller.Button.kPS,
+    },
+    "generic": {},
+}
+AXES = {
+    "xbox": {"LX": 0, "LY": 1, "RX": 4, "RY": 5},
+    "ps4": {"LX": 0, "LY": 1, "RX": 2, "RY": 5},
+    "generic": {"LX": 0, "LY": 1, "RX": 4, "RY": 5},
+}
+# Triggers as (axis, scale, offset), mapped to 0 released to 1 pulled. PS4 triggers rest at -1.
+TRIGGERS = {
+    "xbox": {"L": (2, 1, 0), "R": (3, 1, 0)},
+    "ps4": {"L": (3, 0.5, 0.5), "R": (4, 0.5, 0.5)},
+    "generic": {"L": (2, 1, 0), "R": (3, 1, 0)},
+}
+D_PAD = {0: "N", 45: "NE", 90: "E", 135: "SE", 180: "S", 225: "SW", 270: "W", 315: "NW"}
+AXIS_COUNT = 6
+
 
 class CustomHID:
+    """A driver controller with the same button, stick and trigger names whatever the controller type.
+
+    update() reads the whole controller from the driver station once per cycle, and every query after that is served
+    from that snapshot through the tables above, so a value can't change partway through a loop. Call it once at the
+    start of robotPeriodic, before the scheduler runs.
+    """
     controller_type: str
     direction = 0
 
     def __init__(self, port: int, hid: str) -> None:
         super().__init__()
-        if hid == "xbox":
-            self.controller = wpilib.XboxController(port)
-            self.controller_type = "xbox"
-        elif hid == "ps4":
-            self.controller = wpilib.PS4Controller(port)
-            self.controller_type = "ps4"
-        else:
-            self.controller = wpilib.Joystick(port)
-            self.controller_type = "generic"
-
+        self.reset_controller(hid, port)
         self.slew_limiter = SlewRateLimiter(0.5, 0, 0)
 
     def reset_controller(self, hid, port):
@@ -31,188 +62,64 @@ class CustomHID:
         else:
             self.controller = wpilib.Joystick(port)
             self.controller_type = "generic"
+        self.port = port
+
+        # Resolve the tables for this controller type.
+        self.button_masks = {name: 1 << (button - 1) for name, button in BUTTONS[self.controller_type].items()}
+        self.axis_channels = AXES[self.controller_type]
+        self.trigger_channels = TRIGGERS[self.controller_type]
+
+        # Snapshot of the raw controller state.
+        self.buttons = 0
+        self.axes = [0.0] * AXIS_COUNT
+        self.d_pad = "Z"
+
+    def update(self) -> None:
+        """Read the controller state for this cycle."""
+        port = self.port
+        self.buttons = DriverStation.getStickButtons(port)
+        axes = self.axes
+        for axis in range(AXIS_COUNT):
+            axes[axis] = DriverStation.getStickAxis(port, axis)
+        self.d_pad = D_PAD.get(DriverStation.getStickPOV(port, 0), "Z")
 
     def get_button(self, button: str) -> bool:
-        value = False
-        if self.controller_type == "xbox":
-            if button == "A":
-                value = self.controller.getAButton()
-            if button == "B":
-                value = self.controller.getBButton()
-            if button == "X":
-                value = self.controller.getXButton()
-            if button == "Y":
-                value = self.controller.getYButton()
-            if button == "LB":
-                value = self.controller.getLeftBumper()
-            if button == "RB":
-                value = self.controller.getRightBumper()
-            if button == "VIEW":
-                value = self.controller.getBackButton()
-            if button == "MENU":
-                value = self.controller.getStartButton()
-            if button == "LTHUMB":
-                value = self.controller.getLeftStickButton()
-            if button == "RTHUMB":
-                value = self.controller.getRightStickButton()
-        if self.controller_type == "ps4":
-            if button == "A":
-                value = self.controller.getCrossButton()
-            if button == "B":
-                value = self.controller.getCircleButton()
-            if button == "X":
-                value = self.controller.getSquareButton()
-            if button == "Y":
-                value = self.controller.getTriangleButton()
-            if button == "LB":
-                value = self.controller.getL1Button()
-            if button == "RB":
-                value = self.controller.getR1Button()
-            if button == "VIEW":
-                value = self.controller.getShareButton()
-            if button == "MENU":
-                value = self.controller.getOptionsButton()
-            if button == "LTHUMB":
-                value = self.controller.getL3Button()
-            if button == "RTHUMB":
-                value = self.controller.getR3Button()
-            if button == "TOUCHPAD":
-                value = self.controller.getTouchpad()
-            if button == "PS":
-                value = self.controller.getPSButton()
-        return value
+        return bool(self.buttons & self.button_masks.get(button, 0))
 
     def get_trigger(self, trigger: str, threshold: float) -> bool:
-        value = False
-        if self.controller_type == "xbox" or "generic":
-            if trigger == "R":
-                if self.controller.getRawAxis(3) >= threshold:
-                    value = True
-            if trigger == "L":
-                if self.controller.getRawAxis(2) >= threshold:
-                    value = True
-        if self.controller_type == "ps4":
-            if trigger == "R":
-                axis = self.controller.getR2Axis()
-                if axis < 0:
-                    axis = (axis * -1) * 0.5
-                else:
-                    axis = (axis * 0.5) + 0.5
-                if axis >= threshold:
-                    value = True
-            if trigger == "L":
-                axis = self.controller.getL2Axis()
-                if axis < 0:
-                    axis = (axis * -1) * 0.5
-                else:
-                    axis = (axis * 0.5) + 0.5
-                if axis >= threshold:
-                    value = True
-        return value
+        return self._trigger(trigger) >= threshold
+
+    def _trigger(self, trigger: str) -> float:
+        """Trigger position from the snapshot, 0 released to 1 pulled."""
+        channel = self.trigger_channels.get(trigger)
+        if channel is None:
+            return 0.0
+        axis, scale, offset = channel
+        return self.axes[axis] * scale + offset
 
     def get_trigger_raw(self, trigger: str, threshold: float) -> float:
-        value = 0
-        if self.controller_type == "xbox" or "generic":
-            if trigger == "R":
-                axis = self.controller.getRawAxis(3)
-                if self.controller.getRawAxis(3) >= threshold:
-                    value = axis
-            if trigger == "L":
-                axis = self.controller.getRawAxis(2)
-                if self.controller.getRawAxis(2) >= threshold:
-                    value = axis
-        if self.controller_type == "ps4":
-            if trigger == "R":
-                axis = self.controller.getR2Axis()
-                if axis < 0:
-                    axis = (axis * -1) * 0.5
-                else:
-                    axis = (axis * 0.5) + 0.5
-                if axis >= threshold:
-                    value = axis
-            if trigger == "L":
-                axis = self.controller.getL2Axis()
-                if axis < 0:
-                    axis = (axis * -1) * 0.5
-                else:
-                    axis = (axis * 0.5) + 0.5
-                if axis >= threshold:
-                    value = axis
-        return value
+        value = self._trigger(trigger)
+        return value if value >= threshold else 0
 
     def get_axis(self, axis: str, deadband: float) -> float:
-        value = 0.0
-        if self.controller_type == "xbox" or "generic":
-            if axis == "LX":
-                if abs(self.controller.getRawAxis(0)) >= deadband:
-                    value = self.controller.getRawAxis(0)
-            if axis == "LY":
-                if abs(self.controller.getRawAxis(1)) >= deadband:
-                    value = self.controller.getRawAxis(1)
-            if axis == "RX":
-                if abs(self.controller.getRawAxis(4)) >= deadband:
-                    value = self.controller.getRawAxis(4)
-            if axis == "RY":
-                if abs(self.controller.getRawAxis(5)) >= deadband:
-                    value = self.controller.getRawAxis(5)
-        if self.controller_type == "ps4":
-            if axis == "LX":
-                if abs(self.controller.getRawAxis(0)) >= deadband:
-                    value = self.controller.getRawAxis(0)
-            if axis == "LY":
-                if abs(self.controller.getRawAxis(1)) >= deadband:
-                    value = self.controller.getRawAxis(1)
-            if axis == "RX":
-                if abs(self.controller.getRawAxis(2)) >= deadband:
-                    value = self.controller.getRawAxis(2)
-            if axis == "RY":
-                if abs(self.controller.getRawAxis(5)) >= deadband:
-                    value = self.controller.getRawAxis(5)
-        return value
+        channel = self.axis_channels.get(axis)
+        if channel is None:
+            return 0.0
+        value = self.axes[channel]
+        return value if abs(value) >= deadband else 0.0
 
     def get_axis_triggered(self, axis: str, deadband: float) -> bool:
-        if self.get_axis(axis, deadband) <= -1 * deadband or self.get_axis(axis, deadband) >= deadband:
-            return True
-        else:
-            return False
+        return abs(self.get_axis(axis, deadband)) >= deadband
 
     def get_axis_squared(self, axis: str, deadband: float) -> float:
         stored = self.get_axis(axis, deadband)
-        if stored < 0:
-            scalar = -1
-        else:
-            scalar = 1
-        return stored * stored * scalar
+        return stored * abs(stored)
 
-    
     def get_d_pad(self) -> str:
-        value = "Z"
-        if self.controller.getPOV() == 0:
-            value = "N"
-        if self.controller.getPOV() == 45:
-            value = "NE"
-        if self.controller.getPOV() == 90:
-            value = "E"
-        if self.controller.getPOV() == 135:
-            value = "SE"
-        if self.controller.getPOV() == 180:
-            value = "S"
-        if self.controller.getPOV() == 225:
-            value = "SW"
-        if self.controller.getPOV() == 270:
-            value = "W"
-        if self.controller.getPOV() == 315:
-            value = "NW"
-        return value
-    
-
-    
+        return self.d_pad
+
     def get_d_pad_pull(self, direction: str):
-        if self.get_d_pad() == direction:
-            return True
-        else:
-            return False
-    
+        return self.d_pad == direction
 
     def set_rumble(self, strength: float) -> None:
         if self.controller_type == "xbox":
@@ -0,0 +1,69 @@
+from navx import AHRS
+from wpilib import Timer
+from wpimath.geometry import Pose2d, Rotation2d
+from wpimath.kinematics import ChassisSpeeds, SwerveModulePosition, SwerveModuleState
+from helpers.pose_estimator import PoseEstimator
+from helpers.swerve_kinematics import FastSwerveKinematics
+from subsystems.swervemodule import SwerveModule
+
+
+class DriveSnapshot:
+    """Read-once copy of every drivetrain sensor value. Refreshed once at the start of each DriveSubsystem.periodic so
+    that the drive methods and periodic helpers never have to go back to the hardware during the same loop."""
+
+    def __init__(self, modules: tuple, gyro: AHRS, pose_estimator: PoseEstimator,
+                 kinematics: FastSwerveKinematics) -> None:
+        """
+        modules: Tuple of the four SwerveModules, in FL, FR, BL, BR order.
+        gyro: The navX the drivetrain uses for heading.
+        pose_estimator: The PoseEstimator the drivetrain feeds.
+        kinematics: The drivetrain's kinematics, used to turn module states into chassis speeds.
+        """
+        self.modules = modules
+        self.gyro = gyro
+        self.pose_estimator = pose_estimator
+        self.kinematics = kinematics
+
+        # Raw sensor reads, and the FPGA time they were taken at.
+        self.timestamp = 0.0
+        self.module_states = tuple(SwerveModuleState() for _ in modules)
+        self.module_positions = tuple(SwerveModulePosition() for _ in modules)
+        self.yaw = 0.0
+        self.yaw_rate = 0.0  # degrees per second, same sign as yaw.
+        self.yaw_sensor_time = 0.0  # The navX's own timestamp for the yaw, only good for spotting new samples.
+        self.roll = 0.0
+
+        # Values derived from the raw reads.
+        self.pose = Pose2d()
+        self.heading = Rotation2d()
+        self.chassis_speeds = ChassisSpeeds()
+        self.field_velocity = (0.0, 0.0, 0.0)
+
+    def refresh_sensors(self) -> None:
+        """Read every module encoder and the gyro exactly once."""
+        self.timestamp = Timer.getFPGATimestamp()
+        self.module_states, self.module_positions = SwerveModule.refresh_all(self.modules)
+        self.yaw = self.gyro.getYaw()
+        self.yaw_rate = self.gyro.getRate()
+        self.yaw_sensor_time = self.gyro.getLastSensorTimestamp()
+        self.roll = self.gyro.getRoll()
+        self.chassis_speeds = self.kinematics.to_chassis_speeds([state.speed for state in self.module_states],
+                                                                [state.angle.radians() for state in self.module_states])
+
+    def refresh_pose(self) -> None:
+        """Copy the pose estimator's output. Call after the estimator has been updated with this cycle's sensors."""
+        self.pose = self.pose_estimator.get_pose()
+        self.heading = self.pose.rotation()
+
+        # Rotate the robot relative chassis speeds into the field frame using the heading we just copied.
+        cos = self.heading.cos()
+        sin = self.heading.sin()
+        speeds = self.chassis_speeds
+        self.field_velocity = (speeds.vx * cos - speeds.vy * sin,
+                               speeds.vy * cos + speeds.vx * sin,
+                               speeds.omega)
+
+    def refresh(self) -> None:
+        """Full refresh without updating odometry. Used at startup and after a pose reset."""
+        self.refresh_sensors()
+        self.refresh_pose()
@@ -0,0 +1,69 @@
+import math
+from wpilib import Field2d, SmartDashboard, Timer
+from wpimath.geometry import Pose2d
+from pathplannerlib.logging import PathPlannerLogging
+from constants import FieldDisplayConstants
+
+
+class FieldVisualizer:
+    """Keeps the dashboard Field2d up to date without republishing it every loop.
+
+    The PathPlanner logging callbacks are registered once here instead of every cycle. Robot and target poses are only
+    sent when they have moved more than the configured tolerance, and no faster than the configured rate. Long paths
+    are thinned out before they are sent.
+    """
+
+    def __init__(self, field: Field2d) -> None:
+        self.field = field
+        self.path_object = field.getObject("path")
+        self.target_object = field.getObject("target")
+
+        self.publish_period = 1 / FieldDisplayConstants.publish_rate
+        self.translation_tolerance = FieldDisplayConstants.translation_tolerance
+        self.rotation_tolerance = math.radians(FieldDisplayConstants.rotation_tolerance)
+        self.max_path_poses = FieldDisplayConstants.max_path_poses
+
+        # Last published values. None forces the first publish through.
+        self.last_robot_pose = None
+        self.last_robot_time = 0.0
+        self.last_target_pose = None
+        self.last_target_time = 0.0
+
+        # The Field2d keeps itself updated on the dashboard once it has been added, so this only has to happen once.
+        SmartDashboard.putData("Field", self.field)
+
+        PathPlannerLogging.setLogActivePathCallback(self.set_active_path)
+        PathPlannerLogging.setLogTargetPoseCallback(self.set_target_pose)
+        PathPlannerLogging.setLogCurrentPoseCallback(self.set_robot_pose)
+
+    def moved(self, last_pose: Pose2d, pose: Pose2d) -> bool:
+        """Returns true if the pose has changed by more than the tolerance since it was last published."""
+        if last_pose is None:
+            return True
+        if math.hypot(pose.X() - last_pose.X(), pose.Y() - last_pose.Y()) > self.translation_tolerance:
+            return True
+        return abs((pose.rotation() - last_pose.rotation()).radians()) > self.rotation_tolerance
+
+    def set_robot_pose(self, pose: Pose2d) -> None:
+        """Show the robot at the given pose, if it has moved and the publish period has passed."""
+        now = Timer.getFPGATimestamp()
+        if now - self.last_robot_time >= self.publish_period and self.moved(self.last_robot_pose, pose):
+            self.field.setRobotPose(pose)
+            self.last_robot_pose = pose
+            self.last_robot_time = now
+
+    def set_target_pose(self, pose: Pose2d) -> None:
+        """PathPlanner callback. Show the pose the path follower is currently aiming for."""
+        now = Timer.getFPGATimestamp()
+        if now - self.last_target_time >= self.publish_period and self.moved(self.last_target_pose, pose):
+            self.target_object.setPose(pose)
+            self.last_target_pose = pose
+            self.last_target_time = now
+
+    def set_active_path(self, poses: list[Pose2d]) -> None:
+        """PathPlanner callback. Show the active path, thinned out to at most max_path_poses poses. The end of the
+        path is always kept."""
+        if len(poses) > self.max_path_poses:
+            step = math.ceil(len(poses) / (self.max_path_poses - 1))
+            poses = poses[:-1:step] + [poses[-1]]
+        self.path_object.setPoses(poses)
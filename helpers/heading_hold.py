@@ -0,0 +1,68 @@
+import math
+from wpimath.controller import ProfiledPIDController
+from wpimath.trajectory import TrapezoidProfile
+from constants import DriveConstants, HeadingHoldConstants
+
+
+class HeadingHold:
+    """Closed loop heading hold, used once the driver lets go of the rotation stick.
+
+    Works directly off the navX yaw and yaw rate. When the hold engages, the heading the robot will settle at is
+    projected from the current rate and the profile's deceleration, and a motion profile brings the robot to a stop
+    there instead of slamming a PID target in front of it. Every heading is pushed forward by the age of the gyro
+    sample plus the actuation latency, so the controller acts on where the robot will be when the output lands.
+
+    Headings follow the navX convention (degrees, clockwise positive). The output is a rotation command in the same
+    units and sign as drive_2ok's rot argument, so clockwise (positive) heading rate comes from a negative command.
+    """
+
+    def __init__(self) -> None:
+        self.controller = ProfiledPIDController(DriveConstants.clt_controller_PID[0],
+                                                DriveConstants.clt_controller_PID[1],
+                                                DriveConstants.clt_controller_PID[2],
+                                                TrapezoidProfile.Constraints(HeadingHoldConstants.max_velocity,
+                                                                             HeadingHoldConstants.max_acceleration))
+        self.controller.enableContinuousInput(-180, 180)
+        self.latency = HeadingHoldConstants.actuation_latency
+        self.sensor_latency = HeadingHoldConstants.sensor_latency
+
+        self.holding = False
+        self.target = 0.0
+
+        # The navX timestamps samples with its own clock, so all we can use it for is spotting a new sample. The
+        # FPGA time a sample was first seen at gives its age.
+        self.last_sensor_time = None
+        self.sample_seen_at = 0.0
+
+    def release(self) -> None:
+        """Stop holding. The next calculate call projects a new settle target from wherever the robot is then."""
+        self.holding = False
+
+    def settle_target(self, heading: float, rate: float) -> float:
+        """Heading the robot stops at if it decelerates at the profile's max acceleration from the given state."""
+        return heading + rate * abs(rate) / (2 * HeadingHoldConstants.max_acceleration)
+
+    def calculate(self, heading: float, rate: float, sensor_time: float, now: float) -> float:
+        """
+        Returns the rotation command that holds the heading.
+        heading: Float, degrees, gyro heading.
+        rate: Float, degrees per second, gyro yaw rate.
+        sensor_time: Float, the gyro's timestamp for the heading and rate. Only compared against itself.
+        now: Float, current FPGA time in seconds.
+        """
+        if sensor_time != self.last_sensor_time:
+            self.last_sensor_time = sensor_time
+            self.sample_seen_at = now
+        age = now - self.sample_seen_at + self.sensor_latency
+
+        # Where the robot will be pointing when this output takes effect.
+        projected = heading + rate * (age + self.latency)
+
+        if not self.holding:
+            self.target = self.settle_target(projected, rate)
+            self.controller.reset(projected, rate)
+            self.holding = True
+
+        feedback = self.controller.calculate(projected, self.target)
+        feedforward = math.radians(self.controller.getSetpoint().velocity)
+        return -(feedforward + feedback)
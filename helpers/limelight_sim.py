@@ -0,0 +1,147 @@
+import math
+import random
+from typing import Callable
+from ntcore import NetworkTableInstance, PubSubOptions
+from wpimath.geometry import Pose2d
+from constants import SimConstants
+
+
+class LimelightSim:
+    """Stands in for a Limelight on the local NetworkTables instance, so LimelightCamera, the vision queue and
+    VisionManager can be run and benchmarked without a camera.
+
+    Frames are captured at the configured rate from the robot pose the pose_supplier gives, using the tag layout in
+    SimConstants.tags. Each frame is published once its pipeline and capture latency have passed, stamped with that
+    arrival time, so the camera's latency compensation lands back on the capture time. Publishes botpose_wpiblue and
+    t2d, which LimelightCamera reads, plus the individual tx, ty, ta, hb, tl and cl topics. Setting connected to False
+    stops all publishing, like an unplugged camera.
+    """
+
+    def __init__(self, name: str, pose_supplier: Callable[[], Pose2d], fps: float = SimConstants.camera_fps,
+                 pipeline_latency: float = SimConstants.camera_pipeline_latency,
+                 capture_latency: float = SimConstants.camera_capture_latency,
+                 xy_noise: float = SimConstants.camera_xy_noise,
+                 heading_noise: float = SimConstants.camera_heading_noise,
+                 dropout: float = SimConstants.camera_dropout, seed: int = 0) -> None:
+        """
+        name: Limelight NetworkTables name.
+        pose_supplier: Returns the true robot pose, blue origin.
+        fps: Frames captured per second.
+        pipeline_latency, capture_latency: Seconds, published as tl and cl.
+        xy_noise: Meters of pose noise per meter squared of average tag distance.
+        heading_noise: Degrees of heading noise.
+        dropout: Chance each frame is lost.
+        seed: Random seed, so runs are reproducible.
+        """
+        self.pose_supplier = pose_supplier
+        self.period = 1 / fps
+        self.pipeline_latency = pipeline_latency
+        self.capture_latency = capture_latency
+        self.latency = pipeline_latency + capture_latency
+        self.xy_noise = xy_noise
+        self.heading_noise = heading_noise
+        self.dropout = dropout
+        self.random = random.Random(seed)
+        self.connected = True
+
+        self.half_fov = tuple(math.radians(angle) / 2 for angle in SimConstants.camera_fov)
+        # A tag at 1 m fills this percent of the image, and it falls off with distance squared.
+        self.area_at_1m = 100 * SimConstants.tag_size ** 2 / \
+            (4 * math.tan(self.half_fov[0]) * math.tan(self.half_fov[1]))
+
+        table = NetworkTableInstance.getDefault().getTable(name)
+        options = PubSubOptions(keepDuplicates=True)
+        self.botpose = table.getDoubleArrayTopic("botpose_wpiblue").publish(options)
+        self.t2d = table.getDoubleArrayTopic("t2d").publish(options)
+        self.tx = table.getDoubleTopic("tx").publish(options)
+        self.ty = table.getDoubleTopic("ty").publish(options)
+        self.ta = table.getDoubleTopic("ta").publish(options)
+        self.hb = table.getIntegerTopic("hb").publish(options)
+        self.tl = table.getDoubleTopic("tl").publish(options)
+        self.cl = table.getDoubleTopic("cl").publish(options)
+
+        self.next_capture = 0.0
+        self.pending = []  # (capture time, botpose, t2d) waiting out their latency.
+        self.heartbeat = 0
+        self.published = 0
+        self.dropped = 0
+
+    def visible_tags(self, pose: Pose2d) -> list[tuple[float, float, float]]:
+        """Return (distance, bearing, tag height) of every tag the camera sees from the pose. Bearing is radians,
+        counterclockwise from the camera's forward axis."""
+        x = pose.X()
+        y = pose.Y()
+        heading = pose.rotation().radians()
+        visible = []
+        for _, tag_x, tag_y, tag_z, facing in SimConstants.tags:
+            dx = tag_x - x
+            dy = tag_y - y
+            distance = math.hypot(dx, dy)
+            if distance > SimConstants.camera_max_distance or distance == 0:
+                continue
+            # The robot has to be in front of the tag, and the tag inside the field of view.
+            if math.cos(math.atan2(-dy, -dx) - math.radians(facing)) < 0.17:
+                continue
+            bearing = math.remainder(math.atan2(dy, dx) - heading, math.tau)
+            elevation = math.atan2(tag_z - SimConstants.camera_height, distance)
+            if abs(bearing) > self.half_fov[0] or abs(elevation) > self.half_fov[1]:
+                continue
+            visible.append((distance, bearing, elevation))
+        return visible
+
+    def capture(self, now: float) -> None:
+        """Take a frame from the current pose."""
+        pose = self.pose_supplier()
+        tags = self.visible_tags(pose)
+        ms = (self.pipeline_latency * 1000, self.capture_latency * 1000)
+        if not tags:
+            self.pending.append((now, [0.0] * 11, [0.0, 0.0, *ms] + [0.0] * 5))
+            return
+
+        count = len(tags)
+        distance = sum(tag[0] for tag in tags) / count
+        area = sum(self.area_at_1m / tag[0] ** 2 for tag in tags) / count
+        xy_std = self.xy_noise * distance * distance / count
+        gauss = self.random.gauss
+        botpose = [pose.X() + gauss(0, xy_std), pose.Y() + gauss(0, xy_std), 0.0, 0.0, 0.0,
+                   pose.rotation().degrees() + gauss(0, self.heading_noise), self.latency * 1000, float(count), 0.0,
+                   distance, area]
+
+        nearest_distance, bearing, elevation = min(tags)
+        t2d = [1.0, float(count), *ms, -math.degrees(bearing), math.degrees(elevation), 0.0, 0.0,
+               self.area_at_1m / nearest_distance ** 2]
+        self.pending.append((now, botpose, t2d))
+
+    def update(self, now: float) -> int:
+        """Capture any frame that is due and publish the ones whose latency has passed. Returns how many were
+        published. Call every sim step."""
+        if not self.connected:
+            self.pending.clear()
+            self.next_capture = now
+            return 0
+
+        if now >= self.next_capture:
+            self.next_capture += self.period
+            if self.next_capture <= now:  # Fell behind, e.g. just reconnected. Start the frame clock again from now.
+                self.next_capture = now + self.period
+            if self.random.random() < self.dropout:
+                self.dropped += 1
+            else:
+                self.capture(now)
+
+        published = 0
+        while self.pending and self.pending[0][0] + self.latency <= now:
+            capture_time, botpose, t2d = self.pending.pop(0)
+            arrival = round((capture_time + self.latency) * 1e6)
+            self.heartbeat += 1
+            self.botpose.set(botpose, arrival)
+            self.t2d.set(t2d, arrival)
+            self.tx.set(t2d[4], arrival)
+            self.ty.set(t2d[5], arrival)
+            self.ta.set(t2d[8], arrival)
+            self.hb.set(self.heartbeat, arrival)
+            self.tl.set(t2d[2], arrival)
+            self.cl.set(t2d[3], arrival)
+            published += 1
+        self.published += published
+        return published
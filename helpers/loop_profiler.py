@@ -0,0 +1,189 @@
+import time
+import weakref
+from bisect import bisect_left
+from typing import Callable
+from commands2 import Command, CommandScheduler, Subsystem
+from constants import ProfilerConstants
+from helpers.telemetry import Telemetry
+
+
+class LoopHistogram:
+    """Fixed-size run time histogram. The buckets are allocated once, so recording a sample never allocates."""
+
+    def __init__(self, bucket_edges: tuple[float, ...]) -> None:
+        """
+        bucket_edges: Tuple of increasing bucket upper edges in seconds. Shared between histograms.
+        """
+        self.bucket_edges = bucket_edges
+        self.counts = [0] * (len(bucket_edges) + 1)
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, duration: float) -> None:
+        """Add a single run time sample, in seconds."""
+        self.counts[bisect_left(self.bucket_edges, duration)] += 1
+        self.count += 1
+        if duration > self.max:
+            self.max = duration
+
+    def percentile(self, fraction: float) -> float:
+        """Returns the upper edge of the bucket holding the given fraction (0 to 1) of samples, in seconds."""
+        if self.count == 0:
+            return 0.0
+        target = fraction * self.count
+        running = 0
+        for index, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target:
+                # Samples past the last edge only have the max to describe them.
+                if index == len(self.bucket_edges):
+                    return self.max
+                return min(self.bucket_edges[index], self.max)
+        return self.max
+
+    def summary(self) -> list[float]:
+        """Returns [p50, p95, p99, max] in milliseconds, followed by the sample count."""
+        return [self.percentile(0.5) * 1000,
+                self.percentile(0.95) * 1000,
+                self.percentile(0.99) * 1000,
+                self.max * 1000,
+                self.count]
+
+    def reset(self) -> None:
+        for index in range(len(self.counts)):
+            self.counts[index] = 0
+        self.count = 0
+        self.max = 0.0
+
+
+class LoopProfiler:
+    """Times every piece of a scheduler loop: each watched subsystem's periodic, each command's execute and each
+    profiled trigger condition, plus the button poll and the scheduler run as a whole.
+
+    Timing is installed by shadowing the bound methods on each instance, so when the profiler is disabled the
+    wrappers are removed and the scheduler runs exactly as it would without it.
+    """
+
+    def __init__(self) -> None:
+        self.scheduler = CommandScheduler.getInstance()
+        self.button_loop = self.scheduler.getDefaultButtonLoop()
+
+        # Log spaced bucket edges from bucket_min to bucket_max. Every histogram shares the same edges.
+        ratio = ProfilerConstants.bucket_max / ProfilerConstants.bucket_min
+        self.bucket_edges = tuple(ProfilerConstants.bucket_min * ratio ** (index / (ProfilerConstants.bucket_count - 1))
+                                  for index in range(ProfilerConstants.bucket_count))
+        self.histograms: dict[str, LoopHistogram] = {}
+
+        # The summary goes out at a low rate through the SLOW telemetry tier.
+        self.telemetry = Telemetry("Profiler", ProfilerConstants.publish_rate)
+        self.publishers = {}
+
+        self.subsystems: list[Subsystem] = []
+        # Weak, so commands built at runtime (pathfinding etc.) are dropped once nothing else holds them.
+        self.commands: weakref.WeakSet[Command] = weakref.WeakSet()
+        self.enabled = False
+        self.scheduler.onCommandInitialize(self._watch_command)
+
+        if ProfilerConstants.enabled:
+            self.enable()
+
+    def histogram(self, name: str) -> LoopHistogram:
+        """Returns the histogram for a name, creating it and its publisher the first time it is seen."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = LoopHistogram(self.bucket_edges)
+            self.histograms[name] = histogram
+            self.publishers[name] = self.telemetry.double_array(name)
+        return histogram
+
+    def _timed(self, name: str, function: Callable) -> Callable:
+        """Wraps a function so every call is recorded in the named histogram."""
+        histogram = self.histogram(name)
+
+        def timed(*args):
+            start = time.perf_counter()
+            result = function(*args)
+            histogram.record(time.perf_counter() - start)
+            return result
+
+        return timed
+
+    def watch(self, *subsystems: Subsystem) -> None:
+        """Time the periodic of the given subsystems."""
+        for subsystem in subsystems:
+            if subsystem not in self.subsystems:
+                self.subsystems.append(subsystem)
+                if self.enabled:
+                    subsystem.periodic = self._timed(f"{subsystem.getName()}.periodic", subsystem.periodic)
+
+    def condition(self, name: str, condition: Callable[[], bool]) -> Callable[[], bool]:
+        """Wrap a trigger condition so its poll is timed. Pass the result to button.Trigger in place of the
+        condition. Triggers hold on to their condition, so this wrapper checks the enabled flag itself."""
+        histogram = self.histogram(f"{name}.poll")
+
+        def timed() -> bool:
+            if not self.enabled:
+                return condition()
+            start = time.perf_counter()
+            result = condition()
+            histogram.record(time.perf_counter() - start)
+            return result
+
+        return timed
+
+    def _watch_command(self, command: Command) -> None:
+        """Scheduler callback. Times a command's execute the first time it is initialized."""
+        if self.enabled and command not in self.commands:
+            self.commands.add(command)
+            command.execute = self._timed(f"{command.getName()}.execute", command.execute)
+
+    def poll(self) -> None:
+        """Stands in for the scheduler's button loop so the whole button poll is timed."""
+        start = time.perf_counter()
+        self.button_loop.poll()
+        self.buttons.record(time.perf_counter() - start)
+
+    def enable(self) -> None:
+        """Install timing on everything being watched."""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.loop = self.histogram("Scheduler.run")
+        self.buttons = self.histogram("Buttons.poll")
+        self.scheduler.setActiveButtonLoop(self)
+        for subsystem in self.subsystems:
+            subsystem.periodic = self._timed(f"{subsystem.getName()}.periodic", subsystem.periodic)
+
+    def disable(self) -> None:
+        """Remove all timing wrappers. Commands will be re-wrapped the next time they are initialized after an
+        enable()."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self.scheduler.setActiveButtonLoop(self.button_loop)
+        for item in self.subsystems:
+            del item.periodic
+        for item in list(self.commands):
+            del item.execute
+        self.commands.clear()
+
+    def reset(self) -> None:
+        """Clear every histogram, e.g. at the start of a match."""
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def run_scheduler(self) -> None:
+        """Run one scheduler loop. Replaces CommandScheduler.getInstance().run() in Robot.robotPeriodic."""
+        if not self.enabled:
+            self.scheduler.run()
+            return
+
+        start = time.perf_counter()
+        self.scheduler.run()
+        end = time.perf_counter()
+        self.loop.record(end - start)
+
+        self.telemetry.start_cycle(end)
+        if self.telemetry.active(Telemetry.SLOW):
+            for name, histogram in self.histograms.items():
+                self.publishers[name].set(histogram.summary())
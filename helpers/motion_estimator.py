@@ -0,0 +1,108 @@
+from constants import MotionEstimatorConstants
+
+
+class MotionEstimator:
+    """Estimates the robot's field relative velocity and acceleration from a timestamped history of velocity samples.
+
+    Samples go into a fixed-size ring buffer. Velocity and acceleration come from a least squares line fit over the
+    newest filter_window samples (a first order Savitzky-Golay filter that also handles uneven loop times). The
+    velocity is the fit evaluated at the newest sample. The acceleration is the slope of the fit, which describes the
+    middle of the window, so it lags by `delay` seconds.
+    """
+
+    def __init__(self) -> None:
+        self.capacity = MotionEstimatorConstants.history_size
+        self.window = MotionEstimatorConstants.filter_window
+
+        # Ring buffer. head is where the next sample goes, count is how many are valid.
+        self.times = [0.0] * self.capacity
+        self.samples = ([0.0] * self.capacity, [0.0] * self.capacity, [0.0] * self.capacity)  # vx, vy, omega
+        self.head = 0
+        self.count = 0
+
+        # Latest filter outputs.
+        self.vx = 0.0
+        self.vy = 0.0
+        self.omega = 0.0
+        self.ax = 0.0
+        self.ay = 0.0
+        self.alpha = 0.0
+        self.delay = 0.0
+
+    def reset(self) -> None:
+        """Forget all samples, e.g. after a pose reset."""
+        self.head = 0
+        self.count = 0
+        self.vx = self.vy = self.omega = 0.0
+        self.ax = self.ay = self.alpha = 0.0
+        self.delay = 0.0
+
+    def _index(self, logical: int) -> int:
+        """Turn a logical index (0 is the oldest sample) into a buffer index."""
+        return (self.head - self.count + logical) % self.capacity
+
+    def add(self, timestamp: float, vx: float, vy: float, omega: float) -> None:
+        """Add a field relative velocity sample and update the filter outputs. Samples that are not newer than the
+        last one are ignored, so a repeated timestamp can never cause a divide by zero."""
+        if self.count and timestamp <= self.times[self._index(self.count - 1)]:
+            return
+
+        self.times[self.head] = timestamp
+        self.samples[0][self.head] = vx
+        self.samples[1][self.head] = vy
+        self.samples[2][self.head] = omega
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+        (self.vx, self.vy, self.omega), (self.ax, self.ay, self.alpha), center = self._fit(self.count - 1, timestamp)
+        self.delay = timestamp - center
+
+    def _fit(self, last: int, at_time: float) -> tuple[tuple[float, float, float], tuple[float, float, float], float]:
+        """Least squares line fit over up to `window` samples ending at logical index `last`.
+        Returns the fitted (vx, vy, omega) at at_time, the slopes (ax, ay, alpha) and the mean time of the window."""
+        first = max(0, last - self.window + 1)
+        n = last - first + 1
+        indexes = [self._index(logical) for logical in range(first, last + 1)]
+
+        mean_t = sum(self.times[index] for index in indexes) / n
+        sum_tt = 0.0
+        for index in indexes:
+            sum_tt += (self.times[index] - mean_t) ** 2
+
+        values = []
+        slopes = []
+        for channel in self.samples:
+            mean_v = sum(channel[index] for index in indexes) / n
+            if sum_tt > 0:
+                slope = sum((self.times[index] - mean_t) * (channel[index] - mean_v) for index in indexes) / sum_tt
+            else:
+                slope = 0.0
+            values.append(mean_v + slope * (at_time - mean_t))
+            slopes.append(slope)
+        return tuple(values), tuple(slopes), mean_t
+
+    def state_at(self, timestamp: float) -> tuple[float, float, float, float, float, float]:
+        """Returns (vx, vy, omega, ax, ay, alpha) at the given time. Inside the history this is the filter centered on
+        that time; past the newest sample the velocity is extrapolated with the current acceleration."""
+        if self.count == 0:
+            return 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
+
+        newest = self.times[self._index(self.count - 1)]
+        if timestamp >= newest:
+            dt = timestamp - newest
+            return (self.vx + self.ax * dt, self.vy + self.ay * dt, self.omega + self.alpha * dt,
+                    self.ax, self.ay, self.alpha)
+
+        # Binary search for the newest sample at or before the timestamp.
+        low, high = 0, self.count - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.times[self._index(middle)] <= timestamp:
+                low = middle
+            else:
+                high = middle - 1
+
+        # Center the window on that sample, as far as the history allows.
+        last = min(self.count - 1, low + self.window // 2)
+        (vx, vy, omega), (ax, ay, alpha), _ = self._fit(last, timestamp)
+        return vx, vy, omega, ax, ay, alpha
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import time
+from typing import Union
+import rev
+from wpilib import RobotBase, getOperatingDirectory
+from constants import MotorConfigConstants
+from helpers.telemetry import Telemetry
+
+
+class MotorConfigManager:
+    """Applies SPARK configs at boot without rewriting flash every time.
+
+    Each device's config is hashed (from config.flatten()) together with the device's signature (serial number,
+    firmware and a couple of parameters read back from it), and compared with the hash stored the last time that
+    device's config was persisted. The signature catches a swapped or factory reset SPARK on the same CAN ID, whose
+    flash no longer holds the config even though the config itself didn't change. Unchanged configs are sent with
+    configureAsync and no persist, so the eight drive controllers are configured back to back without waiting on each
+    other or on flash writes. Changed configs are sent with a blocking configure that persists, and their new hash is
+    only stored once the SPARK reports success. Call finish() after the last device to save the hashes and report how
+    long each device took.
+    """
+
+    def __init__(self, store_path: Union[str, None] = None) -> None:
+        """
+        store_path: File the persisted hashes are kept in. Defaults to MotorConfigConstants.hash_file in the
+        operating directory on the robot. In simulation nothing is stored unless a path is given.
+        """
+        if store_path is None and RobotBase.isReal():
+            store_path = os.path.join(getOperatingDirectory(), MotorConfigConstants.hash_file)
+        self.store_path = store_path
+        self.hashes: dict[str, str] = {}
+        if self.store_path is not None and os.path.exists(self.store_path):
+            try:
+                with open(self.store_path) as store:
+                    self.hashes = json.load(store)
+            except (OSError, ValueError):
+                # A bad store just means everything gets persisted once more.
+                self.hashes = {}
+
+        self.times: dict[str, float] = {}
+        self.persisted: list[str] = []
+        self.start_time = time.perf_counter()
+        self.telemetry = Telemetry("MotorConfig")
+        self.total_time_publisher = self.telemetry.double("Total Config Time")
+        self.persisted_publisher = self.telemetry.double("Devices Persisted")
+
+    @staticmethod
+    def config_hash(config: rev.SparkBaseConfig) -> str:
+        """Hash of everything the config sets."""
+        return hashlib.sha256(config.flatten().encode()).hexdigest()
+
+    @staticmethod
+    def device_signature(spark: rev.SparkBase) -> str:
+        """Serial number and firmware of the SPARK, plus the current limit and idle mode in its flash. Every config
+        sets both, and a factory reset puts them back to 80 A and coast."""
+        accessor = spark.configAccessor
+        return (f"{spark.getSerialNumber()}:{spark.getFirmwareVersion()}:"
+                f"{accessor.getSmartCurrentLimit()}:{accessor.getIdleMode()}")
+
+    @staticmethod
+    def stored_hash(config_hash: str, spark: rev.SparkBase) -> str:
+        """What gets stored for a device: its config hash tied to its current signature."""
+        return hashlib.sha256(f"{config_hash}:{MotorConfigManager.device_signature(spark)}".encode()).hexdigest()
+
+    def configure(self, name: str, spark: rev.SparkBase, config: rev.SparkBaseConfig) -> None:
+        """
+        Apply a config, persisting it only if it changed since it was last persisted.
+        name: String, unique name of the device, e.g. "Drive 2".
+        spark: The SparkMax or SparkFlex.
+        config: The finished config for it.
+        """
+        start_time = time.perf_counter()
+        config_hash = self.config_hash(config)
+
+        if self.hashes.get(name) == self.stored_hash(config_hash, spark):
+            spark.configureAsync(config, rev.SparkBase.ResetMode.kResetSafeParameters,
+                                 rev.SparkBase.PersistMode.kNoPersistParameters)
+        else:
+            error = spark.configure(config, rev.SparkBase.ResetMode.kResetSafeParameters,
+                                    rev.SparkBase.PersistMode.kPersistParameters)
+            if error == rev.REVLibError.kOk:
+                # Read the signature back now that the new parameters are in flash.
+                self.hashes[name] = self.stored_hash(config_hash, spark)
+                self.persisted.append(name)
+            else:
+                print(f"Configuring {name} failed with {error}, it will be persisted again next boot")
+
+        self.times[name] = time.perf_counter() - start_time
+
+    def finish(self) -> None:
+        """Save the persisted hashes and report the config times."""
+        if self.persisted and self.store_path is not None:
+            try:
+                with open(self.store_path, "w") as store:
+                    json.dump(self.hashes, store, indent=2)
+            except OSError as error:
+                print(f"Couldn't save motor config hashes: {error}")
+
+        for name, seconds in self.times.items():
+            persisted = " (persisted)" if name in self.persisted else ""
+            print(f"Configured {name} in {seconds * 1000:.1f} ms{persisted}")
+        self.total_time_publisher.set(time.perf_counter() - self.start_time)
+        self.persisted_publisher.set(len(self.persisted))
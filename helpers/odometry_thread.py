@@ -0,0 +1,109 @@
+import threading
+import weakref
+from navx import AHRS
+from wpilib import Notifier, Timer
+from constants import OdometryConstants
+
+
+class OdometryThread:
+    """Samples the module positions and gyro yaw on a Notifier at OdometryConstants.rate (250 Hz), faster than the
+    50 Hz main loop.
+
+    Every sample is stamped with the FPGA time and written into a preallocated ring buffer behind a lock. The main
+    loop calls drain() once per cycle to take everything collected since the last call, oldest first, and feeds it to
+    the pose estimator with the sample times. If the main loop stalls long enough for the buffer to fill, the oldest
+    samples are overwritten and counted in `dropped`. clear() bumps `generation`, and a sample whose reads started in
+    an earlier generation is thrown away, so a read from before an encoder reset can't land after the clear.
+    """
+
+    def __init__(self, modules: tuple, gyro: AHRS) -> None:
+        """
+        modules: Tuple of the four SwerveModules, in FL, FR, BL, BR order.
+        gyro: The navX the drivetrain uses for heading.
+        """
+        self.modules = modules
+        self.gyro = gyro
+        self.capacity = OdometryConstants.buffer_size
+        module_count = len(modules)
+
+        # Ring buffer, written by the notifier thread. head is where the next sample goes.
+        self.lock = threading.Lock()
+        self.times = [0.0] * self.capacity
+        self.yaws = [0.0] * self.capacity
+        self.drive_positions = [[0.0] * module_count for _ in range(self.capacity)]
+        self.steer_positions = [[0.0] * module_count for _ in range(self.capacity)]
+        self.head = 0
+        self.count = 0
+        self.dropped = 0
+        self.generation = 0
+
+        # Where drain() copies samples to, so the main loop can use them after the lock is released.
+        self.drained_times = [0.0] * self.capacity
+        self.drained_yaws = [0.0] * self.capacity
+        self.drained_drive_positions = [[0.0] * module_count for _ in range(self.capacity)]
+        self.drained_steer_positions = [[0.0] * module_count for _ in range(self.capacity)]
+
+        # The notifier only holds the sample method weakly. A bound method would keep this object, and with it the
+        # modules and their SPARKs, alive through the notifier for as long as the notifier exists.
+        sample = weakref.WeakMethod(self._sample)
+        self.notifier = Notifier(lambda: OdometryThread._call(sample))
+        self.notifier.setName("Odometry")
+
+    @staticmethod
+    def _call(sample: weakref.WeakMethod) -> None:
+        method = sample()
+        if method is not None:
+            method()
+
+    def start(self) -> None:
+        self.notifier.startPeriodic(1 / OdometryConstants.rate)
+
+    def stop(self) -> None:
+        self.notifier.stop()
+
+    def _sample(self) -> None:
+        """Notifier thread. The reads happen outside the lock so the main loop never waits on the CAN bus."""
+        with self.lock:
+            generation = self.generation
+        timestamp = Timer.getFPGATimestamp()
+        yaw = self.gyro.getYaw()
+        readings = [module.sample() for module in self.modules]
+
+        with self.lock:
+            if self.generation != generation:
+                # Cleared while reading, these may be from before the reset.
+                return
+            index = self.head
+            self.times[index] = timestamp
+            self.yaws[index] = yaw
+            drive_positions = self.drive_positions[index]
+            steer_positions = self.steer_positions[index]
+            for module_index, (drive_position, steer_position) in enumerate(readings):
+                drive_positions[module_index] = drive_position
+                steer_positions[module_index] = steer_position
+            self.head = (index + 1) % self.capacity
+            if self.count == self.capacity:
+                self.dropped += 1
+            else:
+                self.count += 1
+
+    def drain(self) -> int:
+        """Move every sample collected since the last drain into the drained_* lists, oldest first, and return how
+        many there are."""
+        with self.lock:
+            count = self.count
+            first = self.head - count
+            for drained_index in range(count):
+                index = (first + drained_index) % self.capacity
+                self.drained_times[drained_index] = self.times[index]
+                self.drained_yaws[drained_index] = self.yaws[index]
+                self.drained_drive_positions[drained_index][:] = self.drive_positions[index]
+                self.drained_steer_positions[drained_index][:] = self.steer_positions[index]
+            self.count = 0
+        return count
+
+    def clear(self) -> None:
+        """Throw away anything not drained yet, e.g. samples taken before the encoders were reset."""
+        with self.lock:
+            self.count = 0
+            self.generation += 1
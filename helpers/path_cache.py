@@ -0,0 +1,94 @@
+import time
+from collections import OrderedDict
+from wpimath.geometry import Pose2d, Rotation2d
+from pathplannerlib.path import PathPlannerPath, PathConstraints, GoalEndState
+from pathplannerlib.util import FlippingUtil
+from constants import PathCacheConstants
+from helpers.telemetry import Telemetry
+
+
+class PathCache:
+    """Least recently used cache of on-the-fly PathPlannerPaths.
+
+    Paths are keyed by the start pose (rounded to PathCacheConstants steps), the target [x, y, deg] and the
+    constraints. Each entry holds a blue and a red alliance variant. Targets are given in blue alliance coordinates;
+    the red variant drives from the same start to the flipped target, and both are marked preventFlipping so the path
+    follower does not flip them a second time.
+    """
+    BLUE = 0
+    RED = 1
+
+    def __init__(self) -> None:
+        self.paths: OrderedDict[tuple, list] = OrderedDict()
+        self.max_size = PathCacheConstants.max_size
+        self.translation_step = PathCacheConstants.translation_step
+        self.rotation_step = PathCacheConstants.rotation_step
+
+        # Counters, sent out whenever they change. Lookups are rare, so there's no need for a rate tier.
+        self.hits = 0
+        self.misses = 0
+        self.build_time = 0.0
+        self.telemetry = Telemetry("PathCache")
+        self.hits_publisher = self.telemetry.double("Hits")
+        self.misses_publisher = self.telemetry.double("Misses")
+        self.build_time_publisher = self.telemetry.double("Last Build Time")
+
+    def make_key(self, start: Pose2d, target: list[float], constraints: tuple[float, float, float, float]) -> tuple:
+        """Round the start pose to the cache steps and combine it with the target and constraints."""
+        return (round(start.X() / self.translation_step),
+                round(start.Y() / self.translation_step),
+                round(start.rotation().degrees() / self.rotation_step) % round(360 / self.rotation_step),
+                tuple(target),
+                tuple(constraints))
+
+    def build(self, key: tuple, alliance: int) -> PathPlannerPath:
+        """Build the path for a key. The start is the rounded pose, so every pose that shares a key gets the same
+        path."""
+        start_time = time.perf_counter()
+        x_step, y_step, rotation_step, target, constraints = key
+        start = Pose2d(x_step * self.translation_step, y_step * self.translation_step,
+                       Rotation2d.fromDegrees(rotation_step * self.rotation_step))
+        end = Pose2d(target[0], target[1], Rotation2d.fromDegrees(target[2]))
+        if alliance == PathCache.RED:
+            end = FlippingUtil.flipFieldPose(end)
+
+        path = PathPlannerPath(
+            PathPlannerPath.waypointsFromPoses([start, end]),
+            PathConstraints(*constraints),
+            None,  # No ideal starting state, the follower starts from wherever the robot actually is.
+            GoalEndState(0, end.rotation())
+        )
+        path.preventFlipping = True
+
+        self.build_time = time.perf_counter() - start_time
+        self.build_time_publisher.set(self.build_time)
+        return path
+
+    def get(self, start: Pose2d, target: list[float], constraints: tuple[float, float, float, float],
+            red_alliance: bool) -> PathPlannerPath:
+        """Returns the path from start to target, building it only if it isn't already cached.
+        start: Pose2d, current robot pose.
+        target: List of floats, [x, y, deg] in blue alliance coordinates.
+        constraints: Tuple of floats, max velocity, max acceleration, max angular velocity, max angular acceleration.
+        red_alliance: Boolean, true for the red alliance variant.
+        """
+        key = self.make_key(start, target, constraints)
+        alliance = PathCache.RED if red_alliance else PathCache.BLUE
+
+        entry = self.paths.get(key)
+        if entry is None:
+            entry = [None, None]
+            self.paths[key] = entry
+            if len(self.paths) > self.max_size:
+                self.paths.popitem(last=False)
+        else:
+            self.paths.move_to_end(key)
+
+        if entry[alliance] is None:
+            entry[alliance] = self.build(key, alliance)
+            self.misses += 1
+            self.misses_publisher.set(self.misses)
+        else:
+            self.hits += 1
+            self.hits_publisher.set(self.hits)
+        return entry[alliance]
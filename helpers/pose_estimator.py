@@ -1,7 +1,9 @@
+from wpilib import Timer
 from wpimath.estimator import SwerveDrive4PoseEstimator
 from constants import DriveConstants
 from wpimath.geometry import Pose2d, Translation2d, Rotation2d
 from wpimath.kinematics import SwerveModulePosition
+from helpers.pose_history import PoseHistory
 
 
 class PoseEstimator:
@@ -17,24 +19,52 @@ class PoseEstimator:
 
         self.estimator.setVisionMeasurementStdDevs((0.2, 0.2, 999999999))
 
+        # Every estimate is recorded with its time, so anything can ask where the robot was a moment ago.
+        self.history = PoseHistory()
+
     def update_odometry(self, rotation: Rotation2d, fl_pos: SwerveModulePosition, fr_pos: SwerveModulePosition,
                         bl_pos: SwerveModulePosition, br_pos: SwerveModulePosition) -> None:
         """Update the pose estimator for the drivetrain."""
-        self.estimator.update(rotation, (fl_pos, fr_pos, bl_pos, br_pos))
+        self._record(Timer.getFPGATimestamp(), self.estimator.update(rotation, (fl_pos, fr_pos, bl_pos, br_pos)))
+
+    def update_with_time(self, timestamp: float, rotation: Rotation2d, fl_pos: SwerveModulePosition,
+                         fr_pos: SwerveModulePosition, bl_pos: SwerveModulePosition,
+                         br_pos: SwerveModulePosition) -> None:
+        """Update the pose estimator with sensor values taken at the given FPGA time."""
+        self._record(timestamp, self.estimator.updateWithTime(timestamp, rotation, (fl_pos, fr_pos, bl_pos, br_pos)))
+
+    def _record(self, timestamp: float, pose: Pose2d) -> None:
+        self.history.add(timestamp, pose.X(), pose.Y(), pose.rotation().radians())
 
     def get_pose(self) -> Pose2d:
         """Return the current estimated position of the drivetrain."""
         return self.estimator.getEstimatedPosition()
 
-    def add_vision(self, pose: Pose2d, timestamp: float):
-        """Add a pose recorded via vision to the pose estimator's Kalman Filter."""
-        self.estimator.addVisionMeasurement(pose, timestamp)
+    def add_vision(self, pose: Pose2d, timestamp: float, std_devs: tuple[float, float, float] = None):
+        """Add a pose recorded via vision to the pose estimator's Kalman Filter. std_devs are the x, y and heading
+        standard deviations for this measurement. Without them the defaults from __init__ are used. The pose history
+        from the measurement's time on is moved by the same correction, so it keeps matching the estimator."""
+        before = self.estimator.getEstimatedPosition()
+        if std_devs is None:
+            self.estimator.addVisionMeasurement(pose, timestamp)
+        else:
+            self.estimator.addVisionMeasurement(pose, timestamp, std_devs)
+        after = self.estimator.getEstimatedPosition()
+        if after != before:
+            self.history.correct(timestamp, (before.X(), before.Y(), before.rotation().radians()),
+                                 (after.X(), after.Y(), after.rotation().radians()))
+
+    def sample_at(self, timestamp: float) -> Pose2d | None:
+        """Return the estimated pose at the given FPGA time, including vision corrections added since, or None if
+        that's outside the pose history."""
+        return self.history.sample_pose(timestamp)
 
     def reset_odometry(self, target_pose: Pose2d, current_angle: Rotation2d, fl_pos: SwerveModulePosition,
                        fr_pos: SwerveModulePosition, bl_pos: SwerveModulePosition,
                        br_pos: SwerveModulePosition) -> None:
         """Reset the pose estimator for the drivetrain."""
         self.estimator.resetPosition(current_angle, (fl_pos, fr_pos, bl_pos, br_pos), target_pose)
+        self.history.clear()
 
     def get_heading(self) -> Rotation2d:
         """Return the current robot orientation."""
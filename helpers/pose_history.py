@@ -0,0 +1,113 @@
+import math
+import threading
+from wpimath.geometry import Pose2d
+from constants import PoseHistoryConstants
+
+
+class PoseHistory:
+    """Answers "where was the robot at time t" for the last PoseHistoryConstants.retention seconds.
+
+    Poses are kept as preallocated parallel arrays of time, x, y and heading in a ring buffer, so appending never
+    allocates. Lookups binary search the times and interpolate between the two samples either side, heading along
+    the shorter way round. Appends and lookups take a lock, so a faster odometry source on another thread can write
+    while the main loop reads. Times must be appended in increasing order; anything older than the newest sample is
+    ignored.
+    """
+
+    def __init__(self) -> None:
+        self.capacity = PoseHistoryConstants.capacity
+        self.retention = PoseHistoryConstants.retention
+        self.lock = threading.Lock()
+        self.times = [0.0] * self.capacity
+        self.xs = [0.0] * self.capacity
+        self.ys = [0.0] * self.capacity
+        self.thetas = [0.0] * self.capacity
+        self.head = 0  # Where the next sample goes.
+        self.count = 0
+
+    def add(self, timestamp: float, x: float, y: float, theta: float) -> None:
+        """
+        Append a pose.
+        timestamp: Float, FPGA time in seconds.
+        x, y: Float, field position in meters.
+        theta: Float, heading in radians.
+        """
+        with self.lock:
+            if self.count and timestamp <= self.times[(self.head - 1) % self.capacity]:
+                return
+            index = self.head
+            self.times[index] = timestamp
+            self.xs[index] = x
+            self.ys[index] = y
+            self.thetas[index] = theta
+            self.head = (index + 1) % self.capacity
+            if self.count < self.capacity:
+                self.count += 1
+
+    def correct(self, since: float, before: tuple[float, float, float], after: tuple[float, float, float]) -> None:
+        """
+        Move every sample at or after a time by the rigid correction that takes the pose `before` to `after`, the
+        way a vision measurement at that time moves the estimate. Samples before it are left alone.
+        since: Float, FPGA time in seconds of the correction.
+        before, after: Tuple of (x, y, theta), the newest pose without and with the correction.
+        """
+        rotation = after[2] - before[2]
+        cos = math.cos(rotation)
+        sin = math.sin(rotation)
+        with self.lock:
+            for logical in range(self.count):
+                index = (self.head - 1 - logical) % self.capacity
+                if self.times[index] < since:
+                    break
+                dx = self.xs[index] - before[0]
+                dy = self.ys[index] - before[1]
+                self.xs[index] = after[0] + dx * cos - dy * sin
+                self.ys[index] = after[1] + dx * sin + dy * cos
+                self.thetas[index] += rotation
+
+    def clear(self) -> None:
+        """Forget everything, e.g. after a pose reset."""
+        with self.lock:
+            self.count = 0
+
+    def sample(self, timestamp: float) -> tuple[float, float, float] | None:
+        """Return the interpolated (x, y, theta) at the given time, or None if the history is empty or the time is
+        outside the retention window. Times past the newest sample return the newest pose."""
+        with self.lock:
+            count = self.count
+            if count == 0:
+                return None
+            capacity = self.capacity
+            first = self.head - count  # Buffer index of the oldest sample, before wrapping.
+            times = self.times
+            newest = (first + count - 1) % capacity
+            if timestamp >= times[newest]:
+                return self.xs[newest], self.ys[newest], self.thetas[newest]
+            oldest = first % capacity
+            if timestamp < times[newest] - self.retention or timestamp < times[oldest]:
+                return None
+
+            # First logical index with a time after the timestamp. It's at least 1, since the oldest isn't after it.
+            low = 0
+            high = count - 1
+            while low < high:
+                middle = (low + high) // 2
+                if times[(first + middle) % capacity] > timestamp:
+                    high = middle
+                else:
+                    low = middle + 1
+            after = (first + low) % capacity
+            before = (first + low - 1) % capacity
+
+            t = (timestamp - times[before]) / (times[after] - times[before])
+            x = self.xs[before] + (self.xs[after] - self.xs[before]) * t
+            y = self.ys[before] + (self.ys[after] - self.ys[before]) * t
+            theta = self.thetas[before] + math.remainder(self.thetas[after] - self.thetas[before], math.tau) * t
+            return x, y, theta
+
+    def sample_pose(self, timestamp: float) -> Pose2d | None:
+        """Same as sample, as a Pose2d."""
+        sample = self.sample(timestamp)
+        if sample is None:
+            return None
+        return Pose2d(*sample)
@@ -0,0 +1,54 @@
+from typing import Union
+import rev
+from wpilib import Timer
+
+
+class SetpointCoalescer:
+    """Sits in front of a SPARK closed loop controller and drops setReference calls that wouldn't change anything.
+
+    A write goes out only if the reference moved more than epsilon from the last one sent, or if keep_alive seconds
+    have passed since then, so a lost frame can't leave the controller on a stale target for long. Sent and suppressed
+    writes are counted for the dashboard.
+    """
+
+    def __init__(self, controller: rev.SparkClosedLoopController, control_type: rev.SparkBase.ControlType,
+                 epsilon: float, keep_alive: float) -> None:
+        """
+        controller: The SPARK's closed loop controller.
+        control_type: Control type every reference is sent with.
+        epsilon: Float, references closer than this to the last one sent are skipped, in the reference's units.
+        keep_alive: Float, seconds after which the reference is sent again even if it hasn't changed.
+        """
+        self.controller = controller
+        self.control_type = control_type
+        self.epsilon = epsilon
+        self.keep_alive = keep_alive
+
+        self.last_reference: Union[float, None] = None
+        self.last_sent = 0.0
+        self.sent = 0
+        self.suppressed = 0
+
+    def set(self, reference: float, now: Union[float, None] = None) -> bool:
+        """
+        Send the reference if it needs sending. Returns true if it was written to the controller.
+        reference: Float, the new setpoint.
+        now: Float, FPGA time in seconds. Read from the FPGA if not given.
+        """
+        if now is None:
+            now = Timer.getFPGATimestamp()
+
+        if self.last_reference is not None and abs(reference - self.last_reference) <= self.epsilon and \
+                now - self.last_sent < self.keep_alive:
+            self.suppressed += 1
+            return False
+
+        self.controller.setReference(reference, self.control_type)
+        self.last_reference = reference
+        self.last_sent = now
+        self.sent += 1
+        return True
+
+    def invalidate(self) -> None:
+        """Forget the last reference so the next one is always sent, e.g. after the controller is reconfigured."""
+        self.last_reference = None
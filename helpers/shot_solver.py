@@ -0,0 +1,93 @@
+import math
+from bisect import bisect_right
+from constants import LovelyLauncherConstants
+
+
+class ShotSolution:
+    """Output of ShotSolver. A single instance is reused for every solve."""
+    __slots__ = ("heading", "rpm", "distance", "time_of_flight", "valid")
+
+    def __init__(self) -> None:
+        self.heading = 0.0  # Field relative degrees the launcher needs to point.
+        self.rpm = 0.0  # Flywheel speed for the (virtual) distance.
+        self.distance = 0.0  # meters to the virtual target.
+        self.time_of_flight = 0.0  # seconds.
+        self.valid = False  # False if the distance is outside the shot table.
+
+
+class ShotSolver:
+    """Shoot-while-moving solver.
+
+    The distance -> (flywheel RPM, time of flight) table in LovelyLauncherConstants is turned into flat sorted arrays
+    once. Each solve predicts where the robot will be and how fast it will be going when the shot actually leaves
+    (release_latency from now), then runs a fixed number of time-of-flight iterations: the game piece keeps the
+    robot's velocity, so we aim at the target minus that velocity times the time of flight, look up the new time of
+    flight for that distance, and repeat.
+
+    The acceleration from MotionEstimator describes the middle of its filter window, about 40 ms ago, and is
+    multiplied by acceleration_scale before the extrapolation so that a stale reading can't push the release point
+    far off when the robot starts or stops accelerating.
+    """
+
+    def __init__(self, shot_table: list[tuple[float, float, float]] = LovelyLauncherConstants.shot_table) -> None:
+        """
+        shot_table: List of (distance m, flywheel RPM, time of flight s), in any order.
+        """
+        table = sorted(shot_table)
+        self.distances = tuple(row[0] for row in table)
+        self.rpms = tuple(row[1] for row in table)
+        self.times_of_flight = tuple(row[2] for row in table)
+        self.iterations = LovelyLauncherConstants.solver_iterations
+        self.release_latency = LovelyLauncherConstants.release_latency
+        self.acceleration_scale = LovelyLauncherConstants.acceleration_scale
+        self.solution = ShotSolution()
+
+    def lookup(self, distance: float) -> tuple[float, float]:
+        """Linearly interpolate (RPM, time of flight) for a distance, holding the end values outside the table."""
+        distances = self.distances
+        if distance <= distances[0]:
+            return self.rpms[0], self.times_of_flight[0]
+        if distance >= distances[-1]:
+            return self.rpms[-1], self.times_of_flight[-1]
+        high = bisect_right(distances, distance)
+        low = high - 1
+        fraction = (distance - distances[low]) / (distances[high] - distances[low])
+        return (self.rpms[low] + (self.rpms[high] - self.rpms[low]) * fraction,
+                self.times_of_flight[low] + (self.times_of_flight[high] - self.times_of_flight[low]) * fraction)
+
+    def solve(self, x: float, y: float, vx: float, vy: float, ax: float, ay: float,
+              target_x: float, target_y: float) -> ShotSolution:
+        """
+        Solve for the heading and flywheel speed that put a shot into the target while the robot moves.
+        x, y: Float, robot field position in meters.
+        vx, vy: Float, robot field relative velocity in m/s.
+        ax, ay: Float, robot field relative acceleration in m/s^2, as measured. Scaled by acceleration_scale.
+        target_x, target_y: Float, target field position in meters.
+        """
+        # Where the robot will be, and how fast it will be moving, when the shot leaves.
+        latency = self.release_latency
+        ax *= self.acceleration_scale
+        ay *= self.acceleration_scale
+        release_x = x + vx * latency + 0.5 * ax * latency * latency
+        release_y = y + vy * latency + 0.5 * ay * latency * latency
+        release_vx = vx + ax * latency
+        release_vy = vy + ay * latency
+
+        aim_x = target_x - release_x
+        aim_y = target_y - release_y
+        distance = math.hypot(aim_x, aim_y)
+        rpm, time_of_flight = self.lookup(distance)
+
+        for _ in range(self.iterations):
+            aim_x = target_x - release_vx * time_of_flight - release_x
+            aim_y = target_y - release_vy * time_of_flight - release_y
+            distance = math.hypot(aim_x, aim_y)
+            rpm, time_of_flight = self.lookup(distance)
+
+        solution = self.solution
+        solution.heading = math.degrees(math.atan2(aim_y, aim_x))
+        solution.rpm = rpm
+        solution.distance = distance
+        solution.time_of_flight = time_of_flight
+        solution.valid = self.distances[0] <= distance <= self.distances[-1]
+        return solution
@@ -0,0 +1,141 @@
+import math
+from wpimath.geometry import Rotation2d, Translation2d
+from wpimath.kinematics import ChassisSpeeds
+
+
+def optimize_module(speed: float, desired_degrees: float, current_degrees: float) -> tuple[float, float]:
+    """Flip a module target by 180 degrees and reverse its speed if that is the shorter turn.
+    speed: Float, target wheel speed.
+    desired_degrees: Float, target angle in degrees, any range.
+    current_degrees: Float, current module angle in degrees, 0 to 360.
+    Returns the (speed, degrees) to send to the module, with degrees from 0 to 360.
+    """
+    if desired_degrees < 0:
+        desired_degrees += 360  # converts desired degrees to 360
+
+    if 90.0 < abs(current_degrees - desired_degrees) <= 270.0:
+        speed *= -1
+        if desired_degrees > 180:
+            desired_degrees -= 180
+        else:
+            desired_degrees += 180
+
+    return speed, desired_degrees
+
+
+class FastSwerveKinematics:
+    """Swerve kinematics as flat float math on the module geometry in DriveConstants.
+
+    The inverse (8x3) and forward (3x8) kinematics matrices are worked out once, and the results of each inverse
+    kinematics call are written into the preallocated speeds/angles lists instead of new SwerveModuleState objects.
+    Results match SwerveDrive4Kinematics, including holding the last module angles when asked for zero speed.
+    """
+
+    def __init__(self, *module_locations: Translation2d) -> None:
+        self.module_count = len(module_locations)
+        self.x = tuple(location.X() for location in module_locations)
+        self.y = tuple(location.Y() for location in module_locations)
+
+        # Inverse kinematics. Each module contributes two rows: [1, 0, -y] for its x velocity and [0, 1, x] for its y
+        # velocity, so only the locations need to be stored.
+        # Forward kinematics is the least squares solution, (A^T A)^-1 A^T. A^T A is worked out by hand below.
+        n = self.module_count
+        sum_x = sum(self.x)
+        sum_y = sum(self.y)
+        sum_r2 = sum(x * x + y * y for x, y in zip(self.x, self.y))
+        ata = ((n, 0.0, -sum_y),
+               (0.0, n, sum_x),
+               (-sum_y, sum_x, sum_r2))
+        ata_inv = _invert_3x3(ata)
+
+        # Forward row r, module i: coefficients on that module's x velocity and y velocity.
+        self.forward = tuple(
+            tuple((ata_inv[r][0] - ata_inv[r][2] * y, ata_inv[r][1] + ata_inv[r][2] * x)
+                  for x, y in zip(self.x, self.y))
+            for r in range(3))
+
+        # Output arrays, reused by every call.
+        self.speeds = [0.0] * n
+        self.angles = [0.0] * n  # degrees
+
+    def to_module_speeds(self, vx: float, vy: float, omega: float) -> None:
+        """Inverse kinematics. Robot relative speeds in, module speeds and angles (degrees) written to self.speeds
+        and self.angles."""
+        if vx == 0 and vy == 0 and omega == 0:
+            # Same as WPILib: keep pointing the modules where they were last asked to point.
+            for index in range(self.module_count):
+                self.speeds[index] = 0.0
+            return
+
+        for index in range(self.module_count):
+            module_vx = vx - omega * self.y[index]
+            module_vy = vy + omega * self.x[index]
+            self.speeds[index] = math.hypot(module_vx, module_vy)
+            self.angles[index] = math.degrees(math.atan2(module_vy, module_vx))
+
+    def to_chassis_speeds(self, speeds, angles) -> ChassisSpeeds:
+        """Forward kinematics. Module speeds and angles (radians) in, robot relative ChassisSpeeds out."""
+        vx = vy = omega = 0.0
+        forward_vx, forward_vy, forward_omega = self.forward
+        for index in range(self.module_count):
+            module_vx = speeds[index] * math.cos(angles[index])
+            module_vy = speeds[index] * math.sin(angles[index])
+            vx += forward_vx[index][0] * module_vx + forward_vx[index][1] * module_vy
+            vy += forward_vy[index][0] * module_vx + forward_vy[index][1] * module_vy
+            omega += forward_omega[index][0] * module_vx + forward_omega[index][1] * module_vy
+        return ChassisSpeeds(vx, vy, omega)
+
+    def desaturate(self, max_speed: float) -> None:
+        """Scale all module speeds down together if any of them is over max_speed."""
+        real_max = max(abs(speed) for speed in self.speeds)
+        if real_max > max_speed:
+            scale = max_speed / real_max
+            for index in range(self.module_count):
+                self.speeds[index] *= scale
+
+    def optimize(self, current_degrees) -> None:
+        """Apply optimize_module to every module target, given each module's current angle (0 to 360)."""
+        for index in range(self.module_count):
+            self.speeds[index], self.angles[index] = optimize_module(self.speeds[index], self.angles[index],
+                                                                     current_degrees[index])
+
+
+def from_field_relative(vx: float, vy: float, heading: Rotation2d) -> tuple[float, float]:
+    """Rotate field relative x/y speeds into the robot frame. Same as ChassisSpeeds.fromFieldRelativeSpeeds."""
+    cos = heading.cos()
+    sin = heading.sin()
+    return vx * cos + vy * sin, -vx * sin + vy * cos
+
+
+def discretize(vx: float, vy: float, omega: float, dt: float) -> tuple[float, float, float]:
+    """Same as ChassisSpeeds.discretize: the constant speeds that follow the arc the robot would drive if the given
+    speeds were held for dt seconds. Returns the speeds unchanged if dt is not positive."""
+    if dt <= 0:
+        return vx, vy, omega
+
+    # Twist of the pose change (vx*dt, vy*dt, omega*dt), as in Pose2d.log.
+    dtheta = omega * dt
+    half_dtheta = dtheta / 2
+    cos_minus_one = math.cos(dtheta) - 1
+    if abs(cos_minus_one) < 1e-9:
+        half_theta_by_tan = 1 - dtheta * dtheta / 12
+    else:
+        half_theta_by_tan = -(half_dtheta * math.sin(dtheta)) / cos_minus_one
+
+    dx = vx * dt
+    dy = vy * dt
+    return ((dx * half_theta_by_tan + dy * half_dtheta) / dt,
+            (dy * half_theta_by_tan - dx * half_dtheta) / dt,
+            omega)
+
+
+def _invert_3x3(m) -> tuple:
+    """Inverse of a 3x3 matrix by cofactors."""
+    (a, b, c), (d, e, f), (g, h, i) = m
+    co_a = e * i - f * h
+    co_b = -(d * i - f * g)
+    co_c = d * h - e * g
+    det = a * co_a + b * co_b + c * co_c
+    return ((co_a / det, -(b * i - c * h) / det, (b * f - c * e) / det),
+            (co_b / det, (a * i - c * g) / det, -(a * f - c * d) / det),
+            (co_c / det, -(a * h - b * g) / det, (a * e - b * d) / det))
@@ -0,0 +1,57 @@
+from constants import PickupConstants
+
+
+class TargetTracker:
+    """Tracks one target's field position between camera frames with an alpha-beta filter.
+
+    Each detection is applied at its capture time: the track is predicted forward to that time, then pulled toward
+    the detection by alpha for position and beta for velocity. Between detections the track is predicted forward with
+    its velocity, so the robot can keep steering at where the target is now instead of waiting for the next frame. A
+    detection further than tracker_gate from the prediction is treated as a different target and restarts the track.
+    """
+
+    def __init__(self) -> None:
+        self.alpha = PickupConstants.tracker_alpha
+        self.beta = PickupConstants.tracker_beta
+        self.reset()
+
+    def reset(self) -> None:
+        self.tracking = False
+        self.x = 0.0
+        self.y = 0.0
+        self.vx = 0.0
+        self.vy = 0.0
+        self.time = 0.0  # Capture time of the last detection.
+
+    def update(self, timestamp: float, x: float, y: float) -> None:
+        """
+        Add a detection.
+        timestamp: Float, FPGA time in seconds the frame was captured.
+        x, y: Float, field position of the target in meters.
+        """
+        dt = timestamp - self.time
+        if self.tracking and dt <= 0:
+            return
+        residual_x = x - (self.x + self.vx * dt)
+        residual_y = y - (self.y + self.vy * dt)
+        if not self.tracking or residual_x * residual_x + residual_y * residual_y > PickupConstants.tracker_gate ** 2:
+            self.tracking = True
+            self.x, self.y = x, y
+            self.vx = self.vy = 0.0
+            self.time = timestamp
+            return
+
+        self.x += self.vx * dt + self.alpha * residual_x
+        self.y += self.vy * dt + self.alpha * residual_y
+        self.vx += self.beta * residual_x / dt
+        self.vy += self.beta * residual_y / dt
+        self.time = timestamp
+
+    def predict(self, now: float) -> tuple[float, float]:
+        """Where the target is at the given time."""
+        dt = now - self.time
+        return self.x + self.vx * dt, self.y + self.vy * dt
+
+    def lost(self, now: float) -> bool:
+        """True if nothing is tracked or the last detection is older than PickupConstants.lost_timeout."""
+        return not self.tracking or now - self.time > PickupConstants.lost_timeout
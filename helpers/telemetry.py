@@ -0,0 +1,57 @@
+from ntcore import NetworkTableInstance, DoublePublisher, DoubleArrayPublisher, StructPublisher, \
+    StructArrayPublisher
+from constants import TelemetryConstants
+
+
+class Telemetry:
+    """Typed NetworkTables publishers that are created once and sorted into rate tiers.
+
+    Every signal belongs to one of three tiers:
+        EVERY_LOOP: Published every time the owner's periodic runs.
+        SLOW: Published at TelemetryConstants.slow_rate (10 Hz) unless the owner asks for another rate.
+        DEBUG: Only published while debug mode is on.
+    Turning on debug mode promotes SLOW and DEBUG signals to every loop, so the owner only has to check active(tier)
+    once per group instead of gating each value.
+    """
+    EVERY_LOOP = 0
+    SLOW = 1
+    DEBUG = 2
+
+    def __init__(self, table_name: str, slow_rate: float = TelemetryConstants.slow_rate) -> None:
+        """
+        table_name: NetworkTables table the publishers are created in.
+        slow_rate: Rate of the SLOW tier in Hz, if the owner wants something other than the default.
+        """
+        self.table = NetworkTableInstance.getDefault().getTable(table_name)
+        self.debug_mode = False
+        self.slow_period = 1 / slow_rate
+        self.last_slow_time = -self.slow_period
+        self.slow_due = True
+
+    def double(self, name: str) -> DoublePublisher:
+        """Create a publisher for a single number."""
+        return self.table.getDoubleTopic(name).publish()
+
+    def double_array(self, name: str) -> DoubleArrayPublisher:
+        """Create a publisher for a group of numbers sent together as one array."""
+        return self.table.getDoubleArrayTopic(name).publish()
+
+    def struct(self, name: str, struct_type: type) -> StructPublisher:
+        """Create a publisher for a WPILib struct type (Pose2d, ChassisSpeeds, etc.)."""
+        return self.table.getStructTopic(name, struct_type).publish()
+
+    def struct_array(self, name: str, struct_type: type) -> StructArrayPublisher:
+        """Create a publisher for an array of a WPILib struct type (a list of SwerveModuleStates, etc.)."""
+        return self.table.getStructArrayTopic(name, struct_type).publish()
+
+    def start_cycle(self, now: float) -> None:
+        """Call once at the start of the owner's periodic to work out which tiers publish this loop."""
+        self.slow_due = now - self.last_slow_time >= self.slow_period
+        if self.slow_due:
+            self.last_slow_time = now
+
+    def active(self, tier: int) -> bool:
+        """Returns true if signals in the given tier should be published this loop."""
+        if tier == Telemetry.EVERY_LOOP or self.debug_mode:
+            return True
+        return tier == Telemetry.SLOW and self.slow_due
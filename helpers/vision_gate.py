@@ -0,0 +1,86 @@
+import math
+from pathplannerlib.util import FlippingUtil
+from wpimath.geometry import Pose2d
+from constants import VisionConstants
+
+
+class VisionGate:
+    """Outlier rejection in front of the pose estimator. A reflection or a misidentified tag gives a pose that doesn't
+    agree with odometry, and fusing it would jerk the pose, so every measurement is checked before it goes in.
+
+    The innovation is the difference between the vision pose and the odometry pose at the measurement's timestamp.
+    Each axis is normalised by the combined vision and odometry variance and summed into a chi-square statistic, over
+    x and y, plus heading when the measurement's heading is trusted. Past VisionConstants.chi_square_downweight the
+    measurement's std devs are scaled up so it pulls less, and past chi_square_reject it's dropped. Poses off the field
+    or further than max_jump from odometry are dropped as well.
+
+    If odometry itself is wrong, e.g. after a collision, every measurement would be rejected forever. So after
+    max_consecutive_rejects rejections in a row the next in-bounds measurement is let through with its own std devs.
+    """
+
+    def __init__(self) -> None:
+        self.field_length = FlippingUtil.fieldSizeX
+        self.field_width = FlippingUtil.fieldSizeY
+        self.consecutive_rejects = 0
+
+        self.accepted = 0
+        self.downweighted = 0
+        self.rejected = 0  # Total for any reason, broken down below.
+        self.rejected_bounds = 0
+        self.rejected_jump = 0
+        self.rejected_chi_square = 0
+
+    def check(self, pose: Pose2d, std_devs: tuple[float, float, float],
+              reference: Pose2d | None) -> tuple[float, float, float] | None:
+        """
+        Return the std devs to fuse the measurement with, or None to reject it.
+        pose: Pose2d, vision pose.
+        std_devs: Tuple of x, y and heading std devs from VisionWeighting.
+        reference: Pose2d, odometry pose at the measurement's timestamp, or None if there is no history yet.
+        """
+        x = pose.X()
+        y = pose.Y()
+        margin = VisionConstants.field_margin
+        if not (-margin <= x <= self.field_length + margin and -margin <= y <= self.field_width + margin):
+            self.rejected += 1
+            self.rejected_bounds += 1
+            return None
+
+        if reference is None or self.consecutive_rejects >= VisionConstants.max_consecutive_rejects:
+            return self._accept(std_devs)
+
+        dx = x - reference.X()
+        dy = y - reference.Y()
+        if dx * dx + dy * dy > VisionConstants.max_jump * VisionConstants.max_jump:
+            self.rejected += 1
+            self.rejected_jump += 1
+            self.consecutive_rejects += 1
+            return None
+
+        odometry_variance = VisionConstants.odometry_std * VisionConstants.odometry_std
+        x_std, y_std, heading_std = std_devs
+        chi_square = dx * dx / (x_std * x_std + odometry_variance) + dy * dy / (y_std * y_std + odometry_variance)
+        degrees_of_freedom = 2
+        if heading_std < VisionConstants.single_tag_heading_std:
+            heading_variance = VisionConstants.odometry_heading_std * VisionConstants.odometry_heading_std
+            dtheta = math.remainder(pose.rotation().radians() - reference.rotation().radians(), math.tau)
+            chi_square += dtheta * dtheta / (heading_std * heading_std + heading_variance)
+            degrees_of_freedom = 3
+
+        if chi_square > VisionConstants.chi_square_reject[degrees_of_freedom]:
+            self.rejected += 1
+            self.rejected_chi_square += 1
+            self.consecutive_rejects += 1
+            return None
+
+        downweight = VisionConstants.chi_square_downweight[degrees_of_freedom]
+        if chi_square > downweight:
+            self.downweighted += 1
+            scale = math.sqrt(chi_square / downweight)
+            std_devs = (x_std * scale, y_std * scale, heading_std * scale)
+        return self._accept(std_devs)
+
+    def _accept(self, std_devs: tuple[float, float, float]) -> tuple[float, float, float]:
+        self.consecutive_rejects = 0
+        self.accepted += 1
+        return std_devs
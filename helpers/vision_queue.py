@@ -0,0 +1,67 @@
+from wpilib import Timer
+from wpimath.geometry import Pose2d
+from constants import VisionConstants
+from helpers.pose_estimator import PoseEstimator
+from helpers.vision_weighting import VisionWeighting
+from helpers.vision_gate import VisionGate
+
+
+class VisionQueue:
+    """Collects vision pose measurements as the cameras report them, and hands them to the pose estimator in one batch
+    per cycle, oldest first.
+
+    Every measurement carries the FPGA time its image was captured, not the time it was read, so the estimator can
+    fuse it against the odometry from that moment. Measurements older than VisionConstants.max_age have already fallen
+    out of the estimator's history and are dropped, as are any stamped in the future, which only happens when a
+    camera's latency numbers are wrong. The rest are weighted by VisionWeighting from their tag statistics and the
+    robot's angular velocity, then checked against the estimated pose at their timestamp by VisionGate.
+    """
+
+    def __init__(self) -> None:
+        self.measurements = []  # (timestamp, pose, tag count, distance, area) waiting for the next flush.
+        self.weighting = VisionWeighting()
+        self.gate = VisionGate()
+        self.fused = 0
+        self.stale = 0
+
+    def add(self, pose: Pose2d, timestamp: float, tag_count: int, distance: float, area: float) -> None:
+        """
+        Queue a measurement for the next flush.
+        pose: Pose2d, field relative robot pose from the camera, blue origin.
+        timestamp: Float, FPGA time in seconds the image was captured.
+        tag_count: Integer, number of tags in the solve.
+        distance: Float, average distance to the tags in meters.
+        area: Float, average tag area in percent of the image.
+        """
+        self.measurements.append((timestamp, pose, tag_count, distance, area))
+
+    def flush(self, pose_estimator: PoseEstimator, now: float = None, angular_velocity: float = 0.0) -> int:
+        """Give every queued measurement to the pose estimator, oldest first, and return how many were fused. Call
+        after the odometry update so the estimator's history already covers the measurement times. angular_velocity is
+        the robot's, in degrees per second."""
+        if not self.measurements:
+            return 0
+        if now is None:
+            now = Timer.getFPGATimestamp()
+
+        fused = 0
+        self.measurements.sort(key=lambda measurement: measurement[0])
+        for timestamp, pose, tag_count, distance, area in self.measurements:
+            if timestamp < now - VisionConstants.max_age or timestamp > now:
+                self.stale += 1
+                continue
+            std_devs = self.weighting.std_devs(tag_count, distance, area, angular_velocity)
+            if std_devs is None:
+                continue
+            std_devs = self.gate.check(pose, std_devs, pose_estimator.sample_at(timestamp))
+            if std_devs is None:
+                continue
+            pose_estimator.add_vision(pose, timestamp, std_devs)
+            fused += 1
+        self.measurements.clear()
+        self.fused += fused
+        return fused
+
+    def clear(self) -> None:
+        """Throw away anything not flushed yet, e.g. measurements taken before a pose reset."""
+        self.measurements.clear()
@@ -0,0 +1,38 @@
+from constants import VisionConstants
+
+
+class VisionWeighting:
+    """Works out how much the pose estimator should trust one vision measurement, as x, y and heading standard
+    deviations for addVisionMeasurement.
+
+    Translation error grows with the square of the average tag distance and shrinks with the number of tags in the
+    solve. Spinning blurs the image and smears the latency, so the robot's angular velocity scales it up too. A single
+    tag can't give a reliable heading, so heading is only trusted from multi-tag solves. Measurements that are too far,
+    too small in the image or taken while spinning too fast are rejected outright.
+    """
+
+    def __init__(self) -> None:
+        self.rejected = 0
+
+    def std_devs(self, tag_count: int, distance: float, area: float,
+                 angular_velocity: float) -> tuple[float, float, float] | None:
+        """
+        Return (x, y, heading) standard deviations in meters and radians, or None to reject the measurement.
+        tag_count: Integer, number of tags in the solve.
+        distance: Float, average distance to the tags in meters.
+        area: Float, average tag area in percent of the image.
+        angular_velocity: Float, robot angular velocity in degrees per second.
+        """
+        spin = abs(angular_velocity)
+        if tag_count < 1 or distance > VisionConstants.max_distance or area < VisionConstants.min_area or \
+                spin > VisionConstants.max_angular_velocity:
+            self.rejected += 1
+            return None
+
+        scale = distance * distance / tag_count * (1 + spin / VisionConstants.spin_scale)
+        xy = max(VisionConstants.min_xy_std, VisionConstants.xy_std * scale)
+        if tag_count > 1:
+            heading = max(VisionConstants.min_heading_std, VisionConstants.heading_std * scale)
+        else:
+            heading = VisionConstants.single_tag_heading_std
+        return xy, xy, heading
@@ -0,0 +1,100 @@
+"""
+    pyfrc physics model of the swerve drivetrain, so the drive code, odometry and path following can be run and timed
+    in simulation. pyfrc loads this automatically for `robotpy sim` and `robotpy test`.
+"""
+
+import math
+import rev
+from wpilib import DriverStation
+from wpilib.simulation import RoboRioSim, SimDeviceSim
+from wpimath.geometry import Rotation2d
+from wpimath.kinematics import ChassisSpeeds, SwerveModuleState
+from wpimath.system.plant import DCMotor
+from pyfrc.physics.core import PhysicsInterface
+from constants import DriveConstants, SimConstants
+
+
+class SimulatedModule:
+    """One swerve module. The drive wheel chases the velocity setpoint the robot sent, as fast as the Vortex can
+    accelerate its share of the robot under the current limit. The steer chases its position setpoint with a first
+    order lag, capped at the NEO's free speed through the steering reduction."""
+
+    def __init__(self, module) -> None:
+        self.drive_motor = DCMotor.neoVortex(1)
+        self.steer_motor = DCMotor.NEO(1)
+        self.drive_sim = rev.SparkFlexSim(module.drive_motor, self.drive_motor)
+        self.steer_sim = rev.SparkMaxSim(module.steer_motor, self.steer_motor)
+
+        self.wheel_radius = DriveConstants.wheel_diameter / 2
+        self.mass = SimConstants.robot_mass / 4
+        self.max_steer_rate = self.steer_motor.freeSpeed / (2 * math.pi) / DriveConstants.angle_gear_ratio
+        self.speed = 0.0  # m/s
+
+        # The robot seeded its steer encoder from the absolute encoder before these sims existed, and the sims start
+        # from zero, so carry that position over.
+        self.steer_sim.setPosition(module.steer_position)
+
+    def update(self, enabled: bool, battery_voltage: float, dt: float) -> SwerveModuleState:
+        """Move the module forward by dt and return its new state."""
+        steer_position = self.steer_sim.getPosition()  # Module rotations, the same value the steer encoder reads.
+        target_speed = self.drive_sim.getSetpoint() if enabled else 0.0
+        target_steer = self.steer_sim.getSetpoint() if enabled else steer_position
+
+        # Drive: the closed loop asks for the error over its response time, the motor gives what it can.
+        motor_speed = self.speed / self.wheel_radius * DriveConstants.drive_gear_ratio
+        wanted_acceleration = (target_speed - self.speed) / SimConstants.drive_response_time
+        direction = math.copysign(1, wanted_acceleration)
+        current = self.drive_motor.current(motor_speed, direction * battery_voltage)
+        current = max(-DriveConstants.drive_current_limit, min(DriveConstants.drive_current_limit, current))
+        max_acceleration = abs(self.drive_motor.torque(current)) * DriveConstants.drive_gear_ratio / \
+            self.wheel_radius / self.mass
+        acceleration = max(-max_acceleration, min(max_acceleration, wanted_acceleration))
+        self.speed += acceleration * dt
+
+        # Steer: first order lag toward the setpoint, limited to the motor's free speed.
+        steer_rate = (target_steer - steer_position) / SimConstants.steer_response_time
+        steer_rate = max(-self.max_steer_rate, min(self.max_steer_rate, steer_rate))
+
+        # Hand the motion to the REV sims, in the units their encoders are configured for. The drive encoder reads
+        # m/s, the steer encoder has no velocity conversion so it reads motor RPM.
+        self.drive_sim.iterate(self.speed, battery_voltage, dt)
+        self.drive_sim.setMotorCurrent(abs(current) if wanted_acceleration else 0.0)
+        self.steer_sim.iterate(steer_rate * DriveConstants.angle_gear_ratio * 60, battery_voltage, dt)
+
+        return SwerveModuleState(self.speed, Rotation2d(self.steer_sim.getPosition() % 1 * 2 * math.pi))
+
+
+class PhysicsEngine:
+    """Moves the simulated drivetrain each sim step and feeds the results back to the SPARK and navX sims."""
+
+    def __init__(self, physics_controller: PhysicsInterface, robot) -> None:
+        self.physics_controller = physics_controller
+        drive = robot.m_robotcontainer.robot_drive
+        self.modules = [SimulatedModule(module) for module in (drive.m_FL, drive.m_FR, drive.m_BL, drive.m_BR)]
+        self.kinematics = DriveConstants.m_kinematics
+
+        gyro = SimDeviceSim(SimDeviceSim.enumerateDevices("navX-Sensor")[0])
+        gyro.getBoolean("Connected").set(True)
+        self.gyro_yaw = gyro.getDouble("Yaw")
+        self.gyro_rate = gyro.getDouble("Rate")
+        self.yaw = 0.0
+
+    def update_sim(self, now: float, tm_diff: float) -> None:
+        """
+        Called by pyfrc every sim step.
+        now: Float, current sim time in seconds.
+        tm_diff: Float, seconds since the last call.
+        """
+        enabled = DriverStation.isEnabled()
+        battery_voltage = RoboRioSim.getVInVoltage()
+        states = [module.update(enabled, battery_voltage, tm_diff) for module in self.modules]
+        speeds = self.kinematics.toChassisSpeeds(states)
+
+        # The drive code turns toward lower yaw for a positive rotation command (see snap_drive), so the simulated
+        # robot does too. That keeps the navX heading and odometry in the same frame as the rest of the code.
+        yaw_rate = -math.degrees(speeds.omega)
+        self.yaw = (self.yaw + yaw_rate * tm_diff + 180) % 360 - 180
+        self.gyro_yaw.set(self.yaw)
+        self.gyro_rate.set(yaw_rate)
+
+        self.physics_controller.drive(ChassisSpeeds(speeds.vx, speeds.vy, -speeds.omega), tm_diff)
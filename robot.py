@@ -19,8 +19,11 @@ class Robot(TimedCommandRobot):
 
 
     def robotPeriodic(self) -> None:
-        """Set the constant robot periodic state (in command based, that's just run the scheduler loop)"""
-        CommandScheduler.getInstance().run()
+        """Set the constant robot periodic state (in command based, that's just run the scheduler loop). The loop
+        profiler runs the scheduler so every piece of the loop gets timed. The controller is read first, so every
+        trigger and command this loop sees the same inputs."""
+        self.m_robotcontainer.driver_controller_raw.update()
+        self.m_robotcontainer.loop_profiler.run_scheduler()
 
     def disabledInit(self) -> None:
         """Nothing is written here yet. Probably will not modify unless something is required for end-of-match."""
@@ -1,24 +1,40 @@
 import math
 from navx import AHRS
 import commands2
-from wpimath.kinematics import ChassisSpeeds, SwerveDrive4Kinematics, SwerveModulePosition
+from wpimath.kinematics import ChassisSpeeds, SwerveModulePosition, SwerveModuleState
 from wpimath.geometry import Pose2d, Translation2d, Rotation2d
 from wpimath.controller import PIDController
 from subsystems.swervemodule import SwerveModule
-from constants import DriveConstants, ModuleConstants, AutoConstants
+from constants import DriveConstants, ModuleConstants, AutoConstants, PathfindingConstants, \
+    LovelyLauncherConstants
 from wpilib import SmartDashboard, Field2d, Timer, DriverStation, SPI
 from pathplannerlib.auto import AutoBuilder
 from pathplannerlib.config import RobotConfig, PIDConstants
 from pathplannerlib.controller import PPHolonomicDriveController
-from pathplannerlib.path import PathPlannerPath, PathConstraints, GoalEndState
-from pathplannerlib.logging import PathPlannerLogging
+from pathplannerlib.path import PathConstraints
+from pathplannerlib.util import FlippingUtil
 from helpers.pose_estimator import PoseEstimator
+from helpers.vision_queue import VisionQueue
+from helpers.drive_snapshot import DriveSnapshot
+from helpers.telemetry import Telemetry
+from helpers.field_visualizer import FieldVisualizer
+from helpers.path_cache import PathCache
+from helpers.background_pathfinder import BackgroundPathfinder
+from helpers.motion_estimator import MotionEstimator
+from helpers.shot_solver import ShotSolver, ShotSolution
+from helpers.heading_hold import HeadingHold
+from helpers.can_budget import CANBudget
+from helpers.motor_config_manager import MotorConfigManager
+from helpers.odometry_thread import OdometryThread
+from helpers.swerve_kinematics import FastSwerveKinematics, discretize, from_field_relative
 
 class DriveSubsystem(commands2.Subsystem):
 
-    def __init__(self, timer: Timer, pose_estimator: PoseEstimator) -> None:
+    def __init__(self, timer: Timer, pose_estimator: PoseEstimator, vision_queue: VisionQueue, can_budget: CANBudget,
+                 config_manager: MotorConfigManager) -> None:
         self.gyro = AHRS(AHRS.NavXComType.kMXP_SPI)
         self.pose_estimator = pose_estimator
+        self.vision_queue = vision_queue
 
         # Setup "snap" controller, which is used to point the robot to a given heading.
         self.snap_controller = PIDController(DriveConstants.snap_controller_PID[0],
@@ -33,11 +49,8 @@ class DriveSubsystem(commands2.Subsystem):
                                                DriveConstants.turret_controller_PID[2])
         self.turret_controller.enableContinuousInput(-180, 180)
         
-        # Setup "closed-loop-turning controller" which is used to maintain robot heading while translating.
-        self.clt_controller = PIDController(DriveConstants.clt_controller_PID[0],
-                                            DriveConstants.clt_controller_PID[1],
-                                            DriveConstants.clt_controller_PID[2])
-        self.clt_controller.enableContinuousInput(0, 360)
+        # Setup closed loop turning, which is used to maintain robot heading while translating.
+        self.heading_hold = HeadingHold()
 
         # Setup "balance" controller which was used to balance the robot on the Charge Station in Charged Up.
         self.balance_controller = PIDController(DriveConstants.balance_PID[0],
@@ -53,25 +66,33 @@ class DriveSubsystem(commands2.Subsystem):
                                  ModuleConstants.bl_encoder_id,
                                  ModuleConstants.bl_zero_offset,
                                  False,
-                                 True)
+                                 True,
+                                 can_budget,
+                                 config_manager)
         self.m_BR = SwerveModule(ModuleConstants.br_drive_id,
                                  ModuleConstants.br_turn_id,
                                  ModuleConstants.br_encoder_id,
                                  ModuleConstants.br_zero_offset,
                                  True,
-                                 True)
+                                 True,
+                                 can_budget,
+                                 config_manager)
         self.m_FL = SwerveModule(ModuleConstants.fl_drive_id,
                                  ModuleConstants.fl_turn_id,
                                  ModuleConstants.fl_encoder_id,
                                  ModuleConstants.fl_zero_offset,
                                  False,
-                                 True)
+                                 True,
+                                 can_budget,
+                                 config_manager)
         self.m_FR = SwerveModule(ModuleConstants.fr_drive_id,
                                  ModuleConstants.fr_turn_id,
                                  ModuleConstants.fr_encoder_id,
                                  ModuleConstants.fr_zero_offset,
                                  True,
-                                 True)
+                                 True,
+                                 can_budget,
+                                 config_manager)
         
 
         
@@ -86,6 +107,22 @@ class DriveSubsystem(commands2.Subsystem):
         # TODO Check if this is redundant code.
         self.reset_encoders()
 
+        # Setup the fast kinematics path. Every drive method turns its speeds into module targets through this instead
+        # of building ChassisSpeeds and SwerveModuleState objects.
+        self.kinematics = FastSwerveKinematics(DriveConstants.m_FL_location, DriveConstants.m_FR_location,
+                                               DriveConstants.m_BL_location, DriveConstants.m_BR_location)
+        self.module_degrees = [0.0] * 4
+
+        # Setup the per-cycle sensor snapshot. Every drive method reads from this instead of going back to the
+        # hardware, and periodic refreshes it once at the start of each loop.
+        self.snapshot = DriveSnapshot((self.m_FL, self.m_FR, self.m_BL, self.m_BR), self.gyro, self.pose_estimator,
+                                      self.kinematics)
+        self.snapshot.refresh()
+
+        # Start sampling odometry faster than the main loop. periodic feeds the samples to the pose estimator.
+        self.odometry_thread = OdometryThread((self.m_FL, self.m_FR, self.m_BL, self.m_BR), self.gyro)
+        self.odometry_thread.start()
+
         # Prepare the autobuilder package from PathPlanner to run autonomous.
         AutoBuilder.configure(
             self.get_pose,
@@ -108,6 +145,21 @@ class DriveSubsystem(commands2.Subsystem):
         # more data than normal to the dashboard.
         self.debug_mode = False
 
+        # Setup the dashboard publishers once. Each one belongs to a rate tier (see Telemetry), and debug mode switches
+        # the tiers rather than gating individual values. The table is SmartDashboard so existing layouts keep working.
+        self.telemetry = Telemetry("SmartDashboard")
+        self.pose_publisher = self.telemetry.struct("Estimated Pose", Pose2d)
+        self.heading_publisher = self.telemetry.double("Current Odo Heading")
+        self.runtime_publisher = self.telemetry.double("Drive Periodic Runtime")
+        self.shot_rpm_publisher = self.telemetry.double("Shot RPM")
+        self.shot_distance_publisher = self.telemetry.double("Shot Distance")
+        self.module_states_publisher = self.telemetry.struct_array("Module States", SwerveModuleState)
+        self.module_targets_publisher = self.telemetry.struct_array("Module Targets", SwerveModuleState)
+        self.setpoints_sent_publisher = self.telemetry.double("Setpoint Writes Sent")
+        self.setpoints_suppressed_publisher = self.telemetry.double("Setpoint Writes Suppressed")
+        self.vision_accepted_publisher = self.telemetry.double("Vision Accepted")
+        self.vision_rejected_publisher = self.telemetry.double("Vision Rejected")
+
         # Setup a boolean to locally store which alliance the robot is on. The system will periodically check, but this
         # ensures that we are never in a situation where a read error will prevent the robot from functioning.
         self.blue_alliance = False
@@ -118,12 +170,9 @@ class DriveSubsystem(commands2.Subsystem):
         self.period_update_time = self.timer.get()
         self.current_time = self.timer.get()
 
-        # Setup for shoot while moving calculations, this is all for determining the robot's average speed and
-        # acceleration.
-        self.loop_time = self.timer.get()
-        self.vx_old = 0
-        self.vy_old = 0
-        self.omega_old = 0
+        # Setup for shoot while moving calculations, this is all for determining the robot's filtered speed and
+        # acceleration. The estimator keeps a timestamped history, so it can also answer for a past or future time.
+        self.motion_estimator = MotionEstimator()
         self.vx_new = 0
         self.vy_new = 0
         self.omega_new = 0
@@ -131,34 +180,31 @@ class DriveSubsystem(commands2.Subsystem):
         self.ay = 0
         self.alpha = 0
 
-        # Setup some variables for Closed Loop Turning.
-        self.clt_target = self.pose_estimator.get_heading().degrees()
-        self.clt_first_time = True
-        self.clt_reset = False
-        self.last_clt_call = self.timer.get()
+        # Setup the shoot while moving solver. The target is fixed, so both alliances' versions are worked out once.
+        self.shot_solver = ShotSolver()
+        self.shot_solution = self.shot_solver.solution
+        blue_target = Translation2d(*LovelyLauncherConstants.target_location)
+        red_target = FlippingUtil.flipFieldPosition(blue_target)
+        self.shot_targets = ((blue_target.X(), blue_target.Y()), (red_target.X(), red_target.Y()))
 
-        # Create Field2d object to display/track robot position.
+        # Create Field2d object to display/track robot position, and the visualizer that keeps it updated.
         self.m_field = Field2d()
+        self.field_visualizer = FieldVisualizer(self.m_field)
 
-    def get_chassis_speeds(self):
-        """Used for 2024 PathPlanner. Converts current module states to a ChassisSpeeds object."""
-        return DriveConstants.m_kinematics.toChassisSpeeds((self.m_FL.get_state_onboard(),
-                                                           self.m_FR.get_state_onboard(),
-                                                           self.m_BL.get_state_onboard(),
-                                                           self.m_BR.get_state_onboard()))
+        # Create the cache for on-the-fly paths used by follow_path_command.
+        self.path_cache = PathCache()
 
-    def drive_by_chassis_speeds(self, chassis_speeds: ChassisSpeeds):
-        """Used for 2024 PathPlanner. Takes in ChassisSpeeds, sets target module states."""
-        swerve_module_states = DriveConstants.m_kinematics.toSwerveModuleStates(chassis_speeds)
+        # Start the pathfinder (and load its navgrid) on a worker thread now, so the first pathfind doesn't pay for it.
+        self.pathfinder = BackgroundPathfinder()
 
-        self.set_module_states(swerve_module_states)
+    def get_chassis_speeds(self) -> ChassisSpeeds:
+        """Used for 2024 PathPlanner. Returns this cycle's robot relative ChassisSpeeds from the sensor snapshot."""
+        return self.snapshot.chassis_speeds
 
-        # Set all swerve module state targets and update the dashboard with the targets.
-        # self.m_FL.set_desired_state_onboard(swerve_module_states[0])
-        # self.m_FR.set_desired_state_onboard(swerve_module_states[1])
-        # self.m_BL.set_desired_state_onboard(swerve_module_states[2])
-        # self.m_BR.set_desired_state_onboard(swerve_module_states[3])
-        self.clt_target = self.get_heading_odo().degrees()
+    def drive_by_chassis_speeds(self, chassis_speeds: ChassisSpeeds):
+        """Used for 2024 PathPlanner. Takes in ChassisSpeeds, sets target module states."""
+        self.drive_robot_relative(chassis_speeds.vx, chassis_speeds.vy, chassis_speeds.omega)
+        self.heading_hold.release()
 
     def drive_2ok(self, x_speed: float, y_speed: float, rot: float, field_relative: bool) -> None:
         """
@@ -176,54 +222,46 @@ class DriveSubsystem(commands2.Subsystem):
             x_speed = -1 * x_speed
             y_speed = -1 * y_speed
 
-        # If in robot relative, drive robot relative.
-        if not field_relative:
-            swerve_module_states = DriveConstants.m_kinematics.toSwerveModuleStates(
-                ChassisSpeeds.discretize(x_speed, y_speed, rot, self.current_time - self.last_time)
-            )
-        # If in field relative, drive in field relative.
-        else:
-            swerve_module_states = DriveConstants.m_kinematics.toSwerveModuleStates(
-                ChassisSpeeds.discretize(
-                    ChassisSpeeds.fromFieldRelativeSpeeds(x_speed,
-                                                          y_speed,
-                                                          rot,
-                                                          self.get_heading_odo()),
-                    self.current_time - self.last_time
-                )
-            )
+        # If in field relative, rotate the speeds into the robot's frame first.
+        if field_relative:
+            x_speed, y_speed = from_field_relative(x_speed, y_speed, self.get_heading_odo())
 
-        # Set the module states.
-        self.set_module_states(swerve_module_states)
+        # Correct for the robot rotating while it translates over the loop, then set the module states.
+        self.drive_robot_relative(*discretize(x_speed, y_speed, rot, self.current_time - self.last_time))
     
         # Record the last time this function ran.
         self.last_time = self.timer.get()
 
+    def drive_field_speeds(self, x_speed: float, y_speed: float, rot: float) -> None:
+        """
+        Drive with field relative speeds in the pose estimator's frame, for commands that steer at field positions.
+        Unlike drive_2ok there is no alliance flip, since that's only there for the driver's point of view.
+        x_speed: Float, m/s along the field x axis.
+        y_speed: Float, m/s along the field y axis.
+        rot: Float, same units and sign as drive_2ok.
+        """
+        self.current_time = self.timer.get()
+        x_speed, y_speed = from_field_relative(x_speed, y_speed, self.get_heading_odo())
+        self.drive_robot_relative(*discretize(x_speed, y_speed, rot, self.current_time - self.last_time))
+        self.last_time = self.timer.get()
+        self.heading_hold.release()
+
     def drive_2ok_clt(self, x_speed: float, y_speed: float, rot: float, field_relative: bool) -> None:
         """Drive with closed loop turning and loop variance compensation active."""
-        current_heading = self.get_heading_odo().degrees()
-
-        if self.clt_first_time:
-            self.clt_target = current_heading
-            self.clt_first_time = False
-
         if rot != 0:
             self.drive_2ok(x_speed, y_speed, rot * DriveConstants.kMaxAngularSpeed, field_relative)
-            self.clt_reset = True
+            self.heading_hold.release()
         elif -0.5 * DriveConstants.kMaxSpeed <= x_speed <= 0.5 * DriveConstants.kMaxSpeed and \
                 -0.5 * DriveConstants.kMaxSpeed <= y_speed <= 0.5 * DriveConstants.kMaxSpeed:
             self.drive_2ok(x_speed, y_speed, rot * DriveConstants.kMaxAngularSpeed, field_relative)
-            self.clt_reset = True
+            self.heading_hold.release()
         else:
-            if self.clt_reset:
-                current_angular_velocity = self.get_angular_velocity() * 180 / math.pi
-                self.clt_target = current_heading + (current_angular_velocity * (self.timer.get() - self.last_clt_call))
-                self.clt_reset = False
-            rotate_output = self.clt_controller.calculate(self.clt_target, current_heading)
+            # The heading comes from odometry so it matches the rest of the drive code, the rate and its timestamp
+            # straight from the navX.
+            rotate_output = self.heading_hold.calculate(self.get_heading_odo().degrees(), self.snapshot.yaw_rate,
+                                                        self.snapshot.yaw_sensor_time, Timer.getFPGATimestamp())
             self.drive_2ok(x_speed, y_speed, rotate_output, field_relative)
 
-        self.last_clt_call = self.timer.get()
-
     def drive(self, x_speed: float, y_speed: float, rot: float, field_relative: bool) -> None:
         """The default drive command for the robot.
         x_speed: Float, -max_speed to +max_speed.
@@ -231,18 +269,12 @@ class DriveSubsystem(commands2.Subsystem):
         rot: Float, -max_angular_speed to + max_angular_speed.
         field_relative: Boolean. Toggles between field relative and robot relative.
         """
-        # If in field relative mode, get swerve module states.
+        # If in field relative mode, rotate the speeds into the robot's frame.
         if field_relative:
-            swerve_module_states = DriveConstants.m_kinematics.toSwerveModuleStates(
-                ChassisSpeeds.fromFieldRelativeSpeeds(x_speed, y_speed, -rot,
-                                                      self.get_heading_odo()))
-        # If in robot relative mode, get swerve module states.
+            self.drive_robot_relative(*from_field_relative(x_speed, y_speed, self.get_heading_odo()), -rot)
+        # If in robot relative mode, use the speeds as they are.
         else:
-            swerve_module_states = DriveConstants.m_kinematics.toSwerveModuleStates(ChassisSpeeds(-x_speed,
-                                                                                                  -y_speed, -rot))
-
-        # Set all swerve module state targets and update the dashboard with the targets.
-        self.set_module_states(swerve_module_states)
+            self.drive_robot_relative(-x_speed, -y_speed, -rot)
 
     def drive_slow(self, x_speed: float, y_speed: float, rot: float, field_relative: bool, slow: float) -> None:
         """Alternate drive command that reduces maximum speed by a given multiplier.
@@ -256,14 +288,11 @@ class DriveSubsystem(commands2.Subsystem):
 
     def drive_lock(self) -> None:
         """Alternate drive command that locks all swerve modules into rotation position, a 'hard' brake setting."""
-        swerve_module_states = DriveConstants.m_kinematics.toSwerveModuleStates(
-            ChassisSpeeds(0, 0, 0.01))
-
-        self.set_module_states(swerve_module_states)
+        self.drive_robot_relative(0, 0, 0.01)
 
     def get_pose(self) -> Pose2d:
-        """Return pose estimator's estimated position."""
-        return self.pose_estimator.get_pose()
+        """Return pose estimator's estimated position, as of the start of this cycle."""
+        return self.snapshot.pose
 
     def reset_odometry(self, pose: Pose2d) -> None:
         """
@@ -274,12 +303,16 @@ class DriveSubsystem(commands2.Subsystem):
         self.m_FR.reset_encoders()
         self.m_BL.reset_encoders()
         self.m_BR.reset_encoders()
+        # Samples and vision measurements taken before the reset would undo it, and velocities from before it are in
+        # the old field frame.
+        self.odometry_thread.clear()
+        self.vision_queue.clear()
+        self.motion_estimator.reset()
         self.pose_estimator.reset_odometry(pose,
                                            Rotation2d.fromDegrees(self.get_heading()),
-                                           SwerveModulePosition(0, self.m_FL.get_position_onboard().angle),
-                                           SwerveModulePosition(0, self.m_FR.get_position_onboard().angle),
-                                           SwerveModulePosition(0, self.m_BL.get_position_onboard().angle),
-                                           SwerveModulePosition(0, self.m_BR.get_position_onboard().angle))
+                                           *(SwerveModulePosition(0, position.angle)
+                                             for position in self.snapshot.module_positions))
+        self.snapshot.refresh_pose()
 
     def reset_position_no_rotation(self, location: Translation2d) -> None:
         """For manually performing a hard pose update that won't affect the robot's rotation. WARNING: Deprecated."""
@@ -291,43 +324,43 @@ class DriveSubsystem(commands2.Subsystem):
         self.m_FR.reset_encoders()
         self.m_BL.reset_encoders()
         self.m_BR.reset_encoders()
+        # Samples and vision measurements taken before the reset would undo it, and velocities from before it are in
+        # the old field frame.
+        self.odometry_thread.clear()
+        self.vision_queue.clear()
+        self.motion_estimator.reset()
         self.pose_estimator.reset_odometry(Pose2d(location, current_rotation),
                                            Rotation2d.fromDegrees(self.get_heading()),
-                                           SwerveModulePosition(0, self.m_FL.get_position_onboard().angle),
-                                           SwerveModulePosition(0, self.m_FR.get_position_onboard().angle),
-                                           SwerveModulePosition(0, self.m_BL.get_position_onboard().angle),
-                                           SwerveModulePosition(0, self.m_BR.get_position_onboard().angle))
+                                           *(SwerveModulePosition(0, position.angle)
+                                             for position in self.snapshot.module_positions))
+        self.snapshot.refresh_pose()
+
+    def drive_robot_relative(self, vx: float, vy: float, omega: float) -> None:
+        """Turn robot relative speeds into module targets with the fast kinematics path and send them out."""
+        self.kinematics.to_module_speeds(vx, vy, omega)
+        self.apply_module_targets()
 
     def set_module_states(self, desired_states) -> None:
-        """Set swerve module states given a list of target states. If in debug mode, inform the dashboard of the
-        targeted states."""
-        desired_states = SwerveDrive4Kinematics.desaturateWheelSpeeds(desired_states, DriveConstants.kMaxSpeed)
-        self.m_FL.set_desired_state_onboard(desired_states[0])
-        self.m_FR.set_desired_state_onboard(desired_states[1])
-        self.m_BL.set_desired_state_onboard(desired_states[2])
-        self.m_BR.set_desired_state_onboard(desired_states[3])
-
-        if self.debug_mode:
-            if desired_states[0].angle.degrees() >= 0:
-                SmartDashboard.putNumber("FL Target", desired_states[0].angle.degrees())
-            else:
-                SmartDashboard.putNumber("FL Target", (desired_states[0].angle.degrees() + 360))
-            SmartDashboard.putNumber("FL Target Speed", desired_states[0].speed)
-            if desired_states[1].angle.degrees() >= 0:
-                SmartDashboard.putNumber("FR Target", desired_states[1].angle.degrees())
-            else:
-                SmartDashboard.putNumber("FR Target", (desired_states[1].angle.degrees() + 360))
-            SmartDashboard.putNumber("FR Target Speed", desired_states[1].speed)
-            if desired_states[2].angle.degrees() >= 0:
-                SmartDashboard.putNumber("BL Target", desired_states[2].angle.degrees())
-            else:
-                SmartDashboard.putNumber("BL Target", (desired_states[2].angle.degrees() + 360))
-            SmartDashboard.putNumber("BL Target Speed", desired_states[2].speed)
-            if desired_states[3].angle.degrees() >= 0:
-                SmartDashboard.putNumber("BR Target", desired_states[3].angle.degrees())
-            else:
-                SmartDashboard.putNumber("BR Target", (desired_states[3].angle.degrees() + 360))
-            SmartDashboard.putNumber("BR Target Speed", desired_states[3].speed)
+        """Set swerve module states given a list of target states."""
+        for index, state in enumerate(desired_states):
+            self.kinematics.speeds[index] = state.speed
+            self.kinematics.angles[index] = state.angle.degrees()
+        self.apply_module_targets()
+
+    def apply_module_targets(self) -> None:
+        """Desaturate and optimize the targets held by the kinematics path, then send them to the modules. The
+        targets stay in the kinematics path so periodic can publish them in debug mode."""
+        self.kinematics.desaturate(DriveConstants.kMaxSpeed)
+        for index, state in enumerate(self.snapshot.module_states):
+            self.module_degrees[index] = state.angle.degrees() % 360
+        self.kinematics.optimize(self.module_degrees)
+
+        speeds = self.kinematics.speeds
+        angles = self.kinematics.angles
+        self.m_FL.set_optimized_onboard(speeds[0], angles[0])
+        self.m_FR.set_optimized_onboard(speeds[1], angles[1])
+        self.m_BL.set_optimized_onboard(speeds[2], angles[2])
+        self.m_BR.set_optimized_onboard(speeds[3], angles[3])
 
     def reset_encoders(self) -> None:
         """Manually reset only the swerve module drive encoders."""
@@ -339,14 +372,15 @@ class DriveSubsystem(commands2.Subsystem):
     def zero_heading(self) -> None:
         """Reset robot absolute heading to zero. WARNING: DO NOT USE."""
         self.gyro.zeroYaw()
+        self.motion_estimator.reset()
 
-    def get_heading(self) -> Rotation2d:
-        """Retrieve robot heading directly from the IMU."""
-        return self.gyro.getYaw()
+    def get_heading(self) -> float:
+        """Retrieve robot heading (degrees) as read from the IMU at the start of this cycle."""
+        return self.snapshot.yaw
 
     def get_heading_odo(self) -> Rotation2d:
         """Returns the pose estimator's estimated robot heading."""
-        return self.pose_estimator.get_heading()
+        return self.snapshot.heading
 
     def snap_drive(self, x_speed: float, y_speed: float, heading_target: float) -> None:
         """
@@ -359,7 +393,7 @@ class DriveSubsystem(commands2.Subsystem):
         if self.blue_alliance:
             heading_target = heading_target + 180
         rotate_output = self.snap_controller.calculate(heading_target, current_heading)
-        self.clt_target = current_heading
+        self.heading_hold.release()
         self.drive_2ok(x_speed, y_speed, rotate_output, True)
 
     def snap_drive_targeting(self, x_speed: float, y_speed: float, heading_target: float) -> None:
@@ -371,7 +405,7 @@ class DriveSubsystem(commands2.Subsystem):
             rotate_output = -0.11
         elif 0 < rotate_output <= 0.2:
             rotate_output = 0.11
-        self.clt_target = self.get_heading_odo().degrees()
+        self.heading_hold.release()
         self.drive_2ok(x_speed, y_speed, rotate_output, True)
 
     def snap_drive_absolute(self, x_speed: float, y_speed: float, heading_target: float) -> None:
@@ -381,13 +415,13 @@ class DriveSubsystem(commands2.Subsystem):
         y_speed: Float, -max_speed to +max_speed
         heading_target; Float, degree target angle
         """
-        self.clt_target = self.get_heading_odo().degrees()
+        self.heading_hold.release()
         self.drive_2ok(x_speed, y_speed, self.snap_controller.calculate(heading_target,
                                                                         self.get_heading_odo().degrees()), True)
 
     def auto_balance(self, front_back: int):
         """Automatically balance on the charge station. front_back = 1 for forward. -1 for backward."""
-        balance_output = self.balance_controller.calculate(-1 * self.gyro.getRoll(), 0)
+        balance_output = self.balance_controller.calculate(-1 * self.snapshot.roll, 0)
         if self.balanced is False:
             self.snap_drive(DriveConstants.kMaxSpeed * front_back * balance_output, 0, 0)
         else:
@@ -404,6 +438,7 @@ class DriveSubsystem(commands2.Subsystem):
     def debug_toggle(self, on: bool) -> None:
         """Toggles Debug Mode on and off."""
         self.debug_mode = on
+        self.telemetry.debug_mode = on
 
     def get_path_flip(self) -> bool:
         """Returns true if the autonomous paths need to be mirrored."""
@@ -413,16 +448,10 @@ class DriveSubsystem(commands2.Subsystem):
             return False
 
     def follow_path_command(self, target_location: list[float]) -> commands2.Command:
-        """Transforms a set of target coordinates and an end rotation state into a parth following command."""
-        bezier_points = PathPlannerPath.waypointsFromPoses([
-            self.get_pose(),
-            Pose2d(target_location[0], target_location[1], Rotation2d.fromDegrees(target_location[2]))])
-
-        path = PathPlannerPath(
-            bezier_points,
-            PathConstraints(2, 2, 2 * 3.14159, 4 * 3.14159),
-            GoalEndState(0, Rotation2d.fromDegrees(target_location[2]))
-        )
+        """Transforms a set of target coordinates and an end rotation state into a parth following command. Target
+        coordinates are blue alliance; the path cache hands back the variant for our alliance."""
+        path = self.path_cache.get(self.get_pose(), target_location, AutoConstants.path_constraints,
+                                   self.get_path_flip())
 
         return AutoBuilder.followPath(path)
         '''
@@ -444,16 +473,12 @@ class DriveSubsystem(commands2.Subsystem):
         '''
 
     def pathfind(self, target_location: list[float]) -> commands2.Command:
+        """Plans a path to a set of target coordinates in the background, then follows it. The default drive command
+        keeps running until the path is ready."""
         target_pose = Pose2d(target_location[0], target_location[1], Rotation2d.fromDegrees(target_location[2]))
 
-        constraints = PathConstraints(3, 4, 9.424, 12.567)
-
-        return AutoBuilder.pathfindToPose(
-            target_pose,
-            constraints,
-            0.0,
-            0.0
-        )
+        return self.pathfinder.pathfind_command(self.get_pose, target_pose,
+                                                PathConstraints(*PathfindingConstants.constraints))
         '''
         return PathfindHolonomic(
             constraints,
@@ -477,43 +502,49 @@ class DriveSubsystem(commands2.Subsystem):
 
     def get_field_relative_velocity(self) -> tuple[float, float, float]:
         """Returns the instantaneous velocity of the robot."""
-        return self.get_chassis_speeds().vx * self.get_heading_odo().cos() - \
-            self.get_chassis_speeds().vy * self.get_heading_odo().sin(), \
-            self.get_chassis_speeds().vy * self.get_heading_odo().cos() + \
-            self.get_chassis_speeds().vx * self.get_heading_odo().sin(), self.get_chassis_speeds().omega
+        return self.snapshot.field_velocity
 
     def get_angular_velocity(self) -> float:
-        return self.get_chassis_speeds().omega
-
-    def get_field_relative_acceleration(self, new_speed, old_speed, time: float) -> tuple[float, float, float]:
-        """Returns the instantaneous acceleration of the robot."""
-        ax = (new_speed[0] - old_speed[0]) / time
-        ay = (new_speed[1] - old_speed[1]) / time
-        alpha = (new_speed[2] - old_speed[2]) / time
-
-        if abs(ax) > 6.0:
-            ax = 6.0 * math.copysign(1, ax)
-        if abs(ay) > 6.0:
-            ay = 6.0 * math.copysign(1, ay)
-        if abs(alpha) > 4 * math.pi:
-            alpha = 4 * math.pi * math.copysign(1, alpha)
+        return self.snapshot.chassis_speeds.omega
 
-        return ax, ay, alpha
+    def get_field_relative_acceleration(self) -> tuple[float, float, float]:
+        """Returns the filtered acceleration of the robot. It lags by motion_estimator.delay seconds."""
+        return self.ax, self.ay, self.alpha
 
-    def turret_drive(self, x_speed: float, y_speed: float, heading_target: float) -> None:
+    def turret_drive(self, x_speed: float, y_speed: float, heading_target: float, field_absolute: bool = False) -> None:
         """
         Calculate and implement the PID controller for rotating to and maintaining a target heading.
         x_speed: Float, -max_speed to +max_speed.
         y_speed: Float, -max_speed to +max_speed.
         heading_target: Float, degree target angle.
+        field_absolute: Boolean, true if heading_target is already in field coordinates and shouldn't be adjusted for
+        the alliance.
         """
         current_heading = self.get_heading_odo().degrees()
-        if self.blue_alliance:
+        if self.blue_alliance and not field_absolute:
             heading_target = heading_target + 180
         rotate_output = self.turret_controller.calculate(heading_target, current_heading)
-        self.clt_target = current_heading
+        self.heading_hold.release()
         self.drive_2ok(x_speed, y_speed, rotate_output, True)
 
+    def solve_shot(self) -> ShotSolution:
+        """Solve the shot at the target from the robot's current pose, velocity and acceleration. The acceleration lags
+        by motion_estimator.delay, which the solver allows for by trusting only part of it. The solution is also kept
+        in self.shot_solution for the launcher."""
+        target_x, target_y = self.shot_targets[1 if self.get_path_flip() else 0]
+        pose = self.snapshot.pose
+        return self.shot_solver.solve(pose.X(), pose.Y(), self.vx_new, self.vy_new, self.ax, self.ay,
+                                      target_x, target_y)
+
+    def shoot_while_moving_drive(self, x_speed: float, y_speed: float) -> None:
+        """
+        Drive while keeping the launcher pointed at the moving robot's aim point.
+        x_speed: Float, -max_speed to +max_speed.
+        y_speed: Float, -max_speed to +max_speed.
+        """
+        solution = self.solve_shot()
+        self.turret_drive(x_speed, y_speed, solution.heading + LovelyLauncherConstants.heading_offset, True)
+
     def get_current_draw_all_modules(self) -> list[tuple[float, float]]:
         """Returns the current draws for each swerve module as a list."""
         return [
@@ -529,29 +560,45 @@ class DriveSubsystem(commands2.Subsystem):
         else:
             self.blue_alliance = False
 
+    def update_odometry(self) -> None:
+        """Feed every odometry thread sample since the last call to the pose estimator, with the time it was taken. If
+        the thread hasn't produced anything, fall back to this cycle's snapshot."""
+        thread = self.odometry_thread
+        count = thread.drain()
+        if count == 0:
+            self.pose_estimator.update_with_time(self.snapshot.timestamp, Rotation2d.fromDegrees(self.snapshot.yaw),
+                                                 *self.snapshot.module_positions)
+            return
+
+        for index in range(count):
+            drive_positions = thread.drained_drive_positions[index]
+            steer_positions = thread.drained_steer_positions[index]
+            self.pose_estimator.update_with_time(
+                thread.drained_times[index],
+                Rotation2d.fromDegrees(thread.drained_yaws[index]),
+                *(SwerveModulePosition(drive_positions[module], Rotation2d((steer_positions[module] % 1) * math.tau))
+                  for module in range(4))
+            )
+
     def periodic(self) -> None:
         """Update robot odometry, pose, and dashboard readouts."""
         # Record the time that periodic begins.
         start_time = self.timer.get()
-
-        # Update the pose estimator and pose display with any changes in robot state.
-        self.pose_estimator.update_odometry(Rotation2d.fromDegrees(self.get_heading()),
-                                            self.m_FL.get_position_onboard(),
-                                            self.m_FR.get_position_onboard(),
-                                            self.m_BL.get_position_onboard(),
-                                            self.m_BR.get_position_onboard())
-        self.m_field.setRobotPose(self.get_pose())
-        PathPlannerLogging.setLogActivePathCallback(lambda poses: self.m_field.getObject('path').setPoses(poses))
-
-        # Record the robot's instantaneous velocity and acceleration.
-        self.vx_new, self.vy_new, self.omega_new = self.get_field_relative_velocity()
-        self.ax, self.ay, self.alpha = self.get_field_relative_acceleration([self.vx_new, self.vy_new, self.omega_new],
-                                                                            [self.vx_old, self.vy_old, self.omega_old],
-                                                                            self.timer.get() - self.loop_time)
-        self.vx_old = self.vx_new
-        self.vy_old = self.vy_new
-        self.omega_old = self.omega_new
-        self.loop_time = self.timer.get()
+        self.telemetry.start_cycle(start_time)
+
+        # Read every sensor once for this cycle, update the pose estimator with the odometry samples taken since the
+        # last cycle and then the vision measurements queued since the last cycle, then update the pose display.
+        self.snapshot.refresh_sensors()
+        self.update_odometry()
+        self.vision_queue.flush(self.pose_estimator, self.snapshot.timestamp, self.snapshot.yaw_rate)
+        self.snapshot.refresh_pose()
+        self.field_visualizer.set_robot_pose(self.snapshot.pose)
+
+        # Record the robot's filtered velocity and acceleration.
+        self.motion_estimator.add(self.snapshot.timestamp, *self.snapshot.field_velocity)
+        self.vx_new, self.vy_new, self.omega_new = \
+            self.motion_estimator.vx, self.motion_estimator.vy, self.motion_estimator.omega
+        self.ax, self.ay, self.alpha = self.motion_estimator.ax, self.motion_estimator.ay, self.motion_estimator.alpha
 
         # Perform any low time priority tasks.
         if self.timer.get() - 0.5 > self.period_update_time:
@@ -563,21 +610,25 @@ class DriveSubsystem(commands2.Subsystem):
 
             self.period_update_time = self.timer.get()
 
-        SmartDashboard.putData("Field", self.m_field)
-        SmartDashboard.putNumber("Current Odo Heading", self.get_heading_odo().degrees())
-        # SmartDashboard.putNumber("CLT Target Heading", self.clt_target)
-        # SmartDashboard.putString("Estimated Pose", str(self.get_pose()))
-        # TODO See how much the SmartDashboard pushes are slowing down drive periodic.
-        SmartDashboard.putNumber("Drive Periodic Runtime", self.timer.get() - start_time)
-
-        if self.debug_mode is True:
-            SmartDashboard.putNumber("FL Angle", self.m_FL.get_state_onboard().angle.degrees())
-            SmartDashboard.putNumber("FL Speed", abs(self.m_FL.get_state_onboard().speed))
-            SmartDashboard.putNumber("FR Angle", self.m_FR.get_state_onboard().angle.degrees())
-            SmartDashboard.putNumber("FR Speed", abs(self.m_FR.get_state_onboard().speed))
-            SmartDashboard.putNumber("BL Angle", self.m_BL.get_state_onboard().angle.degrees())
-            SmartDashboard.putNumber("BL Speed", abs(self.m_BL.get_state_onboard().speed))
-            SmartDashboard.putNumber("BR Angle", self.m_BR.get_state_onboard().angle.degrees())
-            SmartDashboard.putNumber("BR Speed", abs(self.m_BR.get_state_onboard().speed))
+        self.pose_publisher.set(self.snapshot.pose)
+
+        if self.telemetry.active(Telemetry.SLOW):
+            self.heading_publisher.set(self.snapshot.heading.degrees())
+
+        if self.telemetry.active(Telemetry.DEBUG):
+            self.module_states_publisher.set(self.snapshot.module_states)
+            self.module_targets_publisher.set([SwerveModuleState(speed, Rotation2d.fromDegrees(angle)) for speed, angle
+                                               in zip(self.kinematics.speeds, self.kinematics.angles)])
             SmartDashboard.putData("Snap Controller", self.snap_controller)
-            SmartDashboard.putData("CLT Controller", self.clt_controller)
+            SmartDashboard.putData("CLT Controller", self.heading_hold.controller)
+            counts = [module.get_setpoint_counts() for module in self.snapshot.modules]
+            self.setpoints_sent_publisher.set(sum(sent for sent, _ in counts))
+            self.setpoints_suppressed_publisher.set(sum(suppressed for _, suppressed in counts))
+            self.vision_accepted_publisher.set(self.vision_queue.gate.accepted)
+            self.vision_rejected_publisher.set(self.vision_queue.gate.rejected)
+
+        # Measured last so the number includes the cost of the dashboard pushes above.
+        if self.telemetry.active(Telemetry.SLOW):
+            self.runtime_publisher.set(self.timer.get() - start_time)
+            self.shot_rpm_publisher.set(self.shot_solution.rpm)
+            self.shot_distance_publisher.set(self.shot_solution.distance)
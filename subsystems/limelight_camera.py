@@ -4,12 +4,43 @@
 # the WPILib BSD license file in the root directory of this project.
 #
 
+from typing import NamedTuple
 from wpilib import Timer
 from commands2 import Subsystem
-from ntcore import NetworkTableInstance
+from ntcore import NetworkTableInstance, PubSubOptions
+from wpimath.geometry import Pose2d, Rotation2d
+from constants import VisionConstants
+
+
+class TargetFrame(NamedTuple):
+    """One camera frame's primary target, all from the same t2d update."""
+    timestamp: float  # FPGA seconds the image was captured.
+    latency: float  # Seconds from capture to the frame reaching the roboRIO.
+    valid: bool
+    tx: float
+    ty: float
+    ta: float
+
+
+class PoseFrame(NamedTuple):
+    """One camera frame's AprilTag robot pose, all from the same botpose update."""
+    timestamp: float  # FPGA seconds the image was captured.
+    pose: Pose2d  # Blue origin.
+    tag_count: int
+    distance: float  # Average tag distance in meters.
+    area: float  # Average tag area in percent of the image.
 
 
 class LimelightCamera(Subsystem):
+    """A Limelight, read through NetworkTables subscriber queues.
+
+    Everything comes from two array topics the Limelight publishes once per frame, t2d for the primary target and
+    botpose_wpiblue for the robot pose, so every value in a sample is from the same frame. periodic drains both queues
+    once, so each frame is seen exactly once, and turns them into immutable TargetFrame and PoseFrame samples.
+    NetworkTables stamps each update in the roboRIO's FPGA timebase when it arrives, so taking off the latencies the
+    frame carries gives the capture time. A camera counts as updating while frames keep arriving.
+    """
+
     def __init__(self, cameraName: str) -> None:
         super().__init__()
 
@@ -21,16 +52,24 @@ class LimelightCamera(Subsystem):
 
         self.pipelineIndexRequest = self.table.getDoubleTopic("pipeline").publish()
         self.pipelineIndex = self.table.getDoubleTopic("getpipe").getEntry(-1)
-        # "cl" and "tl" are additional latencies in milliseconds
-
         self.ledMode = self.table.getIntegerTopic("ledMode").getEntry(-1)
         self.camMode = self.table.getIntegerTopic("camMode").getEntry(-1)
-        self.tx = self.table.getDoubleTopic("tx").getEntry(0.0)
-        self.ty = self.table.getDoubleTopic("ty").getEntry(0.0)
-        self.ta = self.table.getDoubleTopic("ta").getEntry(0.0)
-        self.hb = self.table.getIntegerTopic("hb").getEntry(0)
-        self.lastHeartbeat = 0
-        self.lastHeartbeatTime = 0
+
+        # Keep every frame between periodic calls, even ones identical to the last.
+        options = PubSubOptions(pollStorage=VisionConstants.frame_queue_size, keepDuplicates=True)
+        # Primary target: valid, target count, pipeline latency (ms), capture latency (ms), tx, ty, txnc, tync, ta, ...
+        self.t2d = self.table.getDoubleArrayTopic("t2d").subscribe([], options)
+        # Robot pose from the AprilTags: x, y, z, roll, pitch, yaw, total latency (ms), tag count, tag span, average tag
+        # distance, average tag area, ...
+        self.botpose = self.table.getDoubleArrayTopic("botpose_wpiblue").subscribe([], options)
+
+        # Frames that arrived since the last periodic, oldest first, and the newest target frame ever.
+        self.targetFrames = []
+        self.poseFrames = []
+        self.latestTarget = TargetFrame(0.0, 0.0, False, 0.0, 0.0, 0.0)
+        self.frameCount = 0
+
+        self.lastFrameTime = 0
         self.heartbeating = False
 
     def setPipeline(self, index: int):
@@ -40,31 +79,53 @@ class LimelightCamera(Subsystem):
         return int(self.pipelineIndex.get(-1))
 
     def getA(self) -> float:
-        return self.ta.get()
+        return self.latestTarget.ta
 
     def getX(self) -> float:
-        return self.tx.get()
+        return self.latestTarget.tx
 
     def getY(self) -> float:
-        return self.ty.get()
+        return self.latestTarget.ty
 
-    def getHB(self) -> float:
-        return self.hb.get()
+    def getLatency(self) -> float:
+        """Seconds from capture to arrival of the newest target frame."""
+        return self.latestTarget.latency
 
-    def hasDetection(self):
-        if self.getX() != 0.0 and self.heartbeating:
-            return True
+    def hasDetection(self) -> bool:
+        return self.latestTarget.valid and self.heartbeating
 
     def getSecondsSinceLastHeartbeat(self) -> float:
-        return Timer.getFPGATimestamp() - self.lastHeartbeatTime
+        return Timer.getFPGATimestamp() - self.lastFrameTime
+
+    def readFrames(self) -> None:
+        """Drain both subscriber queues into targetFrames and poseFrames."""
+        self.targetFrames = []
+        for update in self.t2d.readQueue():
+            values = update.value
+            if len(values) < 9:
+                continue
+            latency = (values[2] + values[3]) / 1000
+            frame = TargetFrame(update.time / 1e6 - latency, latency, values[0] == 1, values[4], values[5], values[8])
+            self.targetFrames.append(frame)
+            self.latestTarget = frame
+
+        self.poseFrames = []
+        for update in self.botpose.readQueue():
+            values = update.value
+            if len(values) < 11 or values[7] == 0:  # No tags in view.
+                continue
+            self.poseFrames.append(PoseFrame(update.time / 1e6 - values[6] / 1000,
+                                             Pose2d(values[0], values[1], Rotation2d.fromDegrees(values[5])),
+                                             int(values[7]), values[9], values[10]))
+
+        self.frameCount += len(self.targetFrames)
 
     def periodic(self) -> None:
         now = Timer.getFPGATimestamp()
-        heartbeat = self.getHB()
-        if heartbeat != self.lastHeartbeat:
-            self.lastHeartbeat = heartbeat
-            self.lastHeartbeatTime = now
-        heartbeating = now < self.lastHeartbeatTime + 5  # no heartbeat for 5s => stale camera
+        self.readFrames()
+        if self.targetFrames:
+            self.lastFrameTime = now
+        heartbeating = now < self.lastFrameTime + 5  # no frames for 5s => stale camera
         if heartbeating != self.heartbeating:
             print(f"Camera {self.cameraName} is " + ("UPDATING" if heartbeating else "NO LONGER UPDATING"))
         self.heartbeating = heartbeating
@@ -2,10 +2,15 @@ import commands2
 import math
 from commands2 import button
 from subsystems.drivesubsystem import DriveSubsystem
-from subsystems.limelight_camera import LimelightCamera
+from subsystems.vision_manager import VisionManager
+from commands.pickup_align import PickupAlign
 from wpilib import DriverStation, Timer
 from helpers.custom_hid import CustomHID
 from helpers.pose_estimator import PoseEstimator
+from helpers.loop_profiler import LoopProfiler
+from helpers.can_budget import CANBudget
+from helpers.motor_config_manager import MotorConfigManager
+from helpers.vision_queue import VisionQueue
 
 
 
@@ -20,9 +25,21 @@ class RobotContainer:
     def __init__(self) -> None:
         self.timer = Timer()
         self.timer.start()
+        self.loop_profiler = LoopProfiler()
         self.pose_estimator = PoseEstimator()
-        self.robot_drive = DriveSubsystem(self.timer, self.pose_estimator)
-        self.camera = LimelightCamera("limelight-pickup")
+        # Cameras queue their poses here and the drive fuses them into the pose estimator once per cycle. The vision
+        # manager is created before the drive so it reads the cameras first each cycle.
+        self.vision_queue = VisionQueue()
+        self.vision = VisionManager(self.vision_queue)
+        # Every SPARK on the robot plans its status frames through this, so the bus load is checked as a whole.
+        self.can_budget = CANBudget()
+        # Motor configs only get written to flash when they change, see MotorConfigManager.
+        self.motor_configs = MotorConfigManager()
+        self.robot_drive = DriveSubsystem(self.timer, self.pose_estimator, self.vision_queue, self.can_budget,
+                                          self.motor_configs)
+        self.motor_configs.finish()
+        self.camera = self.vision.camera("limelight-pickup")
+        self.loop_profiler.watch(self.robot_drive, self.vision)
 
         # Setup driver & operator controllers.
         self.driver_controller_raw = CustomHID(0, "xbox")
@@ -37,7 +54,7 @@ class RobotContainer:
                 self.driver_controller_raw.get_axis_squared("RX", 0.06) * (7 * 2 * math.pi),
                 True
             ), self.robot_drive
-        ))
+        ).withName("Default Drive"))
 
         # Setup for all event-trigger commands.
         self.configureTriggersDefault()
@@ -45,10 +62,10 @@ class RobotContainer:
 
     def configureTriggersDefault(self) -> None:
         """Used to set up any commands that trigger when a measured event occurs."""
-        button.Trigger(lambda: DriverStation.isTeleopEnabled()).onTrue(
-            commands2.cmd.runOnce(lambda: self.robot_drive.set_alliance(), self.robot_drive))
-        button.Trigger(lambda: DriverStation.isDSAttached()).onTrue(
-            commands2.cmd.runOnce(lambda: self.robot_drive.set_alliance(), self.robot_drive))
+        button.Trigger(self.loop_profiler.condition("Teleop Enabled", lambda: DriverStation.isTeleopEnabled())).onTrue(
+            commands2.cmd.runOnce(lambda: self.robot_drive.set_alliance(), self.robot_drive).withName("Set Alliance"))
+        button.Trigger(self.loop_profiler.condition("DS Attached", lambda: DriverStation.isDSAttached())).onTrue(
+            commands2.cmd.runOnce(lambda: self.robot_drive.set_alliance(), self.robot_drive).withName("Set Alliance"))
 
         # Hold for Parking Brake.
         # button.Trigger(lambda: self.driver_controller_raw.get_trigger("L", 0.05)).whileTrue(
@@ -65,36 +82,36 @@ class RobotContainer:
         #        self.driver_controller_raw.refine_trigger("R", 0.05, 0.8, 0.3)), self.robot_drive))
 
         # Press any direction on the D-pad to enable PID snap to that equivalent angle based on field orientation
-        button.Trigger(lambda: self.driver_controller_raw.get_d_pad_pull("N")).toggleOnTrue(
+        d_pad_north = self.loop_profiler.condition("D-Pad N", lambda: self.driver_controller_raw.get_d_pad_pull("N"))
+        button.Trigger(d_pad_north).toggleOnTrue(
             commands2.cmd.run(lambda: self.robot_drive.snap_drive(
                 self.driver_controller_raw.get_axis_squared("LY", 0.06) * 5.06,
                 self.driver_controller_raw.get_axis_squared("LX", 0.06) * 5.06,
                 180
-            ), self.robot_drive))
-        button.Trigger(lambda: self.driver_controller_raw.get_d_pad_pull("S")).toggleOnTrue(
+            ), self.robot_drive).withName("Snap N"))
+        d_pad_south = self.loop_profiler.condition("D-Pad S", lambda: self.driver_controller_raw.get_d_pad_pull("S"))
+        button.Trigger(d_pad_south).toggleOnTrue(
             commands2.cmd.run(lambda: self.robot_drive.snap_drive(
                 self.driver_controller_raw.get_axis_squared("LY", 0.06) * 5.06,
                 self.driver_controller_raw.get_axis_squared("LX", 0.06) * 5.06,
                 0
-            ), self.robot_drive))
-        button.Trigger(lambda: self.driver_controller_raw.get_d_pad_pull("E")).toggleOnTrue(
+            ), self.robot_drive).withName("Snap S"))
+        d_pad_east = self.loop_profiler.condition("D-Pad E", lambda: self.driver_controller_raw.get_d_pad_pull("E"))
+        button.Trigger(d_pad_east).toggleOnTrue(
             commands2.cmd.run(lambda: self.robot_drive.snap_drive(
                 self.driver_controller_raw.get_axis_squared("LY", 0.06) * 5.06,
                 self.driver_controller_raw.get_axis_squared("LX", 0.06) * 5.06,
                 60
-            ), self.robot_drive))
-        button.Trigger(lambda: self.driver_controller_raw.get_d_pad_pull("W")).toggleOnTrue(
+            ), self.robot_drive).withName("Snap E"))
+        d_pad_west = self.loop_profiler.condition("D-Pad W", lambda: self.driver_controller_raw.get_d_pad_pull("W"))
+        button.Trigger(d_pad_west).toggleOnTrue(
             commands2.cmd.run(lambda: self.robot_drive.snap_drive(
                 self.driver_controller_raw.get_axis_squared("LY", 0.06) * 5.06,
                 self.driver_controller_raw.get_axis_squared("LX", 0.06) * 5.06,
                 300
-            ), self.robot_drive))
-        """
-        button.Trigger(lambda: self.driver_controller_raw.get_button("A")).whileTrue(
-            x = self.camera.getX()
-            print(f"CameraX: {x}")
-            turn_speed = -0.005 * x
+            ), self.robot_drive).withName("Snap W"))
 
-            )
-        """
+        # Hold A to drive onto the game piece the pickup camera sees.
+        button.Trigger(self.loop_profiler.condition("A", lambda: self.driver_controller_raw.get_button("A"))).whileTrue(
+            PickupAlign(self.robot_drive, self.camera))
     
\ No newline at end of file
@@ -7,10 +7,15 @@ from wpimath.kinematics import SwerveModulePosition, SwerveModuleState
 import constants
 from typing import Tuple
 from helpers.custom_hid import CustomHID
+from helpers.swerve_kinematics import optimize_module
+from helpers.setpoint_coalescer import SetpointCoalescer
+from helpers.can_budget import CANBudget
+from helpers.motor_config_manager import MotorConfigManager
 
 class SwerveModule:
     
-    def __init__(self, dm_id: int, sm_id: int, analog_channel: int, steer_offset: float, drive_invert: bool, steer_invert: bool):
+    def __init__(self, dm_id: int, sm_id: int, analog_channel: int, steer_offset: float, drive_invert: bool, steer_invert: bool,
+                 can_budget: CANBudget, config_manager: MotorConfigManager):
         print(f"Creating SwerveModule with drive CAN {dm_id}, steer CAN {sm_id}, enc CAN {analog_channel}, steer_offset {steer_offset}")
         """
         dm_id: Drive motor CAN ID, int.
@@ -19,6 +24,8 @@ class SwerveModule:
         mod_offset: For Phoenix5 CANCoder setup, float. <- Scheduled to be deprecated. (We renamed it to steer_offset)
         drive_invert: Boolean for inverting drive motor, True/False.
         steer_invert: Boolean for inverting steer motor, True/False.
+        can_budget: The robot's CANBudget, which sets the status frame rates.
+        config_manager: The robot's MotorConfigManager, which applies the motor configs.
         """
 
         # create motors, encoders, and pid loops
@@ -32,6 +39,14 @@ class SwerveModule:
         self.drive_pid = self.drive_motor.getClosedLoopController()
         self.steer_pid = self.steer_motor.getClosedLoopController()
 
+        # Setpoints go through coalescers so unchanged targets don't take up CAN bandwidth every loop.
+        self.drive_setpoint = SetpointCoalescer(self.drive_pid, rev.SparkFlex.ControlType.kVelocity,
+                                                constants.ModuleConstants.drive_setpoint_epsilon,
+                                                constants.ModuleConstants.setpoint_keep_alive)
+        self.steer_setpoint = SetpointCoalescer(self.steer_pid, rev.SparkMax.ControlType.kPosition,
+                                                constants.ModuleConstants.steer_setpoint_epsilon,
+                                                constants.ModuleConstants.setpoint_keep_alive)
+
         '''
         to adjust the configurations of a motor controller, you can no longer
         just pass them to to motor controller itself, you must create a seperate
@@ -64,11 +79,23 @@ class SwerveModule:
         steer_motor_config.setIdleMode(rev.SparkMaxConfig.IdleMode.kBrake)
         steer_motor_config.closedLoop.pidf(constants.DriveConstants.ob_steer_pid[0], constants.DriveConstants.ob_steer_pid[1], constants.DriveConstants.ob_steer_pid[2], constants.DriveConstants.ob_steer_pid[3])
 
+        # Cached sensor view, filled in by refresh() once per loop so no method has to go back to the SPARKs.
+        self.drive_position = 0.0
+        self.drive_velocity = 0.0
+        self.steer_position = 0.0  # Relative encoder, in module rotations. Not wrapped.
+        self.state = SwerveModuleState()
+        self.position = SwerveModulePosition()
+
+        # Only stream the signals this module reads, at the rates it reads them.
+        can_budget.plan(f"Drive {dm_id}", drive_motor_config, constants.ModuleConstants.drive_signals)
+        can_budget.plan(f"Steer {sm_id}", steer_motor_config, constants.ModuleConstants.steer_signals)
+
         self.set_relative_start()
+        self.refresh()
 
         # apply motor configs
-        self.drive_motor.configure(drive_motor_config, rev.SparkFlex.ResetMode.kResetSafeParameters, rev.SparkFlex.PersistMode.kPersistParameters)
-        self.steer_motor.configure(steer_motor_config, rev.SparkMax.ResetMode.kResetSafeParameters, rev.SparkMax.PersistMode.kPersistParameters)
+        config_manager.configure(f"Drive {dm_id}", self.drive_motor, drive_motor_config)
+        config_manager.configure(f"Steer {sm_id}", self.steer_motor, steer_motor_config)
 
         #with open("home/lvuser/offsetlog.txt", "a") as log:
         #    log.writelines(f"Creating SwerveModule with drive CAN {dm_id}, steer CAN {sm_id}, enc CAN {analog_channel}")
@@ -76,27 +103,59 @@ class SwerveModule:
         
 
 
+    def refresh(self) -> None:
+        """Read each encoder once and update the cached view. Call once per loop, before the module is used."""
+        self.drive_position = self.drive_encoder.getPosition()
+        self.drive_velocity = self.drive_encoder.getVelocity()
+        self.steer_position = self.steer_encoder.getPosition()
+        angle = Rotation2d((self.steer_position % 1) * math.pi * 2)
+        self.state = SwerveModuleState(self.drive_velocity, angle)
+        self.position = SwerveModulePosition(self.drive_position, angle)
+
+    def sample(self) -> Tuple[float, float]:
+        """Read the drive distance and steer rotations straight from the encoders, leaving the cached view alone.
+        Used by the odometry thread."""
+        return self.drive_encoder.getPosition(), self.steer_encoder.getPosition()
+
+    @staticmethod
+    def refresh_all(modules: tuple) -> tuple[tuple, tuple]:
+        """Refresh every module in one pass and return their (states, positions)."""
+        for module in modules:
+            module.refresh()
+        return tuple(module.state for module in modules), tuple(module.position for module in modules)
+
     def degree_to_steer(self, angle: Rotation2d) -> float:
         return (angle.degrees() % 360.0) / 360.0
     
     def set_desired_state_onboard(self, desired_state: SwerveModuleState):
         """Set a desired swerve module state for SPARK MAXes."""
         state = self.optimize_onboard(desired_state)
+        self.set_optimized_onboard(state.speed, state.angle.degrees())
+
+    def set_optimized_onboard(self, speed: float, degrees: float):
+        """Send an already optimized target straight to the SPARKs. Used by the drivetrain's fast kinematics path.
+        speed: Float, wheel speed in m/s.
+        degrees: Float, module angle in degrees.
+        """
+        steer_target = (degrees % 360.0) / 360.0
+        steer_current = self.steer_position % 1
 
-        if 0 < self.degree_to_steer(state.angle) <= 0.25 and 0.75 <= self.steer_encoder.getPosition() % 1 < 1:
+        if 0 < steer_target <= 0.25 and 0.75 <= steer_current < 1:
             wrap_add = 1
-        elif 0 < self.steer_encoder.getPosition() % 1 <= 0.25 and 0.75 <= self.degree_to_steer(state.angle) < 1:
+        elif 0 < steer_current <= 0.25 and 0.75 <= steer_target < 1:
             wrap_add = -1
         else:
             wrap_add = 0
 
-        angle_mod = self.degree_to_steer(state.angle) + math.trunc(self.steer_encoder.getPosition()) + wrap_add
-        self.drive_pid.setReference(state.speed, rev.SparkFlex.ControlType.kVelocity)
-        self.steer_pid.setReference(angle_mod, rev.SparkMax.ControlType.kPosition)
+        angle_mod = steer_target + math.trunc(self.steer_position) + wrap_add
+        self.drive_setpoint.set(speed)
+        self.steer_setpoint.set(angle_mod)
 
     def reset_encoders(self):
         """Reset the drive encoder to its zero position."""
         self.drive_encoder.setPosition(0)
+        self.drive_position = 0.0
+        self.position = SwerveModulePosition(0, self.position.angle)
 
     def set_relative_start(self):
 
@@ -117,38 +176,29 @@ class SwerveModule:
         relative_position = angle_deg / 360.0
 
         self.steer_encoder.setPosition(relative_position)
+        self.steer_position = relative_position
+        # The steer reference is relative to the encoder, so the last one sent no longer means the same thing.
+        self.steer_setpoint.invalidate()
+
+    def get_setpoint_counts(self) -> Tuple[int, int]:
+        """Returns the number of setpoint writes sent to and suppressed from the SPARKs."""
+        return (self.drive_setpoint.sent + self.steer_setpoint.sent,
+                self.drive_setpoint.suppressed + self.steer_setpoint.suppressed)
 
     def get_current_draw(self) -> Tuple[float, float]:
         """Returns a list of the drive and steering motor current draws."""
         return [self.drive_motor.getOutputCurrent(), self.steer_motor.getOutputCurrent()]
 
     def get_state_onboard(self) -> SwerveModuleState:
-        """Returns the current swerve module state."""
-        return SwerveModuleState(self.drive_encoder.getVelocity(),
-                                 Rotation2d((self.steer_encoder.getPosition() % 1) * math.pi * 2))
+        """Returns the swerve module state as of the last refresh."""
+        return self.state
 
     def get_position_onboard(self) -> SwerveModulePosition:
-        return SwerveModulePosition(self.drive_encoder.getPosition(),
-                                Rotation2d((self.steer_encoder.getPosition() % 1) * math.pi * 2))
+        """Returns the swerve module position as of the last refresh."""
+        return self.position
 
     def optimize_onboard(self, desired_state: SwerveModuleState):
-        inverted = False
-        desired_degrees = desired_state.angle.degrees()
-        if desired_degrees < 0:
-            desired_degrees += 360  # converts desired degrees to 360
-
-        current_degrees = (self.steer_encoder.getPosition() % 1) * 360  # converts current to 360
-
-        if 90.0 < abs(current_degrees - desired_degrees) <= 270.0:
-            inverted = True
-            if desired_degrees > 180:
-                desired_degrees -= 180
-            else:
-                desired_degrees += 180
-
-        magnitude = desired_state.speed
-
-        if inverted:
-            magnitude *= -1
-
+        current_degrees = (self.steer_position % 1) * 360  # converts current to 360
+        magnitude, desired_degrees = optimize_module(desired_state.speed, desired_state.angle.degrees(),
+                                                     current_degrees)
         return SwerveModuleState(magnitude, Rotation2d.fromDegrees(desired_degrees))
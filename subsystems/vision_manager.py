@@ -0,0 +1,88 @@
+import commands2
+from wpilib import Timer
+from constants import VisionConstants
+from subsystems.limelight_camera import LimelightCamera
+from helpers.telemetry import Telemetry
+from helpers.vision_queue import VisionQueue
+
+
+class CameraStats:
+    """Frame rate and latency of one camera, averaged over VisionConstants.stats_period."""
+
+    def __init__(self) -> None:
+        self.window_start = 0.0
+        self.frames = 0
+        self.poses = 0
+        self.latency_sum = 0.0
+
+        # Results of the last finished window.
+        self.fps = 0.0
+        self.pose_rate = 0.0
+        self.latency = 0.0  # seconds, capture to arrival.
+
+    def update(self, now: float, camera: LimelightCamera) -> None:
+        """Count the frames the camera read this cycle, and close the window once it's long enough."""
+        for frame in camera.targetFrames:
+            self.latency_sum += frame.latency
+        self.frames += len(camera.targetFrames)
+        self.poses += len(camera.poseFrames)
+
+        elapsed = now - self.window_start
+        if elapsed >= VisionConstants.stats_period:
+            self.fps = self.frames / elapsed
+            self.pose_rate = self.poses / elapsed
+            self.latency = self.latency_sum / self.frames if self.frames else 0.0
+            self.window_start = now
+            self.frames = 0
+            self.poses = 0
+            self.latency_sum = 0.0
+
+
+class VisionManager(commands2.Subsystem):
+    """Owns every camera in VisionConstants.cameras and runs them once per cycle.
+
+    The cameras are taken off the scheduler so their frames are read here, in a fixed order, and every new AprilTag
+    pose from any of them goes into the shared VisionQueue in the same cycle. The queue sorts the whole batch by
+    capture time before the drive fuses it. Create this before the DriveSubsystem so its periodic runs first and the
+    poses are fused the cycle they arrive.
+
+    Each camera gets a "Vision/<name>" array on NetworkTables at the SLOW telemetry rate: updating (1 or 0), frames
+    per second, poses per second and average latency in milliseconds.
+    """
+
+    def __init__(self, vision_queue: VisionQueue, camera_names: list[str] = VisionConstants.cameras) -> None:
+        """
+        vision_queue: VisionQueue the drive fuses into the pose estimator.
+        camera_names: Limelight NetworkTables names, one per camera.
+        """
+        super().__init__()
+        self.vision_queue = vision_queue
+        self.cameras = [LimelightCamera(name) for name in camera_names]
+        self.cameras_by_name = {camera.cameraName: camera for camera in self.cameras}
+        commands2.CommandScheduler.getInstance().unregisterSubsystem(*self.cameras)
+        self.stats = [CameraStats() for _ in self.cameras]
+
+        self.telemetry = Telemetry("Vision")
+        self.stats_publishers = [self.telemetry.double_array(camera.cameraName) for camera in self.cameras]
+
+    def camera(self, name: str) -> LimelightCamera:
+        """Return the camera with the given NetworkTables name."""
+        return self.cameras_by_name[name]
+
+    def updating_count(self) -> int:
+        """Number of cameras still sending frames."""
+        return sum(1 for camera in self.cameras if camera.heartbeating)
+
+    def periodic(self) -> None:
+        now = Timer.getFPGATimestamp()
+        self.telemetry.start_cycle(now)
+        vision_queue = self.vision_queue
+        for camera, stats in zip(self.cameras, self.stats):
+            camera.periodic()
+            for frame in camera.poseFrames:
+                vision_queue.add(frame.pose, frame.timestamp, frame.tag_count, frame.distance, frame.area)
+            stats.update(now, camera)
+
+        if self.telemetry.active(Telemetry.SLOW):
+            for camera, stats, publisher in zip(self.cameras, self.stats, self.stats_publishers):
+                publisher.set([1.0 if camera.heartbeating else 0.0, stats.fps, stats.pose_rate, stats.latency * 1000])
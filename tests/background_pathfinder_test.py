@@ -0,0 +1,144 @@
+'''
+    Runs the background pathfinder against a small local navgrid, with no robot hardware.
+'''
+
+import json
+import time
+import commands2
+import pytest
+from wpilib.simulation import DriverStationSim
+from wpimath.geometry import Pose2d
+from wpimath.geometry import Translation2d
+from pathplannerlib import pathfinders
+from pathplannerlib.path import PathConstraints, PathPlannerPath
+from constants import PathfindingConstants
+from helpers.background_pathfinder import BackgroundPathfinder
+
+NODE_SIZE = 0.3
+CONSTRAINTS = PathConstraints(3, 4, 9.424, 12.567)
+
+
+@pytest.fixture
+def local_navgrid(tmp_path, monkeypatch):
+    """A 6 x 3 meter field with a wall across the middle. The only way past it is a gap along the top edge."""
+    columns, rows = 20, 10
+    grid = [[column == 10 and row < 8 for column in range(columns)] for row in range(rows)]
+    (tmp_path / "pathplanner").mkdir()
+    (tmp_path / "pathplanner" / "navgrid.json").write_text(json.dumps({
+        "field_size": {"x": columns * NODE_SIZE, "y": rows * NODE_SIZE},
+        "nodeSizeMeters": NODE_SIZE,
+        "grid": grid
+    }))
+    monkeypatch.setattr(pathfinders, "getDeployDirectory", lambda: str(tmp_path))
+
+
+class FakePathfinder:
+    """Hands out straight line paths. The first one can be made to end at a previous goal, like a planner that was
+    still busy with the last request."""
+    def __init__(self, stale_goal=None, available=True):
+        self.stale_goal = stale_goal
+        self.available = available
+        self.start = None
+        self.goal = None
+        self.paths_taken = 0
+
+    def setStartPosition(self, start):
+        self.start = start
+
+    def setGoalPosition(self, goal):
+        self.goal = goal
+
+    def isNewPathAvailable(self):
+        return self.available
+
+    def getCurrentPath(self, constraints, goal_end_state):
+        self.paths_taken += 1
+        goal = self.goal
+        if self.stale_goal is not None:
+            goal, self.stale_goal = self.stale_goal, None
+        waypoints = PathPlannerPath.waypointsFromPoses([Pose2d(self.start, goal_end_state.rotation),
+                                                         Pose2d(goal, goal_end_state.rotation)])
+        return PathPlannerPath(waypoints, constraints, None, goal_end_state)
+
+
+@pytest.fixture
+def scheduler():
+    commands2.CommandScheduler.resetInstance()
+    DriverStationSim.setEnabled(True)
+    DriverStationSim.notifyNewData()
+    yield commands2.CommandScheduler.getInstance()
+    DriverStationSim.setEnabled(False)
+    DriverStationSim.notifyNewData()
+    commands2.CommandScheduler.resetInstance()
+
+
+def test_plans_around_wall(local_navgrid):
+    service = BackgroundPathfinder(follow=lambda path: commands2.cmd.none())
+    path = service.request(Pose2d(1, 0.5, 0), Pose2d(5, 0.5, 0), CONSTRAINTS).result(timeout=5)
+
+    assert path is not None
+    points = path.getAllPathPoints()
+    assert points[-1].position.distance(Pose2d(5, 0.5, 0).translation()) < NODE_SIZE
+    # Getting past the wall means going through the gap at the top.
+    assert max(point.position.Y() for point in points) > 7 * NODE_SIZE
+
+
+def test_default_command_runs_until_handoff(local_navgrid, scheduler):
+    drive = commands2.Subsystem()
+    log = []
+    drive.setDefaultCommand(commands2.cmd.run(lambda: log.append("default"), drive))
+    service = BackgroundPathfinder(follow=lambda path: commands2.cmd.run(lambda: log.append("follow"), drive))
+
+    scheduler.run()
+    scheduler.schedule(service.pathfind_command(lambda: Pose2d(1, 0.5, 0), Pose2d(5, 0.5, 0), CONSTRAINTS))
+
+    for _ in range(200):
+        loop_length = len(log)
+        scheduler.run()
+        # Something drives the robot every single loop.
+        assert len(log) > loop_length
+        if log[-1] == "follow":
+            break
+        time.sleep(0.02)
+
+    assert log[-1] == "follow"
+    assert log[0] == "default"
+
+
+def test_rejects_path_to_previous_goal():
+    fake = FakePathfinder(stale_goal=Translation2d(9, 9))
+    service = BackgroundPathfinder(pathfinder_factory=lambda: fake)
+    path = service.request(Pose2d(1, 1, 0), Pose2d(3, 2, 0), CONSTRAINTS).result(timeout=5)
+
+    assert path.getWaypoints()[-1].anchor == Translation2d(3, 2)
+    assert fake.paths_taken == 2
+
+
+def test_timeout_gives_up(monkeypatch):
+    monkeypatch.setattr(PathfindingConstants, "plan_timeout", 0.05)
+    service = BackgroundPathfinder(pathfinder_factory=lambda: FakePathfinder(available=False))
+
+    assert service.request(Pose2d(1, 1, 0), Pose2d(3, 2, 0), CONSTRAINTS).result(timeout=5) is None
+    assert service.timeouts == 1
+
+
+def test_plans_from_pose_when_scheduled(scheduler):
+    fake = FakePathfinder()
+    followed = []
+    service = BackgroundPathfinder(pathfinder_factory=lambda: fake,
+                                   follow=lambda path: commands2.cmd.runOnce(lambda: followed.append(path)))
+    pose = [Pose2d(1, 1, 0)]
+    command = service.pathfind_command(lambda: pose[0], Pose2d(3, 2, 0), CONSTRAINTS)
+
+    # Nothing is planned until the command is scheduled, and by then the robot has moved.
+    service.ready.result(timeout=5)
+    assert fake.goal is None
+    pose[0] = Pose2d(2, 0.5, 0)
+    scheduler.schedule(command)
+    for _ in range(200):
+        scheduler.run()
+        if followed:
+            break
+        time.sleep(0.01)
+
+    assert followed[0].getWaypoints()[0].anchor == Translation2d(2, 0.5)
@@ -0,0 +1,46 @@
+'''
+    Checks the SPARK status frame plan and bus load limit in helpers/can_budget.py.
+'''
+
+import pytest
+import rev
+from constants import CANConstants, ModuleConstants, OdometryConstants
+from helpers.can_budget import CANBudget
+
+
+def test_swerve_plan_fits():
+    budget = CANBudget()
+    for module in range(4):
+        budget.plan(f"Drive {module}", rev.SparkFlexConfig(), ModuleConstants.drive_signals)
+        budget.plan(f"Steer {module}", rev.SparkMaxConfig(), ModuleConstants.steer_signals)
+
+    drive = budget.devices["Drive 0"]
+    assert drive[2] == 1000 / OdometryConstants.rate  # Encoder frame at the rate the odometry thread samples.
+    assert budget.devices["Steer 0"][2] == 1000 / OdometryConstants.rate
+    assert drive[0] == 100  # Current frame at the rate the dashboard needs.
+    assert drive[1] == CANConstants.fault_period
+    assert drive[5] == CANConstants.unused_period
+    assert 0 < budget.bus_load() < CANConstants.max_bus_load
+
+
+def test_plan_sets_config():
+    config = rev.SparkFlexConfig()
+    before = config.flatten()
+    CANBudget().plan("Drive", config, ModuleConstants.drive_signals)
+    assert config.flatten() != before
+
+
+def test_refuses_overloaded_bus():
+    budget = CANBudget()
+    everything_fast = {"appliedOutput": 1, "primaryEncoderPosition": 1, "analogVoltage": 1,
+                       "externalOrAltEncoderPosition": 1, "absoluteEncoderPosition": 1}
+    budget.plan("First", rev.SparkMaxConfig(), ModuleConstants.steer_signals)
+    with pytest.raises(ValueError):
+        budget.plan("Greedy", rev.SparkMaxConfig(), everything_fast)
+    # The refused device isn't part of the plan.
+    assert list(budget.devices) == ["First"]
+
+
+def test_unknown_signal():
+    with pytest.raises(ValueError):
+        CANBudget().plan("Typo", rev.SparkMaxConfig(), {"primaryEncoderPositon": 20})
@@ -0,0 +1,27 @@
+'''
+    Lets every test build a fresh robot in the same process. pyfrc frees a robot's HAL handles (and so its SPARK CAN
+    IDs) once nothing references it, but PathPlanner's AutoBuilder keeps the drive subsystem's methods in class
+    attributes, which would hold the old drivetrain alive into the next test. The odometry notifier is stopped first
+    so it isn't reading the SPARKs while pyfrc resets the HAL.
+'''
+
+import pytest
+from pathplannerlib.auto import AutoBuilder
+
+
+@pytest.fixture(autouse=True)
+def release_robot(robot):
+    """Runs after each test, before pyfrc tears the robot down."""
+    yield
+    container = getattr(robot, "m_robotcontainer", None)
+    if container is not None:
+        # Blocks until a sample in progress has finished.
+        container.robot_drive.odometry_thread.stop()
+    AutoBuilder._configured = False
+    AutoBuilder._pathFollowingCommandBuilder = None
+    AutoBuilder._getPose = None
+    AutoBuilder._resetPose = None
+    AutoBuilder._shouldFlipPath = None
+    AutoBuilder._pathfindingConfigured = False
+    AutoBuilder._pathfindToPoseCommandBuilder = None
+    AutoBuilder._pathfindThenFollowPathCommandBuilder = None
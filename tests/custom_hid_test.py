@@ -0,0 +1,54 @@
+'''
+    Checks CustomHID's per-controller tables and that queries come from the per-cycle snapshot.
+'''
+
+from wpilib.simulation import DriverStationSim, PS4ControllerSim, XboxControllerSim
+from helpers.custom_hid import CustomHID
+
+
+def test_xbox():
+    hid = CustomHID(2, "xbox")
+    sim = XboxControllerSim(2)
+    sim.setAButton(True)
+    sim.setRightX(0.5)
+    sim.setLeftY(-0.03)
+    sim.setRightTriggerAxis(0.8)
+    sim.setPOV(90)
+    DriverStationSim.notifyNewData()
+
+    # Nothing until the snapshot is taken.
+    assert not hid.get_button("A")
+    hid.update()
+    assert hid.get_button("A") and not hid.get_button("B")
+    assert hid.get_axis("RX", 0.06) == 0.5
+    assert hid.get_axis_squared("RX", 0.06) == 0.25
+    assert hid.get_axis("LY", 0.06) == 0.0
+    assert not hid.get_axis_triggered("LY", 0.06)
+    assert hid.get_trigger("R", 0.5) and not hid.get_trigger("L", 0.05)
+    assert abs(hid.get_trigger_raw("R", 0.05) - 0.8) < 1e-6
+    assert hid.get_d_pad() == "E" and hid.get_d_pad_pull("E")
+
+    # The snapshot holds until the next update.
+    sim.setAButton(False)
+    DriverStationSim.notifyNewData()
+    assert hid.get_button("A")
+    hid.update()
+    assert not hid.get_button("A")
+
+
+def test_ps4_uses_only_its_own_mapping():
+    hid = CustomHID(3, "ps4")
+    sim = PS4ControllerSim(3)
+    sim.setCrossButton(True)
+    sim.setRightX(0.0)
+    sim.setR2Axis(0.9)  # Raw axis 4, which is the Xbox right stick X.
+    sim.setL2Axis(-1.0)  # Released.
+    sim.setPOV(-1)
+    DriverStationSim.notifyNewData()
+    hid.update()
+
+    assert hid.get_button("A")
+    assert hid.get_axis("RX", 0.06) == 0.0
+    assert hid.get_trigger("R", 0.9)
+    assert not hid.get_trigger("L", 0.05)
+    assert hid.get_d_pad() == "Z"
@@ -0,0 +1,99 @@
+'''
+    Runs HeadingHold against a simulated drivetrain and measures overshoot and settle time after the driver lets go
+    of the rotation stick.
+'''
+
+import math
+import pytest
+from helpers.heading_hold import HeadingHold
+
+LOOP = 0.02
+SENSOR_PERIOD = 0.01  # The navX updates twice per robot loop over SPI.
+SENSOR_DELAY = 0.01
+RESPONSE_TIME = 0.08  # Time constant of the drivetrain's yaw rate following the rotation command.
+
+
+class SimulatedDrivetrain:
+    """Yaw rate follows the rotation command with a first order lag, one loop after the command is sent. The gyro
+    reports a heading and rate that are SENSOR_DELAY old, refreshed every SENSOR_PERIOD."""
+
+    def __init__(self, rate: float) -> None:
+        self.time = 0.0
+        self.heading = 0.0
+        self.rate = rate
+        self.pending_command = -math.radians(rate)
+        self.history = [(0.0, 0.0, rate)]
+
+    def read_gyro(self) -> tuple[float, float, float]:
+        sample_time = math.floor((self.time - SENSOR_DELAY) / SENSOR_PERIOD) * SENSOR_PERIOD
+        sample = max((entry for entry in self.history if entry[0] <= sample_time), default=self.history[0],
+                     key=lambda entry: entry[0])
+        heading = (sample[1] + 180) % 360 - 180
+        return heading, sample[2], sample[0]
+
+    def step(self, command: float) -> None:
+        # The command sent this loop is acted on next loop.
+        target_rate, self.pending_command = -math.degrees(self.pending_command), command
+        for _ in range(20):
+            dt = LOOP / 20
+            self.rate += (target_rate - self.rate) * dt / RESPONSE_TIME
+            self.heading += self.rate * dt
+            self.time += dt
+            self.history.append((self.time, self.heading, self.rate))
+
+
+def release_stick(rate: float, start_heading: float = 0.0, seconds: float = 2.0) -> tuple[float, float, list]:
+    """Spin at `rate`, let go of the stick and let the heading hold stop the robot.
+    Returns the settled heading, the time it took to settle and the heading trace."""
+    robot = SimulatedDrivetrain(rate)
+    robot.heading = start_heading
+    robot.history = [(0.0, start_heading, rate)]
+    hold = HeadingHold()
+    trace = []
+    for _ in range(int(seconds / LOOP)):
+        heading, measured_rate, sensor_time = robot.read_gyro()
+        robot.step(hold.calculate(heading, measured_rate, sensor_time, robot.time))
+        trace.append((robot.time, robot.heading, robot.rate))
+
+    final = trace[-1][1]
+    settle_time = 0.0
+    for time, heading, heading_rate in trace:
+        if abs(heading - final) > 1 or abs(heading_rate) > 5:
+            settle_time = time
+    return final, settle_time, trace
+
+
+def overshoot(rate: float, final: float, trace: list) -> float:
+    """Degrees the robot went past where it ended up, in the direction it was spinning."""
+    direction = math.copysign(1, rate)
+    return max(0.0, max((heading - final) * direction for _, heading, _ in trace))
+
+
+@pytest.mark.parametrize("rate", [90, -90, 250, -400])
+def test_stops_without_overshoot(rate):
+    hold = HeadingHold()
+    final, settle_time, trace = release_stick(rate)
+
+    assert overshoot(rate, final, trace) < 2
+    assert settle_time < 1.25
+    # It stops where the hold projected it would when it engaged, rather than being dragged back to where the stick
+    # was let go.
+    projected = rate * (hold.sensor_latency + hold.latency)
+    assert final == pytest.approx(hold.settle_target(projected, rate), abs=2)
+
+
+def test_holds_across_wraparound():
+    final, settle_time, trace = release_stick(300, start_heading=170)
+
+    assert overshoot(300, final, trace) < 2
+    assert settle_time < 1.25
+
+
+def test_release_projects_new_target():
+    hold = HeadingHold()
+    hold.calculate(10, 0, 0, 0)
+    assert hold.target == pytest.approx(10)
+
+    hold.release()
+    hold.calculate(30, 0, 1, 1)
+    assert hold.target == pytest.approx(30)
@@ -0,0 +1,49 @@
+'''
+    Checks that LimelightCamera turns NetworkTables updates into one sample per frame, each seen once.
+'''
+
+from ntcore import NetworkTableInstance, PubSubOptions
+from subsystems.limelight_camera import LimelightCamera
+
+
+def make_camera(name: str):
+    table = NetworkTableInstance.getDefault().getTable(name)
+    options = PubSubOptions(keepDuplicates=True)
+    t2d = table.getDoubleArrayTopic("t2d").publish(options)
+    botpose = table.getDoubleArrayTopic("botpose_wpiblue").publish(options)
+    return LimelightCamera(name), t2d, botpose
+
+
+def test_one_sample_per_frame():
+    camera, t2d, _ = make_camera("limelight-test-frames")
+    # Two identical frames then a new one, all between two periodic calls. Times are in microseconds.
+    t2d.set([1, 1, 20, 10, 5.0, -2.0, 0, 0, 1.5], 1_000_000)
+    t2d.set([1, 1, 20, 10, 5.0, -2.0, 0, 0, 1.5], 1_020_000)
+    t2d.set([0, 0, 20, 10, 0, 0, 0, 0, 0], 1_040_000)
+    camera.readFrames()
+
+    assert len(camera.targetFrames) == 3
+    first = camera.targetFrames[0]
+    assert abs(first.timestamp - 0.97) < 1e-9
+    assert abs(first.latency - 0.03) < 1e-9
+    assert first.valid and first.tx == 5.0 and first.ty == -2.0 and first.ta == 1.5
+    # The newest frame has no target.
+    assert camera.getX() == 0 and not camera.latestTarget.valid
+
+    # Nothing new, nothing delivered.
+    camera.readFrames()
+    assert camera.targetFrames == []
+    assert camera.frameCount == 3
+
+
+def test_one_pose_per_frame_with_tags():
+    camera, _, botpose = make_camera("limelight-test-poses")
+    botpose.set([3, 4, 0, 0, 0, 90, 35, 2, 1, 2.5, 0.4], 2_000_000)
+    botpose.set([3, 4, 0, 0, 0, 90, 35, 0, 0, 0, 0], 2_020_000)  # No tags.
+    camera.periodic()
+
+    assert len(camera.poseFrames) == 1
+    frame = camera.poseFrames[0]
+    assert abs(frame.timestamp - 1.965) < 1e-9
+    assert frame.pose.X() == 3 and abs(frame.pose.rotation().degrees() - 90) < 1e-9
+    assert (frame.tag_count, frame.distance, frame.area) == (2, 2.5, 0.4)
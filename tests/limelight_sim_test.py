@@ -0,0 +1,107 @@
+'''
+    Runs LimelightCamera against LimelightSim: tag visibility, latency compensation, stale cameras and high rate
+    ingestion. The throughput benchmark depends on the machine, so it only runs when RUN_BENCHMARKS is set in the
+    environment.
+'''
+
+import os
+import time
+import pytest
+from wpilib.simulation import stepTimingAsync
+from wpimath.geometry import Pose2d, Rotation2d
+from helpers.limelight_sim import LimelightSim
+from helpers.vision_queue import VisionQueue
+from subsystems.limelight_camera import LimelightCamera
+
+# Facing tag 21 on the blue reef from 2 m away.
+FACING_TAG = Pose2d(7.321, 4.026, Rotation2d.fromDegrees(180))
+
+
+def test_publishes_what_the_camera_sees():
+    sim = LimelightSim("limelight-sim-visible", lambda: FACING_TAG, xy_noise=0, heading_noise=0)
+    camera = LimelightCamera("limelight-sim-visible")
+    sim.update(1.0)
+    assert sim.update(1.0 + sim.latency) == 1
+    camera.readFrames()
+
+    target = camera.targetFrames[0]
+    assert target.valid and abs(target.tx) < 1e-9 and target.ty < 0
+    assert abs(target.timestamp - 1.0) < 1e-6
+    pose = camera.poseFrames[0]
+    assert abs(pose.timestamp - 1.0) < 1e-6
+    assert pose.pose.translation().distance(FACING_TAG.translation()) < 1e-9
+    # Tag 21 straight ahead, and the two reef faces either side of it.
+    assert pose.tag_count == 3
+    assert 2.0 < pose.distance < 2.5
+
+    # Turned away from every tag: a frame with no target and no pose.
+    sim.pose_supplier = lambda: Pose2d(7.321, 4.026, Rotation2d.fromDegrees(90))
+    sim.update(1.1)
+    sim.update(1.1 + sim.latency)
+    camera.readFrames()
+    assert not camera.targetFrames[0].valid
+    assert camera.poseFrames == []
+
+
+def test_frame_rate_and_dropouts():
+    sim = LimelightSim("limelight-sim-dropouts", lambda: FACING_TAG, fps=20, dropout=0.5, seed=9037)
+    for step in range(100):
+        sim.update(step * 0.01)
+    # One second at 20 fps, about half lost.
+    assert sim.published + sim.dropped + len(sim.pending) == 20
+    assert 5 < sim.dropped < 15
+
+
+def test_unplugged_camera_goes_stale():
+    sim = LimelightSim("limelight-sim-stale", lambda: FACING_TAG)
+    camera = LimelightCamera("limelight-sim-stale")
+    sim.update(0.0)
+    sim.update(sim.latency)
+    camera.periodic()
+    assert camera.hasDetection()
+
+    sim.connected = False
+    assert sim.update(1.0) == 0
+    # No frames for longer than the stale timeout. The async step doesn't wait on notifiers, no robot is running.
+    stepTimingAsync(6.0)
+    camera.periodic()
+    assert not camera.heartbeating
+    assert not camera.hasDetection()
+
+
+def ingest(name: str) -> tuple[int, float, VisionQueue]:
+    """Run a 1000 fps camera for a second through the ingestion path. Returns the frame count, the worst recovered
+    capture time error and the vision queue."""
+    sim = LimelightSim(name, lambda: FACING_TAG, fps=1000)
+    camera = LimelightCamera(name)
+    vision_queue = VisionQueue()
+    frames = 0
+    latency_error = 0.0
+    for step in range(1000):
+        now = step * 0.001
+        sim.update(now)
+        camera.readFrames()
+        for frame in camera.poseFrames:
+            vision_queue.add(frame.pose, frame.timestamp, frame.tag_count, frame.distance, frame.area)
+            # Every frame is captured on a whole millisecond, so this is how far off the recovered time is.
+            latency_error = max(latency_error, abs(frame.timestamp * 1000 - round(frame.timestamp * 1000)))
+            frames += 1
+    return frames, latency_error, vision_queue
+
+
+def test_high_rate_ingestion():
+    frames, latency_error, vision_queue = ingest("limelight-sim-ingest")
+    assert frames > 900
+    assert latency_error < 1e-3
+    assert len(vision_queue.measurements) == frames
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS to run timing benchmarks")
+def test_ingestion_benchmark():
+    start = time.perf_counter()
+    frames, _, _ = ingest("limelight-sim-bench")
+    per_frame = (time.perf_counter() - start) / frames
+
+    print(f"Vision ingestion: {per_frame * 1e6:.1f} us per frame, {frames} frames")
+    # Several cameras at 90 fps should only take a sliver of the 20 ms loop.
+    assert per_frame < 0.0005
@@ -0,0 +1,53 @@
+'''
+    Checks LoopHistogram's bucketing and percentiles, and that LoopProfiler doesn't hold on to finished commands.
+'''
+
+import gc
+import commands2
+from helpers.loop_profiler import LoopHistogram, LoopProfiler
+
+EDGES = (0.001, 0.002, 0.005, 0.01)
+
+
+def test_buckets_and_percentiles():
+    histogram = LoopHistogram(EDGES)
+    for duration in [0.0005] * 50 + [0.0015] * 45 + [0.004] * 4 + [0.02]:
+        histogram.record(duration)
+
+    assert histogram.counts == [50, 45, 4, 0, 1]
+    assert histogram.count == 100
+    assert histogram.max == 0.02
+    # Percentiles report the upper edge of the bucket they land in.
+    assert histogram.percentile(0.5) == 0.001
+    assert histogram.percentile(0.95) == 0.002
+    assert histogram.percentile(0.99) == 0.005
+    # Past the last edge only the max describes the sample.
+    assert histogram.percentile(1.0) == 0.02
+    assert histogram.summary() == [1.0, 2.0, 5.0, 20.0, 100]
+
+
+def test_percentile_never_above_max_and_reset():
+    histogram = LoopHistogram(EDGES)
+    assert histogram.percentile(0.5) == 0.0
+    histogram.record(0.0012)
+    assert histogram.percentile(0.5) == 0.0012
+    histogram.reset()
+    assert histogram.count == 0 and histogram.max == 0.0 and sum(histogram.counts) == 0
+
+
+def test_runtime_commands_are_not_kept():
+    profiler = LoopProfiler()
+    # Off unless ProfilerConstants.enabled is turned on for a profiling session.
+    assert not profiler.enabled
+    profiler.enable()
+    for _ in range(10):
+        profiler._watch_command(commands2.cmd.none())
+    gc.collect()
+    assert len(profiler.commands) == 0
+
+    command = commands2.cmd.none()
+    profiler._watch_command(command)
+    profiler._watch_command(command)
+    assert len(profiler.commands) == 1
+    profiler.disable()
+    assert len(profiler.commands) == 0
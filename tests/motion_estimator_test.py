@@ -0,0 +1,78 @@
+'''
+    Checks MotionEstimator's velocity, acceleration and delay on known motion, and its lookups into the history.
+'''
+
+import math
+from constants import MotionEstimatorConstants
+from helpers.motion_estimator import MotionEstimator
+
+PERIOD = 0.02
+
+
+def ramp(estimator, samples, start=1.0, period=PERIOD):
+    """Feed a constant acceleration: vx = 2t, vy = -t, omega = 0.5t."""
+    for sample in range(samples):
+        t = start + sample * period
+        estimator.add(t, 2 * t, -t, 0.5 * t)
+    return start + (samples - 1) * period
+
+
+def test_constant_ramp():
+    estimator = MotionEstimator()
+    newest = ramp(estimator, 20)
+
+    assert math.isclose(estimator.ax, 2)
+    assert math.isclose(estimator.ay, -1)
+    assert math.isclose(estimator.alpha, 0.5)
+    # A line fit over a line is exact, so the velocity doesn't lag.
+    assert math.isclose(estimator.vx, 2 * newest)
+    assert math.isclose(estimator.vy, -newest)
+    assert math.isclose(estimator.omega, 0.5 * newest)
+    # The slope describes the middle of the window.
+    assert math.isclose(estimator.delay, (MotionEstimatorConstants.filter_window - 1) / 2 * PERIOD)
+
+
+def test_uneven_loop_times():
+    estimator = MotionEstimator()
+    t = 1.0
+    for period in (0.02, 0.035, 0.018, 0.05, 0.021, 0.02):
+        t += period
+        estimator.add(t, 3 * t, 0, 0)
+
+    assert math.isclose(estimator.ax, 3)
+    assert math.isclose(estimator.vx, 3 * t)
+
+
+def test_state_at_interpolates_history():
+    estimator = MotionEstimator()
+    newest = ramp(estimator, MotionEstimatorConstants.history_size + 10)
+
+    # Between samples, well inside the history.
+    t = newest - 0.5 + PERIOD / 3
+    vx, vy, omega, ax, ay, alpha = estimator.state_at(t)
+    assert math.isclose(vx, 2 * t)
+    assert math.isclose(vy, -t)
+    assert math.isclose(omega, 0.5 * t)
+    assert math.isclose(ax, 2)
+    assert math.isclose(ay, -1)
+    assert math.isclose(alpha, 0.5)
+
+    # Past the newest sample the velocity is extrapolated with the current acceleration.
+    vx, _, _, ax, _, _ = estimator.state_at(newest + 0.1)
+    assert math.isclose(vx, 2 * (newest + 0.1))
+    assert math.isclose(ax, 2)
+
+
+def test_ignores_old_samples_and_resets():
+    estimator = MotionEstimator()
+    newest = ramp(estimator, 10)
+    estimator.add(newest, 100, 100, 100)
+    assert math.isclose(estimator.vx, 2 * newest)
+
+    estimator.reset()
+    assert estimator.count == 0
+    assert estimator.state_at(newest) == (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    # After a reset, older timestamps are accepted again.
+    estimator.add(0.5, 1, 0, 0)
+    assert estimator.vx == 1
+    assert estimator.ax == 0
@@ -0,0 +1,72 @@
+'''
+    Checks that MotorConfigManager only persists SPARK configs that changed since the last boot, or that the SPARK on
+    the CAN ID no longer holds.
+'''
+
+import rev
+from helpers.motor_config_manager import MotorConfigManager
+
+
+def make_config(current_limit: int) -> rev.SparkMaxConfig:
+    config = rev.SparkMaxConfig()
+    config.smartCurrentLimit(current_limit)
+    config.setIdleMode(rev.SparkMaxConfig.IdleMode.kBrake)
+    return config
+
+
+def test_persists_only_changed_configs(tmp_path):
+    store = str(tmp_path / "hashes.json")
+    spark = rev.SparkMax(60, rev.SparkMax.MotorType.kBrushless)
+
+    # First boot, nothing stored yet.
+    first_boot = MotorConfigManager(store)
+    first_boot.configure("Steer 60", spark, make_config(20))
+    first_boot.finish()
+    assert first_boot.persisted == ["Steer 60"]
+
+    # Same config on the next boot, no flash write.
+    second_boot = MotorConfigManager(store)
+    second_boot.configure("Steer 60", spark, make_config(20))
+    second_boot.finish()
+    assert second_boot.persisted == []
+    assert "Steer 60" in second_boot.times
+
+    # Changing the config persists it again.
+    third_boot = MotorConfigManager(store)
+    third_boot.configure("Steer 60", spark, make_config(30))
+    third_boot.finish()
+    assert third_boot.persisted == ["Steer 60"]
+
+
+def test_bad_store_persists_everything(tmp_path):
+    store = tmp_path / "hashes.json"
+    store.write_text("not json")
+    manager = MotorConfigManager(str(store))
+    manager.configure("Steer 61", rev.SparkMax(61, rev.SparkMax.MotorType.kBrushless), make_config(20))
+    assert manager.persisted == ["Steer 61"]
+
+
+def test_hash_follows_config():
+    assert MotorConfigManager.config_hash(make_config(20)) == MotorConfigManager.config_hash(make_config(20))
+    assert MotorConfigManager.config_hash(make_config(20)) != MotorConfigManager.config_hash(make_config(40))
+
+
+def test_factory_reset_spark_is_persisted_again(tmp_path):
+    store = str(tmp_path / "hashes.json")
+    spark = rev.SparkMax(62, rev.SparkMax.MotorType.kBrushless)
+
+    first_boot = MotorConfigManager(store)
+    first_boot.configure("Steer 62", spark, make_config(20))
+    first_boot.finish()
+    assert first_boot.persisted == ["Steer 62"]
+
+    # A factory reset (or a replacement controller) puts the defaults back in flash under the same name and CAN ID.
+    spark.configure(rev.SparkMaxConfig(), rev.SparkBase.ResetMode.kResetSafeParameters,
+                    rev.SparkBase.PersistMode.kNoPersistParameters)
+    assert spark.configAccessor.getSmartCurrentLimit() == 80
+
+    second_boot = MotorConfigManager(store)
+    second_boot.configure("Steer 62", spark, make_config(20))
+    second_boot.finish()
+    assert second_boot.persisted == ["Steer 62"]
+    assert spark.configAccessor.getSmartCurrentLimit() == 20
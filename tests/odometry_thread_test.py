@@ -0,0 +1,89 @@
+'''
+    Checks the odometry thread's ring buffer.
+'''
+
+from constants import OdometryConstants
+from helpers.odometry_thread import OdometryThread
+
+
+class FakeModule:
+    def __init__(self) -> None:
+        self.drive_position = 0.0
+        self.steer_position = 0.0
+
+    def sample(self) -> tuple[float, float]:
+        return self.drive_position, self.steer_position
+
+
+class FakeGyro:
+    def __init__(self) -> None:
+        self.yaw = 0.0
+
+    def getYaw(self) -> float:
+        return self.yaw
+
+
+def make_thread() -> tuple[OdometryThread, list[FakeModule], FakeGyro]:
+    modules = [FakeModule() for _ in range(4)]
+    gyro = FakeGyro()
+    return OdometryThread(tuple(modules), gyro), modules, gyro
+
+
+def test_drains_in_order():
+    thread, modules, gyro = make_thread()
+    for step in range(5):
+        gyro.yaw = step * 10
+        for module in modules:
+            module.drive_position = step
+        thread._sample()
+
+    assert thread.drain() == 5
+    assert thread.drained_yaws[:5] == [0, 10, 20, 30, 40]
+    assert [positions[2] for positions in thread.drained_drive_positions[:5]] == [0, 1, 2, 3, 4]
+    assert thread.drained_times[:5] == sorted(thread.drained_times[:5])
+    # Nothing new since the last drain.
+    assert thread.drain() == 0
+
+
+def test_overflow_keeps_newest():
+    thread, modules, gyro = make_thread()
+    for step in range(OdometryConstants.buffer_size + 3):
+        gyro.yaw = step
+        thread._sample()
+
+    assert thread.drain() == OdometryConstants.buffer_size
+    assert thread.dropped == 3
+    assert thread.drained_yaws[0] == 3
+    assert thread.drained_yaws[OdometryConstants.buffer_size - 1] == OdometryConstants.buffer_size + 2
+
+
+def test_clear():
+    thread, _, _ = make_thread()
+    thread._sample()
+    thread.clear()
+    assert thread.drain() == 0
+
+
+
+def test_read_across_clear_is_dropped():
+    thread, modules, gyro = make_thread()
+
+    class ResettingGyro(FakeGyro):
+        """Lets the main loop reset the encoders and clear the thread in the middle of a sample's reads."""
+        def getYaw(self) -> float:
+            for module in modules:
+                module.drive_position = 0.0
+            thread.clear()
+            return self.yaw
+
+    for module in modules:
+        module.drive_position = 3.0
+    thread.gyro = ResettingGyro()
+    thread._sample()
+    assert thread.drain() == 0
+
+    # Samples after the clear go through as usual.
+    thread.gyro = gyro
+    thread._sample()
+    assert thread.drain() == 1
+    assert thread.drained_drive_positions[0] == [0.0] * 4
@@ -0,0 +1,78 @@
+'''
+    Checks PathCache's key rounding, hit/miss counting and alliance variants.
+'''
+
+import math
+from wpimath.geometry import Pose2d, Rotation2d
+from pathplannerlib.util import FlippingUtil
+from constants import AutoConstants
+from helpers.path_cache import PathCache
+
+TARGET = [2.0, 4.0, 90]
+
+
+def test_nearby_starts_share_a_key():
+    cache = PathCache()
+    key = cache.make_key(Pose2d(1.0, 2.0, Rotation2d.fromDegrees(10)), TARGET, AutoConstants.path_constraints)
+
+    # Within half a step in every axis.
+    nearby = Pose2d(1.02, 1.98, Rotation2d.fromDegrees(12))
+    assert cache.make_key(nearby, TARGET, AutoConstants.path_constraints) == key
+    # A step away in x, or a different target.
+    assert cache.make_key(Pose2d(1.05, 2.0, Rotation2d.fromDegrees(10)), TARGET,
+                          AutoConstants.path_constraints) != key
+    assert cache.make_key(nearby, [2.0, 4.0, 0], AutoConstants.path_constraints) != key
+
+
+def test_headings_wrap():
+    cache = PathCache()
+    start = Pose2d(1.0, 2.0, Rotation2d.fromDegrees(179))
+    wrapped = Pose2d(1.0, 2.0, Rotation2d.fromDegrees(-179))
+    assert (cache.make_key(start, TARGET, AutoConstants.path_constraints)
+            == cache.make_key(wrapped, TARGET, AutoConstants.path_constraints))
+
+
+def test_counts_hits_and_misses():
+    cache = PathCache()
+    start = Pose2d(1.0, 2.0, Rotation2d())
+
+    first = cache.get(start, TARGET, AutoConstants.path_constraints, False)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.get(Pose2d(1.01, 2.0, Rotation2d()), TARGET, AutoConstants.path_constraints, False) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    # The other alliance shares the entry but is its own path.
+    assert cache.get(start, TARGET, AutoConstants.path_constraints, True) is not first
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache.paths) == 1
+
+
+def test_evicts_least_recently_used():
+    cache = PathCache()
+    cache.max_size = 2
+    constraints = AutoConstants.path_constraints
+    cache.get(Pose2d(1.0, 0, Rotation2d()), TARGET, constraints, False)
+    cache.get(Pose2d(2.0, 0, Rotation2d()), TARGET, constraints, False)
+    cache.get(Pose2d(1.0, 0, Rotation2d()), TARGET, constraints, False)
+    cache.get(Pose2d(3.0, 0, Rotation2d()), TARGET, constraints, False)
+
+    assert cache.make_key(Pose2d(2.0, 0, Rotation2d()), TARGET, constraints) not in cache.paths
+    assert cache.make_key(Pose2d(1.0, 0, Rotation2d()), TARGET, constraints) in cache.paths
+
+
+def test_red_variant_ends_at_flipped_target():
+    cache = PathCache()
+    start = Pose2d(10.0, 3.0, Rotation2d())
+    blue = cache.get(start, TARGET, AutoConstants.path_constraints, False)
+    red = cache.get(start, TARGET, AutoConstants.path_constraints, True)
+
+    blue_end = Pose2d(TARGET[0], TARGET[1], Rotation2d.fromDegrees(TARGET[2]))
+    red_end = FlippingUtil.flipFieldPose(blue_end)
+    for path, end in ((blue, blue_end), (red, red_end)):
+        assert path.preventFlipping
+        last = path.getWaypoints()[-1].anchor
+        assert math.isclose(last.X(), end.X(), abs_tol=1e-6)
+        assert math.isclose(last.Y(), end.Y(), abs_tol=1e-6)
+        assert math.isclose(path.getGoalEndState().rotation.degrees(), end.rotation().degrees(), abs_tol=1e-6)
+        first = path.getWaypoints()[0].anchor
+        assert math.isclose(first.X(), start.X(), abs_tol=1e-6)
+        assert math.isclose(first.Y(), start.Y(), abs_tol=1e-6)
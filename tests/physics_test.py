@@ -0,0 +1,41 @@
+'''
+    Drives the robot on the physics model in physics.py and checks that the odometry follows.
+'''
+
+import math
+import commands2
+from wpilib import Timer
+
+
+def drive_for(control, robot, vx: float, vy: float, omega: float, seconds: float):
+    """Enable teleop, drive robot relative at the given speeds, and return the pose before and after and the sim time
+    that passed in between."""
+    drive = robot.m_robotcontainer.robot_drive
+    control.step_timing(seconds=0.5, autonomous=False, enabled=True)
+    start = drive.get_pose()
+    start_time = Timer.getFPGATimestamp()
+    commands2.CommandScheduler.getInstance().schedule(
+        commands2.cmd.run(lambda: drive.drive_robot_relative(vx, vy, omega), drive))
+    control.step_timing(seconds=seconds, autonomous=False, enabled=True)
+    return start, drive.get_pose(), Timer.getFPGATimestamp() - start_time
+
+
+def test_drives_forward(control, robot):
+    with control.run_robot():
+        start, end, elapsed = drive_for(control, robot, 2, 0, 0, 1.5)
+
+    moved = end.translation() - start.translation()
+    # 2 m/s, less a little while the wheels turn and spin up, straight ahead, without turning.
+    assert 2 * elapsed - 0.5 < moved.norm() < 2 * elapsed
+    assert abs(moved.Y()) < 0.1
+    assert abs((end.rotation() - start.rotation()).degrees()) < 2
+
+
+def test_turns_with_gyro(control, robot):
+    with control.run_robot():
+        start, end, elapsed = drive_for(control, robot, 0, 0, math.pi / 2, 0.5)
+
+    turned = (end.rotation() - start.rotation()).degrees()
+    # A positive rotation command turns toward lower yaw, at up to 90 degrees a second.
+    assert -90 * elapsed < turned < -90 * elapsed + 25
+    assert end.translation().distance(start.translation()) < 0.1
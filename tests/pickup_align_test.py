@@ -0,0 +1,144 @@
+'''
+    Checks PickupAlign's projection of detections into the field, the direction it drives and when it gives up.
+'''
+
+import math
+import commands2
+from wpilib import Timer
+from wpimath.geometry import Pose2d, Rotation2d
+from constants import PickupConstants
+from commands.pickup_align import PickupAlign
+from subsystems.limelight_camera import TargetFrame
+
+
+class FakeHistory:
+    """Stands in for the pose estimator: the robot was somewhere else when the frame was captured."""
+
+    def __init__(self, pose: Pose2d) -> None:
+        self.pose = pose
+
+    def sample_at(self, timestamp: float) -> Pose2d:
+        return self.pose
+
+
+class FakeDrive(commands2.Subsystem):
+    def __init__(self, pose: Pose2d, capture_pose: Pose2d) -> None:
+        super().__init__()
+        self.pose = pose
+        self.pose_estimator = FakeHistory(capture_pose)
+        self.commands = []
+
+    def get_pose(self) -> Pose2d:
+        return self.pose
+
+    def drive_field_speeds(self, x_speed: float, y_speed: float, rot: float) -> None:
+        self.commands.append((x_speed, y_speed, rot))
+
+
+class FakeCamera:
+    def __init__(self) -> None:
+        self.targetFrames = []
+        self.latestTarget = TargetFrame(0.0, 0.0, False, 0.0, 0.0, 0.0)
+
+
+def straight_ahead(distance: float, tx: float = 0.0) -> TargetFrame:
+    """A frame of a target the given floor distance ahead of the camera."""
+    ty = math.degrees(math.atan2(PickupConstants.target_height - PickupConstants.camera_height, distance)) - \
+        PickupConstants.camera_pitch
+    return TargetFrame(0.0, 0.03, True, tx, ty, 1.0)
+
+
+def test_projects_to_floor():
+    forward, right = PickupAlign.robot_relative_target(straight_ahead(2.0))
+    assert abs(forward - (PickupConstants.camera_x + 2.0)) < 1e-9
+    assert abs(right - PickupConstants.camera_y) < 1e-9
+    # Positive tx is to the right, which is +y in the drivetrain's frame.
+    assert PickupAlign.robot_relative_target(straight_ahead(2.0, 10))[1] > 0
+    # Above the horizon never hits the floor.
+    assert PickupAlign.robot_relative_target(TargetFrame(0.0, 0.03, True, 0, -PickupConstants.camera_pitch + 1,
+                                                         1.0)) is None
+
+
+def test_off_center_target_lands_where_it_is():
+    # On the real field: the robot at (4, 2) turned 30 degrees counterclockwise, with a piece 2 m ahead of it and
+    # 0.6 m to its right.
+    robot_x, robot_y, robot_heading = 4.0, 2.0, math.radians(30)
+    cos, sin = math.cos(robot_heading), math.sin(robot_heading)
+    piece_x = robot_x + 2.0 * cos + 0.6 * sin
+    piece_y = robot_y + 2.0 * sin - 0.6 * cos
+
+    # What the camera reports, the way LimelightSim works it out: tx is the bearing from the lens, positive to the
+    # right, and ty the elevation below the camera's pitch.
+    camera_x = robot_x + PickupConstants.camera_x * cos + PickupConstants.camera_y * sin
+    camera_y = robot_y + PickupConstants.camera_x * sin - PickupConstants.camera_y * cos
+    distance = math.hypot(piece_x - camera_x, piece_y - camera_y)
+    bearing = math.atan2(piece_y - camera_y, piece_x - camera_x) - robot_heading + \
+        math.radians(PickupConstants.camera_yaw)
+    tx = -math.degrees(bearing)
+    ty = math.degrees(math.atan2(PickupConstants.target_height - PickupConstants.camera_height, distance)) - \
+        PickupConstants.camera_pitch
+    assert tx > 0
+
+    # The drivetrain's frame is that field mirrored across x: the left modules are at -y and the navX yaw is
+    # clockwise positive. The tracked target has to be the piece's spot in that frame.
+    capture_pose = Pose2d(robot_x, -robot_y, Rotation2d(-robot_heading))
+    drive = FakeDrive(capture_pose, capture_pose)
+    command = PickupAlign(drive, FakeCamera())
+    command.add_detection(TargetFrame(Timer.getFPGATimestamp(), 0.03, True, tx, ty, 1.0))
+    assert abs(command.tracker.x - piece_x) < 1e-9
+    assert abs(command.tracker.y - -piece_y) < 1e-9
+
+
+def test_uses_pose_at_capture_and_drives_at_target():
+    # The frame was captured facing +y from the origin, and the robot has since turned to face +x.
+    drive = FakeDrive(Pose2d(0, 0, Rotation2d()), Pose2d(0, 0, Rotation2d.fromDegrees(90)))
+    camera = FakeCamera()
+    command = PickupAlign(drive, camera)
+    command.initialize()
+    camera.targetFrames = [straight_ahead(2.0)._replace(timestamp=Timer.getFPGATimestamp())]
+    command.execute()
+
+    assert abs(command.tracker.x) < 1e-9
+    assert abs(command.tracker.y - (PickupConstants.camera_x + 2.0)) < 1e-9
+    # Turn toward the target first (counterclockwise, so a negative command), without driving yet.
+    x_speed, y_speed, rot = drive.commands[-1]
+    assert rot < 0
+    assert x_speed == 0 and y_speed == 0
+
+    # Facing it: drive in along +y.
+    camera.targetFrames = []
+    drive.pose = Pose2d(0, 0, Rotation2d.fromDegrees(90))
+    command.execute()
+    x_speed, y_speed, _ = drive.commands[-1]
+    assert y_speed > 0
+    assert abs(x_speed) < 1e-9
+    assert not command.isFinished()
+
+
+def test_waits_for_first_frame():
+    drive = FakeDrive(Pose2d(0, 0, Rotation2d()), Pose2d(0, 0, Rotation2d()))
+    camera = FakeCamera()
+    command = PickupAlign(drive, camera)
+
+    # No new frame in the first loop, the camera runs slower than the robot.
+    command.initialize()
+    command.execute()
+    assert not command.isFinished()
+    assert drive.commands[-1] == (0, 0, 0)
+
+    # Still nothing once lost_timeout has passed since it started.
+    command.start_time -= PickupConstants.lost_timeout + 0.01
+    assert command.isFinished()
+
+
+def test_starts_from_latest_detection():
+    drive = FakeDrive(Pose2d(0, 0, Rotation2d()), Pose2d(0, 0, Rotation2d()))
+    camera = FakeCamera()
+    camera.latestTarget = straight_ahead(2.0)._replace(timestamp=Timer.getFPGATimestamp())
+    command = PickupAlign(drive, camera)
+
+    command.initialize()
+    assert command.tracker.tracking
+    command.execute()
+    assert abs(command.distance - (PickupConstants.camera_x + 2.0)) < 1e-9
+    assert not command.isFinished()
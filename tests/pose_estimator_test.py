@@ -0,0 +1,55 @@
+'''
+    Checks that PoseEstimator's pose history keeps matching the estimator after vision corrections.
+'''
+
+import math
+from wpimath.geometry import Pose2d, Rotation2d
+from wpimath.kinematics import SwerveModulePosition
+from helpers.pose_estimator import PoseEstimator
+
+PERIOD = 0.004
+
+
+def drive(estimator: PoseEstimator, start: float, steps: int, heading_rate: float = 0.0) -> float:
+    """Drive forward at 1 m/s from time start, optionally turning, and return the time of the last sample."""
+    for step in range(steps):
+        t = start + step * PERIOD
+        distance = SwerveModulePosition((t - start), Rotation2d())
+        estimator.update_with_time(t, Rotation2d(heading_rate * (t - start)), distance, distance, distance, distance)
+    return start + (steps - 1) * PERIOD
+
+
+def assert_matches(estimator: PoseEstimator, timestamp: float) -> None:
+    expected = estimator.estimator.sampleAt(timestamp)
+    actual = estimator.sample_at(timestamp)
+    assert math.isclose(actual.X(), expected.X(), abs_tol=1e-6)
+    assert math.isclose(actual.Y(), expected.Y(), abs_tol=1e-6)
+    assert math.isclose(actual.rotation().radians(), expected.rotation().radians(), abs_tol=1e-6)
+
+
+def test_history_follows_vision_correction():
+    estimator = PoseEstimator()
+    newest = drive(estimator, 10.0, 200, heading_rate=0.5)
+    vision_time = 10.0 + 100 * PERIOD
+    before = estimator.sample_at(vision_time + 0.1)
+
+    # A confident measurement half a meter off, and turned, from the middle of the history.
+    seen = estimator.estimator.sampleAt(vision_time)
+    estimator.add_vision(Pose2d(seen.X() + 0.5, seen.Y() - 0.3, seen.rotation() + Rotation2d(0.2)), vision_time,
+                         (0.01, 0.01, 0.01))
+
+    after = estimator.sample_at(vision_time + 0.1)
+    assert after.translation().distance(before.translation()) > 0.3
+    for timestamp in (vision_time, vision_time + 0.1 + PERIOD / 2, newest, newest + 1):
+        assert_matches(estimator, timestamp)
+    # Poses from before the measurement aren't touched.
+    assert_matches(estimator, vision_time - 0.2)
+
+
+def test_old_vision_leaves_history_alone():
+    estimator = PoseEstimator()
+    newest = drive(estimator, 10.0, 50)
+    before = estimator.sample_at(newest)
+    # Older than the estimator keeps, so it's ignored.
+    estimator.add_vision(Pose2d(0, 0, 0), 1.0, (0.01, 0.01, 0.01))
+    assert estimator.sample_at(newest) == before
@@ -0,0 +1,53 @@
+'''
+    Checks PoseHistory's lookups, interpolation and retention window.
+'''
+
+import math
+from constants import PoseHistoryConstants
+from helpers.pose_history import PoseHistory
+
+
+def test_interpolates_between_samples():
+    history = PoseHistory()
+    history.add(1.0, 0.0, 0.0, 0.0)
+    history.add(1.1, 1.0, 2.0, 0.2)
+
+    x, y, theta = history.sample(1.025)
+    assert math.isclose(x, 0.25)
+    assert math.isclose(y, 0.5)
+    assert math.isclose(theta, 0.05)
+    # Exactly on a sample, and past the newest.
+    assert history.sample(1.0) == (0.0, 0.0, 0.0)
+    assert history.sample(2.0) == (1.0, 2.0, 0.2)
+    # Before the oldest.
+    assert history.sample(0.9) is None
+
+
+def test_heading_takes_the_short_way():
+    history = PoseHistory()
+    history.add(1.0, 0, 0, math.pi - 0.1)
+    history.add(1.1, 0, 0, -math.pi + 0.1)
+    _, _, theta = history.sample(1.05)
+    assert math.isclose(abs(theta), math.pi)
+
+
+def test_wraps_and_keeps_retention():
+    history = PoseHistory()
+    period = 1 / 250
+    samples = PoseHistoryConstants.capacity * 3
+    for index in range(samples):
+        history.add(index * period, index, 0, 0)
+
+    newest = (samples - 1) * period
+    assert math.isclose(history.sample(newest - 0.5 * period)[0], samples - 1.5)
+    assert math.isclose(history.sample(newest - 1.0)[0], samples - 1 - 250)
+    assert history.sample(newest - PoseHistoryConstants.retention - period) is None
+
+
+def test_ignores_out_of_order_and_clear():
+    history = PoseHistory()
+    history.add(1.0, 1, 0, 0)
+    history.add(0.5, 5, 0, 0)
+    assert history.count == 1
+    history.clear()
+    assert history.sample(1.0) is None
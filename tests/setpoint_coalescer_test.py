@@ -0,0 +1,53 @@
+'''
+    Checks that SetpointCoalescer only writes setpoints that changed, plus the keep-alive.
+'''
+
+import rev
+from helpers.setpoint_coalescer import SetpointCoalescer
+
+
+class RecordingController:
+    """Stands in for a SPARK closed loop controller and records every setReference call."""
+
+    def __init__(self) -> None:
+        self.references = []
+
+    def setReference(self, reference, control_type):
+        self.references.append((reference, control_type))
+
+
+def make_coalescer() -> tuple[RecordingController, SetpointCoalescer]:
+    controller = RecordingController()
+    return controller, SetpointCoalescer(controller, rev.SparkBase.ControlType.kVelocity, 0.01, 0.1)
+
+
+def test_parked_robot_only_sends_keep_alives():
+    controller, coalescer = make_coalescer()
+    # One second of a parked robot at 50 Hz.
+    sent_times = [loop * 0.02 for loop in range(50) if coalescer.set(0.0, loop * 0.02)]
+
+    # The first write, then one each time the keep-alive runs out.
+    assert sent_times[0] == 0
+    assert all(0.1 <= later - earlier < 0.1 + 0.02 for earlier, later in zip(sent_times, sent_times[1:]))
+    assert coalescer.sent == len(controller.references) == len(sent_times)
+    assert coalescer.suppressed == 50 - coalescer.sent
+    assert controller.references[0] == (0.0, rev.SparkBase.ControlType.kVelocity)
+
+
+def test_changes_are_sent_immediately():
+    controller, coalescer = make_coalescer()
+    assert coalescer.set(1.0, 0.0)
+    assert not coalescer.set(1.005, 0.02)
+    assert coalescer.set(1.02, 0.04)
+    # Small steps can't add up to a large error, they're measured from the last value sent.
+    assert not coalescer.set(1.025, 0.06)
+    assert coalescer.set(1.031, 0.08)
+    assert [reference for reference, _ in controller.references] == [1.0, 1.02, 1.031]
+
+
+def test_invalidate_forces_a_write():
+    controller, coalescer = make_coalescer()
+    coalescer.set(0.5, 0.0)
+    coalescer.invalidate()
+    assert coalescer.set(0.5, 0.02)
+    assert len(controller.references) == 2
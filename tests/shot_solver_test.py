@@ -0,0 +1,96 @@
+'''
+    Checks the shoot-while-moving solver in helpers/shot_solver.py. The benchmark against the loop budget depends on
+    the machine, so it only runs when RUN_BENCHMARKS is set in the environment.
+'''
+
+import math
+import os
+import random
+import time
+import pytest
+from constants import LovelyLauncherConstants
+from helpers.shot_solver import ShotSolver
+
+TARGET = LovelyLauncherConstants.target_location
+
+
+def landing_point(solver: ShotSolver, x, y, vx, vy, ax, ay) -> tuple[float, float]:
+    """Fly the solved shot. The game piece leaves at the release point with the robot's velocity plus the launcher's,
+    and the launcher's part covers the table distance in the table time of flight. ax, ay are the true acceleration."""
+    solution = solver.solve(x, y, vx, vy, ax, ay, *TARGET)
+    latency = solver.release_latency
+    release_x = x + vx * latency + 0.5 * ax * latency ** 2
+    release_y = y + vy * latency + 0.5 * ay * latency ** 2
+    release_vx = vx + ax * latency
+    release_vy = vy + ay * latency
+    _, time_of_flight = solver.lookup(solution.distance)
+    heading = math.radians(solution.heading)
+    return (release_x + release_vx * time_of_flight + solution.distance * math.cos(heading),
+            release_y + release_vy * time_of_flight + solution.distance * math.sin(heading))
+
+
+def test_table_lookup():
+    solver = ShotSolver([(3, 3000, 0.8), (1, 2000, 0.5)])
+    assert solver.lookup(2) == (2500, 0.65)
+    assert solver.lookup(0.2) == (2000, 0.5)
+    assert solver.lookup(9) == (3000, 0.8)
+
+
+def test_stationary_shot():
+    solver = ShotSolver()
+    solution = solver.solve(TARGET[0] - 3, TARGET[1], 0, 0, 0, 0, *TARGET)
+
+    assert math.isclose(solution.heading, 0, abs_tol=1e-9)
+    assert math.isclose(solution.distance, 3)
+    assert math.isclose(solution.rpm, solver.lookup(3)[0])
+    assert solution.valid
+
+
+def test_moving_shot_lands_on_target():
+    solver = ShotSolver()
+    # An acceleration without lag can be trusted fully.
+    solver.acceleration_scale = 1
+    rng = random.Random(9037)
+    for _ in range(200):
+        angle = rng.uniform(-math.pi, math.pi)
+        distance = rng.uniform(2, 4.5)
+        x, y = TARGET[0] + distance * math.cos(angle), TARGET[1] + distance * math.sin(angle)
+        vx, vy = rng.uniform(-2, 2), rng.uniform(-2, 2)
+        ax, ay = rng.uniform(-3, 3), rng.uniform(-3, 3)
+
+        landing_x, landing_y = landing_point(solver, x, y, vx, vy, ax, ay)
+        assert math.hypot(landing_x - TARGET[0], landing_y - TARGET[1]) < 0.05
+
+
+def test_lagging_acceleration_is_scaled_down():
+    solver = ShotSolver()
+    x, y = TARGET[0] - 3, TARGET[1] + 1
+    scaled = solver.solve(x, y, 1, -0.5, 3, 2, *TARGET).heading
+
+    solver.acceleration_scale = 1
+    scale = LovelyLauncherConstants.acceleration_scale
+    assert 0 < scale < 1
+    assert math.isclose(solver.solve(x, y, 1, -0.5, 3 * scale, 2 * scale, *TARGET).heading, scaled)
+    assert not math.isclose(solver.solve(x, y, 1, -0.5, 3, 2, *TARGET).heading, scaled)
+
+
+def test_out_of_range_is_invalid():
+    solver = ShotSolver()
+    assert not solver.solve(TARGET[0] - 20, TARGET[1], 0, 0, 0, 0, *TARGET).valid
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS to run timing benchmarks")
+def test_solve_benchmark():
+    solver = ShotSolver()
+    rng = random.Random(2026)
+    inputs = [(rng.uniform(0, 8), rng.uniform(0, 8), rng.uniform(-4, 4), rng.uniform(-4, 4),
+               rng.uniform(-5, 5), rng.uniform(-5, 5)) for _ in range(5000)]
+
+    start = time.perf_counter()
+    for x, y, vx, vy, ax, ay in inputs:
+        solver.solve(x, y, vx, vy, ax, ay, *TARGET)
+    per_solve = (time.perf_counter() - start) / len(inputs)
+
+    print(f"ShotSolver.solve: {per_solve * 1e6:.1f} us per solve")
+    # The whole robot loop is 20 ms, the solver gets a small slice of it.
+    assert per_solve < 0.0005
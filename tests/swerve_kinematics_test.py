@@ -0,0 +1,106 @@
+'''
+    Checks the flat float kinematics in helpers/swerve_kinematics.py against wpimath.
+'''
+
+import math
+import random
+import pytest
+from wpimath.geometry import Rotation2d
+from wpimath.kinematics import ChassisSpeeds, SwerveDrive4Kinematics, SwerveModuleState
+from constants import DriveConstants
+from helpers.swerve_kinematics import FastSwerveKinematics, discretize, from_field_relative, optimize_module
+
+LOCATIONS = (DriveConstants.m_FL_location, DriveConstants.m_FR_location,
+             DriveConstants.m_BL_location, DriveConstants.m_BR_location)
+
+
+def random_speeds(rng: random.Random) -> tuple[float, float, float]:
+    return rng.uniform(-6, 6), rng.uniform(-6, 6), rng.uniform(-15, 15)
+
+
+def angle_difference(a: float, b: float) -> float:
+    """Smallest difference between two angles in degrees."""
+    return abs((a - b + 180) % 360 - 180)
+
+
+def test_inverse_matches_wpimath():
+    rng = random.Random(9037)
+    reference = SwerveDrive4Kinematics(*LOCATIONS)
+    fast = FastSwerveKinematics(*LOCATIONS)
+    for _ in range(500):
+        vx, vy, omega = random_speeds(rng)
+        states = reference.toSwerveModuleStates(ChassisSpeeds(vx, vy, omega))
+        fast.to_module_speeds(vx, vy, omega)
+        for index, state in enumerate(states):
+            assert fast.speeds[index] == pytest.approx(state.speed, abs=1e-9)
+            assert angle_difference(fast.angles[index], state.angle.degrees()) < 1e-7
+
+
+def test_zero_speed_holds_last_angles():
+    reference = SwerveDrive4Kinematics(*LOCATIONS)
+    fast = FastSwerveKinematics(*LOCATIONS)
+    reference.toSwerveModuleStates(ChassisSpeeds(0, 0, 0.01))
+    fast.to_module_speeds(0, 0, 0.01)
+    states = reference.toSwerveModuleStates(ChassisSpeeds(0, 0, 0))
+    fast.to_module_speeds(0, 0, 0)
+    for index, state in enumerate(states):
+        assert fast.speeds[index] == 0
+        assert angle_difference(fast.angles[index], state.angle.degrees()) < 1e-7
+
+
+def test_forward_matches_wpimath():
+    rng = random.Random(254)
+    reference = SwerveDrive4Kinematics(*LOCATIONS)
+    fast = FastSwerveKinematics(*LOCATIONS)
+    for _ in range(500):
+        speeds = [rng.uniform(-5, 5) for _ in range(4)]
+        angles = [rng.uniform(-math.pi, math.pi) for _ in range(4)]
+        expected = reference.toChassisSpeeds(tuple(SwerveModuleState(speed, Rotation2d(angle))
+                                                   for speed, angle in zip(speeds, angles)))
+        result = fast.to_chassis_speeds(speeds, angles)
+        assert result.vx == pytest.approx(expected.vx, abs=1e-9)
+        assert result.vy == pytest.approx(expected.vy, abs=1e-9)
+        assert result.omega == pytest.approx(expected.omega, abs=1e-9)
+
+
+def test_discretize_and_field_relative_match_wpimath():
+    rng = random.Random(1678)
+    for _ in range(500):
+        vx, vy, omega = random_speeds(rng)
+        heading = Rotation2d(rng.uniform(-math.pi, math.pi))
+        dt = rng.uniform(0.005, 0.05)
+
+        expected = ChassisSpeeds.discretize(ChassisSpeeds.fromFieldRelativeSpeeds(vx, vy, omega, heading), dt)
+        robot_vx, robot_vy = from_field_relative(vx, vy, heading)
+        result = discretize(robot_vx, robot_vy, omega, dt)
+        assert result[0] == pytest.approx(expected.vx, abs=1e-9)
+        assert result[1] == pytest.approx(expected.vy, abs=1e-9)
+        assert result[2] == pytest.approx(expected.omega, abs=1e-9)
+
+
+def test_desaturate_matches_wpimath():
+    rng = random.Random(118)
+    reference = SwerveDrive4Kinematics(*LOCATIONS)
+    fast = FastSwerveKinematics(*LOCATIONS)
+    for _ in range(500):
+        vx, vy, omega = random_speeds(rng)
+        states = SwerveDrive4Kinematics.desaturateWheelSpeeds(
+            reference.toSwerveModuleStates(ChassisSpeeds(vx, vy, omega)), DriveConstants.kMaxSpeed)
+        fast.to_module_speeds(vx, vy, omega)
+        fast.desaturate(DriveConstants.kMaxSpeed)
+        for index, state in enumerate(states):
+            assert fast.speeds[index] == pytest.approx(state.speed, abs=1e-9)
+
+
+def test_optimize_keeps_velocity_and_turns_at_most_90():
+    rng = random.Random(971)
+    for _ in range(2000):
+        speed = rng.uniform(-5, 5)
+        desired = rng.uniform(-180, 180)
+        current = rng.uniform(0, 360)
+        new_speed, new_angle = optimize_module(speed, desired, current)
+
+        assert 0 <= new_angle < 360
+        assert angle_difference(new_angle, current) <= 90 + 1e-9
+        assert new_speed * math.cos(math.radians(new_angle)) == pytest.approx(speed * math.cos(math.radians(desired)))
+        assert new_speed * math.sin(math.radians(new_angle)) == pytest.approx(speed * math.sin(math.radians(desired)))
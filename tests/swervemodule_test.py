@@ -0,0 +1,104 @@
+'''
+    Checks that SwerveModule's cached sensor view reads each encoder once per loop and drives the SPARKs exactly like
+    reading the encoders directly did.
+'''
+
+import math
+import pytest
+from wpimath.geometry import Rotation2d
+from wpimath.kinematics import SwerveModuleState
+from helpers.can_budget import CANBudget
+from helpers.motor_config_manager import MotorConfigManager
+from helpers.swerve_kinematics import optimize_module
+from subsystems.swervemodule import SwerveModule
+
+
+class CountingEncoder:
+    """Passes everything through to a real encoder and counts the reads."""
+
+    def __init__(self, encoder) -> None:
+        self.encoder = encoder
+        self.reads = 0
+
+    def getPosition(self):
+        self.reads += 1
+        return self.encoder.getPosition()
+
+    def getVelocity(self):
+        self.reads += 1
+        return self.encoder.getVelocity()
+
+    def setPosition(self, position):
+        return self.encoder.setPosition(position)
+
+
+class RecordingController:
+    def __init__(self) -> None:
+        self.references = []
+
+    def setReference(self, reference, control_type):
+        self.references.append(reference)
+
+
+def make_module(drive_id: int, steer_id: int, analog_channel: int) -> SwerveModule:
+    """Build a module on CAN IDs and an analog channel nothing else in the tests uses, with its encoders counted and
+    its setpoints recorded."""
+    module = SwerveModule(drive_id, steer_id, analog_channel, 0, False, True, CANBudget(), MotorConfigManager())
+    module.drive_encoder = CountingEncoder(module.drive_encoder)
+    module.steer_encoder = CountingEncoder(module.steer_encoder)
+    module.drive_setpoint.controller = RecordingController()
+    module.steer_setpoint.controller = RecordingController()
+    return module
+
+
+def legacy_references(steer_position: float, desired: SwerveModuleState) -> tuple[float, float]:
+    """The drive and steer references set_desired_state_onboard sent when it read the encoder every time."""
+    speed, degrees = optimize_module(desired.speed, desired.angle.degrees(), (steer_position % 1) * 360)
+    steer_target = (degrees % 360.0) / 360.0
+    if 0 < steer_target <= 0.25 and 0.75 <= steer_position % 1 < 1:
+        wrap_add = 1
+    elif 0 < steer_position % 1 <= 0.25 and 0.75 <= steer_target < 1:
+        wrap_add = -1
+    else:
+        wrap_add = 0
+    return speed, steer_target + math.trunc(steer_position) + wrap_add
+
+
+def test_one_read_per_encoder_per_loop():
+    module = make_module(40, 41, 4)
+    module.drive_encoder.reads = module.steer_encoder.reads = 0
+
+    SwerveModule.refresh_all((module,))
+    module.set_desired_state_onboard(SwerveModuleState(1.5, Rotation2d.fromDegrees(100)))
+    module.get_state_onboard()
+    module.get_position_onboard()
+
+    assert module.steer_encoder.reads == 1
+    assert module.drive_encoder.reads == 2  # Position and velocity.
+
+
+def test_same_references_as_direct_reads():
+    module = make_module(42, 43, 5)
+    for steer_position in [0.1, 0.8, 2.95, -1.2, -0.05, 3.5]:
+        module.steer_encoder.setPosition(steer_position)
+        module.refresh()
+        for desired_degrees in [10, 80, 170, -100, -10, 275]:
+            desired = SwerveModuleState(2, Rotation2d.fromDegrees(desired_degrees))
+            module.drive_setpoint.invalidate()
+            module.steer_setpoint.invalidate()
+            module.set_desired_state_onboard(desired)
+
+            expected_speed, expected_steer = legacy_references(module.steer_encoder.getPosition(), desired)
+            assert module.drive_setpoint.controller.references[-1] == pytest.approx(expected_speed)
+            assert module.steer_setpoint.controller.references[-1] == pytest.approx(expected_steer)
+
+
+def test_refresh_all_keeps_module_order():
+    modules = [make_module(44, 45, 6), make_module(46, 47, 7)]
+    for index, module in enumerate(modules):
+        module.steer_encoder.setPosition(index * 0.125)
+
+    states, positions = SwerveModule.refresh_all(modules)
+
+    assert [state.angle.degrees() for state in states] == pytest.approx([0, 45])
+    assert [position.angle.degrees() for position in positions] == pytest.approx([0, 45])
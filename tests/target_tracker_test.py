@@ -0,0 +1,37 @@
+'''
+    Checks TargetTracker's alpha-beta filter.
+'''
+
+from constants import PickupConstants
+from helpers.target_tracker import TargetTracker
+
+
+def test_first_detection_starts_track():
+    tracker = TargetTracker()
+    assert tracker.lost(0.0)
+    tracker.update(1.0, 3.0, 2.0)
+    assert tracker.predict(1.5) == (3.0, 2.0)
+    assert not tracker.lost(1.0 + PickupConstants.lost_timeout / 2)
+    assert tracker.lost(1.0 + PickupConstants.lost_timeout * 2)
+
+
+def test_follows_moving_target():
+    tracker = TargetTracker()
+    # A target rolling at 1 m/s in x, seen at 30 fps.
+    for frame in range(60):
+        t = frame / 30
+        tracker.update(t, 3.0 + t, 2.0)
+    assert abs(tracker.vx - 1.0) < 0.05
+    x, y = tracker.predict(2.0 + 0.1)
+    assert abs(x - (3.0 + 2.1)) < 0.05
+    assert abs(y - 2.0) < 1e-9
+
+
+def test_far_detection_restarts_track():
+    tracker = TargetTracker()
+    tracker.update(1.0, 3.0, 2.0)
+    tracker.update(1.1, 3.0 + PickupConstants.tracker_gate * 2, 2.0)
+    assert tracker.predict(1.1) == (3.0 + PickupConstants.tracker_gate * 2, 2.0)
+    # Old or repeated frames are ignored.
+    tracker.update(1.05, 0.0, 0.0)
+    assert tracker.x == 3.0 + PickupConstants.tracker_gate * 2
@@ -0,0 +1,78 @@
+'''
+    Checks that VisionGate lets consistent measurements through and drops outliers. The timing benchmark depends on
+    the machine, so it only runs when RUN_BENCHMARKS is set in the environment.
+'''
+
+import os
+import random
+import time
+import pytest
+from wpimath.geometry import Pose2d
+from constants import VisionConstants
+from helpers.vision_gate import VisionGate
+
+MULTI_TAG = (0.1, 0.1, 0.1)
+SINGLE_TAG = (0.1, 0.1, VisionConstants.single_tag_heading_std)
+
+
+def test_accepts_agreeing_measurement():
+    gate = VisionGate()
+    assert gate.check(Pose2d(3.05, 4, 0), MULTI_TAG, Pose2d(3, 4, 0)) == MULTI_TAG
+    # Nothing to compare against yet.
+    assert gate.check(Pose2d(3, 4, 0), MULTI_TAG, None) == MULTI_TAG
+    assert gate.accepted == 2
+
+
+def test_downweights_then_rejects():
+    gate = VisionGate()
+    reference = Pose2d(3, 4, 0)
+    # About 2.5 sigma in x: trusted less, but still used.
+    downweighted = gate.check(Pose2d(3.35, 4, 0), SINGLE_TAG, reference)
+    assert downweighted is not None and downweighted[0] > SINGLE_TAG[0]
+    assert gate.downweighted == 1
+    # About 5 sigma: dropped.
+    assert gate.check(Pose2d(3.7, 4, 0), SINGLE_TAG, reference) is None
+    assert gate.rejected_chi_square == 1
+
+
+def test_heading_only_counts_when_trusted():
+    gate = VisionGate()
+    reference = Pose2d(3, 4, 0)
+    turned = Pose2d(3, 4, 1.0)
+    assert gate.check(turned, SINGLE_TAG, reference) == SINGLE_TAG
+    assert gate.check(turned, MULTI_TAG, reference) is None
+
+
+def test_bounds_and_jump():
+    gate = VisionGate()
+    assert gate.check(Pose2d(-2, 4, 0), MULTI_TAG, None) is None
+    assert gate.check(Pose2d(3, 4, 0), (5, 5, 5), Pose2d(3 + VisionConstants.max_jump * 1.5, 4, 0)) is None
+    assert gate.rejected_bounds == 1
+    assert gate.rejected_jump == 1
+    assert gate.rejected == 2
+
+
+def test_recovers_when_odometry_is_wrong():
+    gate = VisionGate()
+    wrong_odometry = Pose2d(6, 4, 0)
+    for _ in range(VisionConstants.max_consecutive_rejects):
+        assert gate.check(Pose2d(3, 4, 0), MULTI_TAG, wrong_odometry) is None
+    assert gate.check(Pose2d(3, 4, 0), MULTI_TAG, wrong_odometry) == MULTI_TAG
+    assert gate.consecutive_rejects == 0
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS to run timing benchmarks")
+def test_check_benchmark():
+    gate = VisionGate()
+    rng = random.Random(2026)
+    inputs = [(Pose2d(rng.uniform(0, 16), rng.uniform(0, 8), rng.uniform(-3, 3)),
+               Pose2d(rng.uniform(0, 16), rng.uniform(0, 8), rng.uniform(-3, 3))) for _ in range(5000)]
+
+    start = time.perf_counter()
+    for pose, reference in inputs:
+        gate.check(pose, MULTI_TAG, reference)
+    per_check = (time.perf_counter() - start) / len(inputs)
+
+    print(f"VisionGate.check: {per_check * 1e6:.1f} us per check")
+    # Several cameras, each up to 90 frames a second, all inside a 20 ms loop.
+    assert per_check < 0.0001
@@ -0,0 +1,49 @@
+'''
+    Checks that VisionManager merges every camera's poses into the vision queue and keeps per-camera stats.
+'''
+
+from ntcore import NetworkTableInstance, PubSubOptions
+from constants import VisionConstants
+from helpers.vision_queue import VisionQueue
+from subsystems.vision_manager import VisionManager
+
+NAMES = ["limelight-test-left", "limelight-test-right"]
+
+
+def publishers(name: str):
+    table = NetworkTableInstance.getDefault().getTable(name)
+    options = PubSubOptions(keepDuplicates=True)
+    return (table.getDoubleArrayTopic("t2d").publish(options),
+            table.getDoubleArrayTopic("botpose_wpiblue").publish(options))
+
+
+def test_merges_cameras():
+    vision_queue = VisionQueue()
+    manager = VisionManager(vision_queue, NAMES)
+    (left_t2d, left_pose), (right_t2d, right_pose) = publishers(NAMES[0]), publishers(NAMES[1])
+
+    left_pose.set([3, 4, 0, 0, 0, 0, 30, 2, 1, 2.0, 0.5], 1_000_000)
+    right_pose.set([3.1, 4, 0, 0, 0, 0, 50, 1, 0, 3.0, 0.2], 1_010_000)
+    right_pose.set([3.1, 4, 0, 0, 0, 0, 50, 1, 0, 3.0, 0.2], 1_030_000)
+    manager.periodic()
+
+    assert len(vision_queue.measurements) == 3
+    assert manager.camera(NAMES[1]).poseFrames[0].tag_count == 1
+    # Read once: nothing new next cycle.
+    manager.periodic()
+    assert len(vision_queue.measurements) == 3
+
+
+def test_stats():
+    manager = VisionManager(VisionQueue(), NAMES)
+    left_t2d, _ = publishers(NAMES[0])
+    stats = manager.stats[0]
+    stats.window_start = -VisionConstants.stats_period  # Close the window on the next update.
+    for frame in range(5):
+        left_t2d.set([1, 1, 20, 10, 1.0, 1.0, 0, 0, 1.0], 2_000_000 + frame * 20_000)
+    manager.periodic()
+
+    assert stats.fps > 0
+    assert abs(stats.latency - 0.03) < 1e-9
+    assert manager.stats[1].fps == 0
+    assert manager.updating_count() == 2  # Both are inside their startup grace period.
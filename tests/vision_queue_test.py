@@ -0,0 +1,62 @@
+'''
+    Checks that VisionQueue hands measurements to the pose estimator in time order, and drops ones it can't fuse.
+'''
+
+from wpimath.geometry import Pose2d
+from constants import VisionConstants
+from helpers.vision_queue import VisionQueue
+
+
+class RecordingEstimator:
+    """Stands in for PoseEstimator and records every add_vision call."""
+
+    def __init__(self) -> None:
+        self.measurements = []
+
+    def add_vision(self, pose: Pose2d, timestamp: float, std_devs=None) -> None:
+        self.measurements.append((timestamp, pose))
+
+    def sample_at(self, timestamp: float) -> None:
+        return None
+
+
+def test_flushes_oldest_first():
+    queue = VisionQueue()
+    estimator = RecordingEstimator()
+    queue.add(Pose2d(2, 0, 0), 9.95, 2, 2.0, 0.5)
+    queue.add(Pose2d(1, 0, 0), 9.90, 2, 2.0, 0.5)
+
+    assert queue.flush(estimator, 10.0) == 2
+    assert [timestamp for timestamp, _ in estimator.measurements] == [9.90, 9.95]
+    assert estimator.measurements[0][1].X() == 1
+    # Everything went out in the first flush.
+    assert queue.flush(estimator, 10.02) == 0
+
+
+def test_drops_stale_and_future():
+    queue = VisionQueue()
+    estimator = RecordingEstimator()
+    queue.add(Pose2d(), 10.0 - VisionConstants.max_age - 0.1, 2, 2.0, 0.5)
+    queue.add(Pose2d(), 10.5, 2, 2.0, 0.5)
+    queue.add(Pose2d(), 9.9, 2, 2.0, 0.5)
+
+    assert queue.flush(estimator, 10.0) == 1
+    assert queue.stale == 2
+    assert estimator.measurements[0][0] == 9.9
+
+
+def test_clear():
+    queue = VisionQueue()
+    queue.add(Pose2d(), 9.9, 2, 2.0, 0.5)
+    queue.clear()
+    assert queue.flush(RecordingEstimator(), 10.0) == 0
+
+
+def test_skips_rejected():
+    queue = VisionQueue()
+    estimator = RecordingEstimator()
+    queue.add(Pose2d(), 9.9, 0, 2.0, 0.5)
+    queue.add(Pose2d(), 9.95, 2, 2.0, 0.5)
+
+    assert queue.flush(estimator, 10.0) == 1
+    assert queue.weighting.rejected == 1
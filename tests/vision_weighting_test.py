@@ -0,0 +1,44 @@
+'''
+    Checks that VisionWeighting trusts close, multi-tag, steady measurements more than far, single-tag or spinning ones.
+'''
+
+from constants import VisionConstants
+from helpers.vision_weighting import VisionWeighting
+
+
+def test_more_tags_and_closer_is_trusted_more():
+    weighting = VisionWeighting()
+    close_multi = weighting.std_devs(3, 2.0, 0.5, 0)
+    far_multi = weighting.std_devs(3, 4.0, 0.5, 0)
+    close_single = weighting.std_devs(1, 2.0, 0.5, 0)
+
+    assert close_multi[0] < far_multi[0]
+    assert close_multi[0] < close_single[0]
+    assert close_multi[0] == close_multi[1]
+
+
+def test_single_tag_heading_is_ignored():
+    weighting = VisionWeighting()
+    assert weighting.std_devs(1, 1.0, 1.0, 0)[2] == VisionConstants.single_tag_heading_std
+    assert weighting.std_devs(2, 1.0, 1.0, 0)[2] < 1
+
+
+def test_spinning_is_trusted_less():
+    weighting = VisionWeighting()
+    steady = weighting.std_devs(2, 3.0, 0.5, 0)
+    spinning = weighting.std_devs(2, 3.0, 0.5, -VisionConstants.spin_scale)
+    assert spinning[0] == steady[0] * 2
+
+
+def test_floor():
+    weighting = VisionWeighting()
+    assert weighting.std_devs(4, 0.2, 5.0, 0)[0] == VisionConstants.min_xy_std
+
+
+def test_rejects():
+    weighting = VisionWeighting()
+    assert weighting.std_devs(0, 2.0, 0.5, 0) is None
+    assert weighting.std_devs(2, VisionConstants.max_distance + 1, 0.5, 0) is None
+    assert weighting.std_devs(2, 2.0, VisionConstants.min_area / 2, 0) is None
+    assert weighting.std_devs(2, 2.0, 0.5, VisionConstants.max_angular_velocity + 1) is None
+    assert weighting.rejected == 4